@@ -1,11 +1,14 @@
 import aiohttp
+import asyncio
 import json
 import os
 import logging
+import threading
 from dotenv import load_dotenv
 import re
 from datetime import datetime
-from plant_care_tips import get_plant_care_manager, generate_care_instructions
+from config import AI_HTTP_POOL_SIZE
+from plant_care_tips import get_plant_care_manager, care_response_from_instructions
 
 # Load environment variables
 load_dotenv()
@@ -15,23 +18,92 @@ API_TOKEN = os.getenv("OPENROUTER_API_KEY", "sk-or-v1-79342f9983634d92cbc9f92032
 
 logger = logging.getLogger(__name__)
 
+class AIServiceError(Exception):
+    """The AI API call failed; user_message is the text shown to the user instead"""
+    
+    def __init__(self, user_message):
+        super().__init__(user_message)
+        self.user_message = user_message
+
+
 class AIService:
-    def __init__(self, api_token=None):
+    def __init__(self, api_token=None, db=None):
         self.api_token = api_token or API_TOKEN
         if not self.api_token:
             logger.warning("No OPENROUTER_API_KEY provided. AI features will not work.")
         
+        # Database used to remember recognized plants
+        self.db = db
+        
         # OpenRouter API settings
         self.api_url = "https://openrouter.ai/api/v1/chat/completions"
         self.model = "openrouter/optimus-alpha"
         self.referer = "https://t.me/your_bot"
         self.site_name = "PLEXY Plant & Vitamin Bot"
+        
+        # Keep-alive connections to the API, one session per event loop,
+        # opened on first use
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+    
+    def _get_session(self):
+        """The HTTP session of the running event loop
+        
+        Entry points with one long-lived loop reuse a single session. Callers
+        that run each request on a new loop (Flask async views) get their own
+        session and must close() it before the loop ends.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=AI_HTTP_POOL_SIZE, ttl_dns_cache=300)
+            )
+            with self._sessions_lock:
+                # Forget sessions of loops that are gone
+                for stale_loop in [key for key in self._sessions if key.is_closed()]:
+                    logger.warning("Dropping an AI API session whose event loop closed without close()")
+                    del self._sessions[stale_loop]
+                self._sessions[loop] = session
+        return session
+    
+    async def warm_up(self):
+        """Open a connection to the API ahead of the first request"""
+        try:
+            async with self._get_session().head(self.api_url) as response:
+                await response.read()
+            return True
+        except Exception as e:
+            logger.warning(f"Could not pre-connect to the AI API: {e}")
+            return False
+    
+    async def close(self):
+        """Close the HTTP session of the running event loop"""
+        with self._sessions_lock:
+            session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
     
     async def generate_response(self, prompt, max_tokens=1024, temperature=0.7):
         """Generate a response from the AI model"""
         if not self.api_token:
             return "Ошибка: API ключ не настроен. Обратитесь к администратору."
         
+        try:
+            text, _ = await self.complete(prompt, max_tokens, temperature)
+            return text
+        except AIServiceError as e:
+            return e.user_message
+    
+    async def complete(self, prompt, max_tokens=1024, temperature=0.7):
+        """Generate a response, raising AIServiceError instead of returning an error text
+        
+        Returns:
+            tuple: (text, tokens used as reported by the API, or max_tokens if it reports none)
+        """
+        if not self.api_token:
+            raise AIServiceError("Ошибка: API ключ не настроен. Обратитесь к администратору.")
+        
         headers = {
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json",
@@ -57,26 +129,28 @@ class AIService:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.api_url, 
-                    headers=headers,
-                    json=body
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"API error: {response.status} - {error_text}")
-                        return "Произошла ошибка при обращении к AI. Попробуйте позже."
-                    
-                    result = await response.json()
-                    if "choices" in result and len(result["choices"]) > 0:
-                        return result["choices"][0]["message"]["content"]
-                    else:
-                        logger.error(f"Unexpected API response: {result}")
-                        return "Получен неожиданный ответ от AI. Попробуйте позже."
+            async with self._get_session().post(
+                self.api_url, 
+                headers=headers,
+                json=body
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"API error: {response.status} - {error_text}")
+                    raise AIServiceError("Произошла ошибка при обращении к AI. Попробуйте позже.")
+                
+                result = await response.json()
+                if "choices" in result and len(result["choices"]) > 0:
+                    tokens = (result.get("usage") or {}).get("total_tokens") or max_tokens
+                    return result["choices"][0]["message"]["content"], tokens
+                else:
+                    logger.error(f"Unexpected API response: {result}")
+                    raise AIServiceError("Получен неожиданный ответ от AI. Попробуйте позже.")
+        except AIServiceError:
+            raise
         except Exception as e:
             logger.exception(f"Error calling AI API: {e}")
-            return "Произошла ошибка при обращении к AI сервису. Попробуйте позже."
+            raise AIServiceError("Произошла ошибка при обращении к AI сервису. Попробуйте позже.") from e
     
     async def analyze_plant_image(self, image_url):
         """Analyze a plant image and provide feedback"""
@@ -130,23 +204,22 @@ class AIService:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.api_url, 
-                    headers=headers,
-                    json=body
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"API error: {response.status} - {error_text}")
-                        return "Произошла ошибка при обращении к AI. Попробуйте позже."
-                    
-                    result = await response.json()
-                    if "choices" in result and len(result["choices"]) > 0:
-                        return result["choices"][0]["message"]["content"]
-                    else:
-                        logger.error(f"Unexpected API response: {result}")
-                        return "Получен неожиданный ответ от AI. Попробуйте позже."
+            async with self._get_session().post(
+                self.api_url, 
+                headers=headers,
+                json=body
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"API error: {response.status} - {error_text}")
+                    return "Произошла ошибка при обращении к AI. Попробуйте позже."
+                
+                result = await response.json()
+                if "choices" in result and len(result["choices"]) > 0:
+                    return result["choices"][0]["message"]["content"]
+                else:
+                    logger.error(f"Unexpected API response: {result}")
+                    return "Получен неожиданный ответ от AI. Попробуйте позже."
         except Exception as e:
             logger.exception(f"Error calling AI API for image analysis: {e}")
             return "Произошла ошибка при обращении к AI сервису. Попробуйте позже."
@@ -247,20 +320,9 @@ class AIService:
                     # Store plant information in database if provided
                     if db and plant_data.get("name"):
                         try:
-                            # Check if plant already exists
-                            existing_plant = await db.plants.find_one({"name": plant_data["name"]})
-                            
-                            if existing_plant:
-                                # Update existing plant
-                                await db.plants.update_one(
-                                    {"name": plant_data["name"]},
-                                    {"$set": plant_data}
-                                )
-                                logging.info(f"Updated plant data for '{plant_data['name']}' in database")
-                            else:
-                                # Create new plant entry
-                                await db.plants.insert_one(plant_data)
-                                logging.info(f"Added new plant '{plant_data['name']}' to database")
+                            # Single atomic upsert keyed by the plant name
+                            if db.upsert_plant(plant_data) is not None:
+                                logging.info(f"Saved plant data for '{plant_data['name']}' in database")
                         except Exception as db_error:
                             logging.error(f"Error saving plant data to database: {db_error}")
                     
@@ -357,84 +419,47 @@ class AIService:
             plant_info (dict): Plant information dictionary
         """
         try:
-            from database import Database
-            db = Database()
+            db = self.db
+            if db is None:
+                from services import get_services
+                db = get_services().db
+            
+            # Only store fields that have real information
+            plant_data = {
+                "name": plant_info["name"],
+                "scientific_name": plant_info.get("scientific_name", ""),
+                "last_updated": datetime.now()
+            }
             
-            # Check if plant already exists
-            existing_plant = db.get_plant_by_name(plant_info["name"])
+            if plant_info.get("description") and plant_info["description"] not in ["Нет информации", ""]:
+                plant_data["description"] = plant_info["description"]
             
-            if existing_plant:
-                # Update existing entry with any new information
-                plant_data = {
-                    "name": plant_info["name"],
-                    "scientific_name": plant_info["scientific_name"],
-                }
-                
-                # Only update fields that have real information
-                if plant_info.get("description") and plant_info["description"] not in ["Нет информации", ""]:
-                    plant_data["description"] = plant_info["description"]
-                
-                if plant_info.get("care_tips") and plant_info["care_tips"] not in ["Нет информации", ""]:
-                    plant_data["care_tips"] = plant_info["care_tips"]
-                
-                # Additional fields can be added to the database
-                extra_data = {}
-                if plant_info.get("light") and plant_info["light"] not in ["Нет информации", ""]:
-                    extra_data["light"] = plant_info["light"]
-                
-                if plant_info.get("water") and plant_info["water"] not in ["Нет информации", ""]:
-                    extra_data["watering"] = plant_info["water"]
-                
-                if plant_info.get("temperature") and plant_info["temperature"] not in ["Нет информации", ""]:
-                    extra_data["temperature"] = plant_info["temperature"]
-                
-                if plant_info.get("soil") and plant_info["soil"] not in ["Нет информации", ""]:
-                    extra_data["soil"] = plant_info["soil"]
-                
-                if plant_info.get("problems") and plant_info["problems"] not in ["Нет информации", ""]:
-                    extra_data["common_problems"] = plant_info["problems"]
-                
-                if extra_data:
-                    plant_data["extra_data"] = extra_data
-                
-                # Update plant in database
-                db.update_plant(existing_plant["_id"], plant_data)
-                logger.info(f"Updated plant information: {plant_info['name']}")
-            
-            else:
-                # Create a new plant entry
-                plant_data = {
-                    "name": plant_info["name"],
-                    "scientific_name": plant_info["scientific_name"],
-                    "description": plant_info.get("description", ""),
-                    "care_tips": plant_info.get("care_tips", ""),
-                    "image_count": 1,
-                    "last_updated": datetime.now().isoformat()
-                }
-                
-                # Add extra data if available
-                extra_data = {}
-                if plant_info.get("light") and plant_info["light"] not in ["Нет информации", ""]:
-                    extra_data["light"] = plant_info["light"]
-                
-                if plant_info.get("water") and plant_info["water"] not in ["Нет информации", ""]:
-                    extra_data["watering"] = plant_info["water"]
-                
-                if plant_info.get("temperature") and plant_info["temperature"] not in ["Нет информации", ""]:
-                    extra_data["temperature"] = plant_info["temperature"]
-                
-                if plant_info.get("soil") and plant_info["soil"] not in ["Нет информации", ""]:
-                    extra_data["soil"] = plant_info["soil"]
-                
-                if plant_info.get("problems") and plant_info["problems"] not in ["Нет информации", ""]:
-                    extra_data["common_problems"] = plant_info["problems"]
-                
-                if extra_data:
-                    plant_data["extra_data"] = extra_data
-                
-                # Add plant to database
-                db.add_plant(plant_data)
-                logger.info(f"Added new plant to database: {plant_info['name']}")
+            if plant_info.get("care_tips") and plant_info["care_tips"] not in ["Нет информации", ""]:
+                plant_data["care_tips"] = plant_info["care_tips"]
+            
+            # Additional fields can be added to the database
+            extra_data = {}
+            if plant_info.get("light") and plant_info["light"] not in ["Нет информации", ""]:
+                extra_data["light"] = plant_info["light"]
+            
+            if plant_info.get("water") and plant_info["water"] not in ["Нет информации", ""]:
+                extra_data["watering"] = plant_info["water"]
+            
+            if plant_info.get("temperature") and plant_info["temperature"] not in ["Нет информации", ""]:
+                extra_data["temperature"] = plant_info["temperature"]
+            
+            if plant_info.get("soil") and plant_info["soil"] not in ["Нет информации", ""]:
+                extra_data["soil"] = plant_info["soil"]
+            
+            if plant_info.get("problems") and plant_info["problems"] not in ["Нет информации", ""]:
+                extra_data["common_problems"] = plant_info["problems"]
+            
+            if extra_data:
+                plant_data["extra_data"] = extra_data
+            
+            # Single atomic upsert; the defaults only apply to a new plant
+            db.upsert_plant(plant_data, defaults={"description": "", "care_tips": "", "image_count": 1})
+            logger.info(f"Saved plant information: {plant_info['name']}")
         
         except Exception as e:
             logger.exception(f"Error saving plant to database: {e}")
@@ -612,24 +637,23 @@ class AIService:
                 "temperature": 0.7
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.api_url, 
-                    headers=headers,
-                    json=body
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logging.error(f"API error: {response.status} - {error_text}")
-                        raise Exception(f"API error: {response.status} - {error_text}")
+            async with self._get_session().post(
+                self.api_url, 
+                headers=headers,
+                json=body
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logging.error(f"API error: {response.status} - {error_text}")
+                    raise Exception(f"API error: {response.status} - {error_text}")
+                
+                result = await response.json()
+                if "choices" in result and len(result["choices"]) > 0:
+                    return result["choices"][0]["message"]["content"]
+                else:
+                    logging.error(f"Unexpected API response: {result}")
+                    raise Exception("Unexpected API response format")
                     
-                    result = await response.json()
-                    if "choices" in result and len(result["choices"]) > 0:
-                        return result["choices"][0]["message"]["content"]
-                    else:
-                        logging.error(f"Unexpected API response: {result}")
-                        raise Exception("Unexpected API response format")
-                        
         except Exception as e:
             logging.error(f"Error in generate_image_analysis: {e}")
             raise
@@ -645,24 +669,16 @@ class AIService:
         """
         # Try to get information from our database first
         plant_care_manager = get_plant_care_manager()
-        care_instructions = generate_care_instructions(plant_name)
+        tip = plant_care_manager.get_tip_by_name(plant_name)
         
-        if care_instructions:
+        if tip:
             logging.info(f"Found plant care tips in database for: {plant_name}")
             return {
                 "found": True,
-                "name": care_instructions["name"],
-                "care_tips": {
-                    "watering": care_instructions["watering"],
-                    "light": care_instructions["light"],
-                    "temperature": care_instructions["temperature"],
-                    "soil": care_instructions["soil"],
-                    "humidity": care_instructions.get("humidity", ""),
-                    "fertilizing": care_instructions.get("fertilizing", "")
-                },
-                "common_problems": care_instructions.get("common_problems", []),
-                "tips": care_instructions.get("tips", []),
-                "source": "database"
+                **care_response_from_instructions(plant_care_manager.care_instructions(tip)),
+                "source": "database",
+                # Prebuilt /care reply, served from the render cache
+                "text": plant_care_manager.render_tip(tip, fmt="care")
             }
         
         # If not found in database, try to get from AI
@@ -733,7 +749,8 @@ class AIService:
                             "difficulty": "среднее"
                         }
                         
-                        plant_care_manager.add_tip(new_tip)
+                        # add_tip waits for the catalog's file lock
+                        await asyncio.get_running_loop().run_in_executor(None, plant_care_manager.add_tip, new_tip)
                         logging.info(f"Added new plant care tip to database: {care_data['name']}")
                     except Exception as db_error:
                         logging.error(f"Error saving new plant care tip to database: {db_error}")
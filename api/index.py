@@ -4,6 +4,12 @@ import os
 import requests
 import base64
 import logging
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limiter import SyncOutboundLimiter
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
@@ -14,6 +20,79 @@ BOT_TOKEN = os.environ.get('BOT_TOKEN', '8050987714:AAGEeXCsCVqXrLQjrypQDMys49UW
 TELEGRAM_API = f"https://api.telegram.org/bot{BOT_TOKEN}"
 CHUTES_API_TOKEN = os.environ.get('CHUTES_API_TOKEN', 'cpk_7e4ce4743c7545fa8217818d9ca46e55.e1a9c74707105d49ba223a1dc3616256.YSAyEpMPrvBy93xL8IBLo7u1zbSnMWKS')
 
+# Ограничение частоты отправки сообщений (общее и для каждого чата)
+outbound_limiter = SyncOutboundLimiter()
+
+# Максимальная пауза по retry_after, на которую можно повторить отправку:
+# функция должна уложиться в maxDuration из vercel.json
+MAX_RETRY_AFTER = 5
+
+# Время на обработку одного обновления в секундах: maxDuration из vercel.json
+# (10 с) минус запас на ответ. Все запросы к Telegram API за обновление —
+# вместе с повторами, паузами по retry_after и ожиданием лимита отправки —
+# должны уложиться в этот срок
+UPDATE_TIME_BUDGET = 8.5
+
+# Таймауты одной попытки запроса к Telegram API (подключение, ответ) в секундах
+# и число повторов; ближе к сроку обновления таймауты сокращаются
+TELEGRAM_TIMEOUT = (1.5, 3)
+TELEGRAM_RETRIES = 1
+TELEGRAM_BACKOFF = 0.2
+
+# Запрос не отправляется, если на попытку остаётся меньше этого (секунды)
+MIN_ATTEMPT_TIME = 0.3
+
+# Соединений с api.telegram.org в пуле: экземпляр функции обрабатывает
+# по одному обновлению, но одно обновление может отправлять запросы из потоков
+TELEGRAM_POOL_SIZE = int(os.environ.get('TELEGRAM_POOL_SIZE', '4'))
+
+
+def create_telegram_session():
+    """Сессия с пулом keep-alive соединений к Telegram API
+
+    Ошибки подключения повторяются для всех запросов, ошибки чтения — только
+    для GET, чтобы не отправить сообщение дважды.
+    """
+    retry = Retry(total=TELEGRAM_RETRIES, connect=TELEGRAM_RETRIES, read=TELEGRAM_RETRIES, status=0,
+                  backoff_factor=TELEGRAM_BACKOFF)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=TELEGRAM_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
+# Создаётся при загрузке модуля и переиспользуется тёплыми вызовами функции,
+# поэтому каждый запрос идёт по уже открытому соединению
+telegram_session = create_telegram_session()
+
+# Срок обработки текущего обновления (time.monotonic()), свой у каждого потока
+_update_deadline = threading.local()
+
+
+def start_update_deadline():
+    """Отсчитывает UPDATE_TIME_BUDGET для нового обновления"""
+    _update_deadline.value = time.monotonic() + UPDATE_TIME_BUDGET
+
+
+def remaining_time():
+    """Сколько секунд осталось до срока текущего обновления"""
+    deadline = getattr(_update_deadline, "value", None)
+    if deadline is None:
+        return UPDATE_TIME_BUDGET
+    return deadline - time.monotonic()
+
+
+def telegram_timeout():
+    """Таймауты запроса, при которых он вместе с повтором укладывается в срок
+
+    Возвращает None, если времени на запрос уже не осталось.
+    """
+    attempt = (remaining_time() - TELEGRAM_BACKOFF * TELEGRAM_RETRIES) / (TELEGRAM_RETRIES + 1)
+    if attempt < MIN_ATTEMPT_TIME:
+        return None
+    connect = min(TELEGRAM_TIMEOUT[0], attempt / 3)
+    return connect, min(TELEGRAM_TIMEOUT[1], attempt - connect)
+
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         """Обработка GET-запросов"""
@@ -34,6 +113,7 @@ class handler(BaseHTTPRequestHandler):
         self.wfile.write(json.dumps({"ok": True}).encode('utf-8'))
         
         # Обрабатываем данные от Telegram
+        start_update_deadline()
         try:
             update = json.loads(post_data.decode('utf-8'))
             process_update(update)
@@ -532,8 +612,13 @@ def get_file_info(file_id):
     url = f"{TELEGRAM_API}/getFile"
     params = {"file_id": file_id}
     
+    timeout = telegram_timeout()
+    if timeout is None:
+        logger.warning("Не осталось времени на запрос информации о файле")
+        return None
+    
     try:
-        response = requests.get(url, params=params)
+        response = telegram_session.get(url, params=params, timeout=timeout)
         result = response.json()
         
         if result.get("ok", False):
@@ -554,8 +639,13 @@ def answer_callback_query(callback_query_id, text=None):
     if text:
         data["text"] = text
         
+    timeout = telegram_timeout()
+    if timeout is None:
+        logger.warning("Не осталось времени на ответ на callback query")
+        return
+    
     try:
-        requests.post(url, json=data)
+        telegram_session.post(url, json=data, timeout=timeout)
     except Exception as e:
         logger.error(f"Ошибка при ответе на callback query: {e}")
 
@@ -576,8 +666,26 @@ def send_message(chat_id, text, parse_mode=None, reply_markup=None):
         data["reply_markup"] = json.dumps(reply_markup)
     
     try:
-        response = requests.post(url, json=data)
-        return response.json()
+        for attempt in range(2):
+            # Ожидание лимита отправки тоже входит в срок обновления
+            if not outbound_limiter.acquire(chat_id, max_wait=remaining_time() - MIN_ATTEMPT_TIME * 2):
+                logger.warning(f"Не осталось времени на отправку сообщения в чат {chat_id}")
+                return None
+            timeout = telegram_timeout()
+            if timeout is None:
+                logger.warning(f"Не осталось времени на отправку сообщения в чат {chat_id}")
+                return None
+            response = telegram_session.post(url, json=data, timeout=timeout)
+            result = response.json()
+            
+            # При 429 Telegram сообщает, через сколько секунд можно повторить;
+            # повторяем, только если после паузы ещё останется время на запрос
+            retry_after = result.get("parameters", {}).get("retry_after")
+            if (response.status_code != 429 or not retry_after or retry_after > MAX_RETRY_AFTER or attempt
+                    or retry_after + MIN_ATTEMPT_TIME * 2 > remaining_time()):
+                return result
+            logger.warning(f"Превышен лимит отправки в чат {chat_id}, повтор через {retry_after} с")
+            outbound_limiter.pause(chat_id, retry_after)
     except Exception as e:
         logger.error(f"Ошибка при отправке сообщения: {e}")
         return None 
\ No newline at end of file
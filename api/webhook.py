@@ -2,11 +2,10 @@ from flask import Flask, request, jsonify
 import logging
 import json
 import os
+import threading
 
 from aiogram import Bot, Dispatcher, types
-from aiogram.contrib.fsm_storage.memory import MemoryStorage
 
-from config import BOT_TOKEN
 import main
 
 # Настройка логирования
@@ -16,10 +15,16 @@ logger = logging.getLogger(__name__)
 # Инициализация Flask
 app = Flask(__name__)
 
-# Инициализация бота и диспетчера
-bot = Bot(token=BOT_TOKEN)
-storage = MemoryStorage()
-dp = main.dp  # Используем диспетчер из main.py
+# Бот, диспетчер и сервисы из main.py, общие для всего процесса
+bot = main.bot
+dp = main.dp
+services = main.services
+
+# Открываем соединение с базой и загружаем каталог советов заранее, не задерживая запуск.
+# Обработка обновлений ждёт окончания прогрева не дольше WARM_UP_TIMEOUT секунд
+WARM_UP_TIMEOUT = 10
+warm_up_thread = threading.Thread(target=services.warm_up, name="services-warm-up", daemon=True)
+warm_up_thread.start()
 
 # URL для вебхука
 WEBHOOK_HOST = os.environ.get('VERCEL_URL', 'https://pi-chqynon.vercel.app')
@@ -38,12 +43,19 @@ async def webhook():
             # Преобразуем JSON в объект Update
             update = types.Update(**update_json)
             
+            # Первые обновления ждут прогрева, чтобы база уже была проверена
+            warm_up_thread.join(WARM_UP_TIMEOUT)
+            
             # Устанавливаем текущий бот и диспетчер
             Bot.set_current(bot)
             Dispatcher.set_current(dp)
             
-            # Обрабатываем обновление
-            await dp.process_update(update)
+            # Обрабатываем обновление. Flask запускает каждый запрос в новом
+            # цикле событий, поэтому сессию ИИ этого цикла закрываем сразу
+            try:
+                await dp.process_update(update)
+            finally:
+                await services.ai_service.close()
             
             return jsonify({"status": "ok"})
         except Exception as e:
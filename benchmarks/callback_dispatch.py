@@ -0,0 +1,116 @@
+"""Dispatch cost of callback data: if/elif chain vs Router
+
+Replays a mix of the callback payloads bot.py receives through a copy of
+the old handle_callback_query chain (the same == / startswith checks in
+the same order) and through a Router with the same routes, and reports
+the time per dispatch, with the router's resolution cache warm (repeated
+payloads, the usual case) and without it. --extra-routes adds dummy prefix routes in the
+middle of the table to show how each approach scales as routes are added.
+
+    python benchmarks/callback_dispatch.py [--extra-routes 0,50,200]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from router import Router  # noqa: E402
+
+PLANTS = ["Монстера", "Фикус каучуконосный", "Хлорофитум", "Суккуленты", "Спатифиллум", "Сансевиерия"]
+
+# Roughly what users press: mostly plant actions, then menus and vitamins
+PAYLOADS = (
+    [f"{action}_{plant}" for action in ("plant_info", "plant_water", "plant_light", "plant_temp",
+                                        "plant_soil", "plant_problems") for plant in PLANTS] * 3
+    + ["main_menu", "plants_menu", "vitamins_menu", "vitamins_all", "faq_menu", "problems_menu",
+       "ai_consultant_menu", "ai_general_question", "cancel_operation"] * 2
+    + ["vitamin_a", "vitamin_c", "vitamin_d", "mineral_calcium", "waste_banana", "waste_coffee",
+       "faq_about", "faq_sources", "vitamin_problems", "plant_problems"]
+)
+
+EXACT_HEAD = ["cancel_operation", "main_menu", "feedback", "vitamins_menu", "vitamins_all"]
+PREFIX_VITAMINS = ["vitamin_", "mineral_"]
+EXACT_PLANTS = ["plants_menu", "plants_all"]
+PREFIX_PLANTS = ["plant_info_", "plant_water_", "plant_light_", "plant_temp_", "plant_soil_",
+                 "plant_problems_", "waste_"]
+EXACT_AI = ["ai_consultant_menu", "ai_general_question", "ai_vitamin_recommend", "ai_plant_analysis"]
+PREFIX_FAQ = ["faq_"]
+EXACT_TAIL = ["faq_menu", "problems_menu"]
+
+
+def build_chain(extra_routes):
+    """The old chain: inline if/elif checks, tried in order"""
+    extra = [f"extra{i}_" for i in range(extra_routes)]
+    checks = (
+        [(f"data == {p!r}", 0) for p in EXACT_HEAD]
+        + [(f"data.startswith({p!r})", len(p)) for p in PREFIX_VITAMINS]
+        + [(f"data == {p!r}", 0) for p in EXACT_PLANTS]
+        + [(f"data.startswith({p!r})", len(p)) for p in extra + PREFIX_PLANTS]
+        + [(f"data == {p!r}", 0) for p in EXACT_AI]
+        + [(f"data.startswith({p!r})", len(p)) for p in PREFIX_FAQ]
+        + [(f"data == {p!r}", 0) for p in EXACT_TAIL]
+        + [('data in ["vitamin_problems", "plant_problems"]', 0)]
+    )
+    # Prefix branches slice off their prefix like the old ones did
+    lines = ["def dispatch(data):"]
+    for i, (check, prefix_length) in enumerate(checks):
+        lines.append(f"    {'if' if i == 0 else 'elif'} {check}:")
+        lines.append(f"        return {i}, data[{prefix_length}:]")
+    lines.append("    return None")
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["dispatch"]
+
+
+def build_router(extra_routes):
+    router = Router()
+    for payload in EXACT_HEAD + EXACT_PLANTS + EXACT_AI + EXACT_TAIL + ["vitamin_problems", "plant_problems"]:
+        router.exact(payload, payload)
+    for prefix in PREFIX_VITAMINS + PREFIX_PLANTS + PREFIX_FAQ + [f"extra{i}_" for i in range(extra_routes)]:
+        router.prefix(prefix, prefix)
+    return router
+
+
+def uncached(router):
+    """Router.resolve without its resolution cache, i.e. the trie walk for every prefix payload"""
+    exact = router._exact
+
+    def resolve(payload):
+        return exact.get(payload) or router._resolve_prefix(payload)
+
+    return resolve
+
+
+def time_per_call(dispatch, payloads, repeat=5):
+    def run():
+        for payload in payloads:
+            dispatch(payload)
+    number = 20
+    best = min(timeit.repeat(run, number=number, repeat=repeat))
+    return best / (number * len(payloads)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--extra-routes", default="0,50,200")
+    args = parser.parse_args()
+
+    payloads = list(PAYLOADS)
+    random.Random(0).shuffle(payloads)
+
+    print(f"{'routes':>7} {'chain ns':>10} {'router ns':>10} {'uncached ns':>12} {'speedup':>8}")
+    for extra in (int(n) for n in args.extra_routes.split(",")):
+        chain = build_chain(extra)
+        router = build_router(extra)
+        chain_ns = time_per_call(chain, payloads)
+        router_ns = time_per_call(router.resolve, payloads)
+        uncached_ns = time_per_call(uncached(router), payloads)
+        print(f"{len(router):>7} {chain_ns:>10.0f} {router_ns:>10.0f} {uncached_ns:>12.0f} {chain_ns / router_ns:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
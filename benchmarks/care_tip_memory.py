@@ -0,0 +1,75 @@
+"""Memory footprint of care tips: plain JSON dicts vs slotted records
+
+Builds a synthetic catalog from the seed tips, loads it the way
+plant_care_tips.json is loaded (json.loads, so repeated values are separate
+string objects) and reports the bytes retained per entry in each form.
+
+    python benchmarks/care_tip_memory.py [--sizes 10000,100000]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from care_records import PlantCareTip  # noqa: E402
+from plant_care_tips import CARE_TIPS_SEED_PATH, load_initial_care_tips  # noqa: E402
+
+
+def build_catalog_json(size):
+    """JSON text of `size` tips with unique names and descriptions"""
+    seed = load_initial_care_tips(os.path.join(REPO_ROOT, CARE_TIPS_SEED_PATH))
+    tips = []
+    for i in range(size):
+        tip = dict(seed[i % len(seed)])
+        tip["name"] = f"{tip['name']} #{i}"
+        tip["description"] = f"{tip['description']} ({i})"
+        tips.append(tip)
+    return json.dumps(tips, ensure_ascii=False)
+
+
+def retained_bytes(build):
+    """Bytes still allocated after build() returns, keeping its result alive"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return size, result
+
+
+def as_records(text):
+    dicts = json.loads(text)
+    records = [PlantCareTip.from_dict(tip) for tip in dicts]
+    del dicts
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000")
+    args = parser.parse_args()
+
+    print(f"{'tips':>8} {'dict B/tip':>12} {'record B/tip':>14} {'saved':>7}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        text = build_catalog_json(size)
+
+        dict_bytes, dicts = retained_bytes(lambda: json.loads(text))
+        del dicts
+        record_bytes, records = retained_bytes(lambda: as_records(text))
+        assert [record.to_dict() for record in records[:10]] == json.loads(text)[:10]
+        del records
+
+        saved = 1 - record_bytes / dict_bytes
+        print(f"{size:>8} {dict_bytes / size:>12.0f} {record_bytes / size:>14.0f} {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Import-time budget check
+
+Imports each module in a fresh interpreter, inside an empty working
+directory, and fails if the best of several imports takes longer than the
+budget or if importing touches the filesystem.
+
+    python benchmarks/import_time.py [--budget-ms 100] [--runs 5] [module ...]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay cheap to import (serverless cold starts pay for them)
+DEFAULT_MODULES = ["plant_care_tips"]
+DEFAULT_BUDGET_MS = 100.0
+DEFAULT_RUNS = 5
+
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+def measure_import(module):
+    """Cumulative import time of a module in microseconds, and files it created"""
+    with tempfile.TemporaryDirectory() as cwd:
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT, PYTHONDONTWRITEBYTECODE="1")
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=cwd, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+        created = sorted(os.listdir(cwd))
+
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match and match.group(3) == module:
+            return int(match.group(2)), created
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        runs = [measure_import(module) for _ in range(args.runs)]
+        micros = min(run[0] for run in runs)
+        created = sorted({name for run in runs for name in run[1]})
+        ok = micros / 1000 <= args.budget_ms and not created
+        failed |= not ok
+        status = "ok" if ok else "FAIL"
+        print(f"{status:4} {module}: {micros / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        if created:
+            print(f"     created at import: {', '.join(created)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
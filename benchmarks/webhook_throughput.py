@@ -0,0 +1,167 @@
+"""Webhook throughput: Flask async view (api/webhook.py) vs webhook_server.py
+
+Posts updates from many chats at once to two local servers whose update
+processing is the same simulated handler (a sleep standing in for the
+Telegram and AI calls): a Flask app with an async view like
+api/webhook.py, which starts an event loop per request and answers only
+after processing, served by werkzeug's threaded server; and
+webhook_server.WebhookServer, which answers once the update is queued.
+Reports, for both, how many updates per second were accepted (answered
+200; rejected ones are counted apart) and how many per second were
+processed, up to the last one finishing, along with response latency.
+
+Needs aiohttp and flask (with its async extra, asgiref).
+
+    python benchmarks/webhook_throughput.py [--requests 2000] [--concurrency 100] [--work-ms 50]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import aiohttp  # noqa: E402
+from aiohttp import web  # noqa: E402
+from flask import Flask, jsonify, request  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from webhook_server import WebhookServer  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_update(update_id: int, chats: int) -> dict:
+    chat_id = 1000 + update_id % chats
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Тест"},
+            "text": "/care монстера",
+        },
+    }
+
+
+def start_flask(work: float) -> tuple:
+    """A Flask app shaped like api/webhook.py, in a werkzeug thread"""
+    app = Flask(__name__)
+
+    @app.route("/api/webhook", methods=["POST"])
+    async def webhook():
+        request.get_json()
+        await asyncio.sleep(work)
+        return jsonify({"status": "ok"})
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    port = free_port()
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}/api/webhook", server.shutdown
+
+
+async def start_aiohttp(work: float, concurrency: int) -> tuple:
+    processed = []
+
+    async def process_update(update):
+        await asyncio.sleep(work)
+        processed.append(time.perf_counter())
+
+    server = WebhookServer(process_update, secret="", max_concurrent=concurrency)
+    runner = web.AppRunner(server.app("telegram"))
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    async def finish() -> list:
+        """Wait for queued updates, then stop; returns their completion times"""
+        await server.drain(timeout=3600)
+        await runner.cleanup()
+        return processed
+
+    return f"http://127.0.0.1:{port}/telegram", finish
+
+
+async def load(url: str, requests: int, concurrency: int, chats: int) -> dict:
+    latencies = []
+    statuses = {}
+    queue = asyncio.Queue()
+    for update_id in range(requests):
+        queue.put_nowait(make_update(update_id, chats))
+
+    async def worker(session):
+        while not queue.empty():
+            update = queue.get_nowait()
+            started = time.perf_counter()
+            async with session.post(url, json=update) as response:
+                await response.read()
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+            latencies.append(time.perf_counter() - started)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "started": started,
+        "elapsed": elapsed,
+        "accepted": statuses.get(200, 0),
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p95": latencies[int(len(latencies) * 0.95)] * 1000,
+        "statuses": statuses,
+    }
+
+
+def report(name: str, result: dict, processed: int, processing_time: float):
+    rejected = ", ".join(f"{status}: {count}" for status, count in sorted(result["statuses"].items())
+                         if status != 200)
+    print(f"{name:<10} accepted {result['accepted'] / result['elapsed']:>7.0f}/s   "
+          f"processed {processed / processing_time:>7.0f}/s   "
+          f"p50 {result['p50']:>7.1f} ms   p95 {result['p95']:>7.1f} ms   "
+          f"(accepted {result['accepted']}, processed {processed}, rejected {rejected or 0})")
+
+
+async def main(args):
+    work = args.work_ms / 1000
+
+    flask_url, stop_flask = start_flask(work)
+    try:
+        flask_result = await load(flask_url, args.requests, args.concurrency, args.chats)
+    finally:
+        stop_flask()
+
+    aiohttp_url, finish_aiohttp = await start_aiohttp(work, args.concurrency)
+    try:
+        aiohttp_result = await load(aiohttp_url, args.requests, args.concurrency, args.chats)
+    finally:
+        processed = await finish_aiohttp()
+
+    print(f"{args.requests} updates from {args.chats} chats, {args.concurrency} connections, "
+          f"{args.work_ms} ms per update")
+    # Flask answers only after processing, so everything it accepted is processed
+    report("flask", flask_result, flask_result["accepted"], flask_result["elapsed"])
+    processing_time = (max(processed) if processed else time.perf_counter()) - aiohttp_result["started"]
+    report("aiohttp", aiohttp_result, len(processed), processing_time)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--chats", type=int, default=500)
+    parser.add_argument("--work-ms", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -3,6 +3,7 @@ import re
 import asyncio
 import os
 import signal
+from functools import partial
 from telegram import Update
 from telegram.constants import ParseMode
 from telegram.ext import (
@@ -15,8 +16,10 @@ from telegram.ext import (
     ConversationHandler
 )
 
-from config import BOT_TOKEN
-from database import Database
+from config import (
+    BOT_TOKEN, ADMIN_IDS, AI_ANSWER_TTL_HOURS, MAX_CONCURRENT_UPDATES, BOT_MODE, ALLOWED_UPDATES,
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_SECRET, WEBHOOK_MAX_CONNECTIONS
+)
 from keyboards import (
     get_main_menu_keyboard, 
     get_vitamins_menu_keyboard, 
@@ -38,10 +41,17 @@ from utils import (
     is_health_query,
     is_ai_query,
     get_file_url,
-    format_problem_analysis,
-    clean_markdown
+    format_problem_analysis
 )
-from ai_service import AIService
+from plant_care_tips import get_tip_by_name, suggest_tips
+from prewarm import AnswerPrewarmer, answer_key
+from reminders import ReminderScheduler
+from bot_rate_limiter import BotRateLimiter
+from persistence import SQLitePersistence
+from message_builder import MessageBuilder, from_markdown
+from router import Router
+from services import get_services
+from update_processor import ChatOrderedUpdateProcessor
 
 # Enable logging
 logging.basicConfig(
@@ -58,30 +68,14 @@ WAITING_FOR_PLANT_IMAGE = 3
 WAITING_FOR_PROBLEM_DESCRIPTION = 4
 WAITING_FOR_KNOWLEDGE_UPDATE_TOPIC = 5
 
-# Initialize database connection
-db = Database()
+# Database and AI service shared with the rest of the process (connections
+# are opened lazily, or by services.warm_up() at startup)
+services = get_services()
+db = services.db
+ai_service = services.ai_service
 
-# Initialize AI service
-ai_service = AIService()
-
-def escape_markdown(text, version=1):
-    """
-    Helper function to escape telegram markup symbols.
-    
-    Args:
-        text (str): The text to escape.
-        version (int): The version of Telegram's Markdown parser to use
-                      (1 for MarkdownV1, 2 for MarkdownV2)
-    
-    Returns:
-        str: The escaped text.
-    """
-    if version == 1:
-        escape_chars = r'_*`['
-    else:  # For MarkdownV2
-        escape_chars = r'_*[]()~`>#+-=|{}.!'
-    
-    return re.sub(f'([{re.escape(escape_chars)}])', r'\\\1', text)
+# Care reminders for the plants users added with /addplant
+reminder_scheduler = ReminderScheduler(db, get_tip_by_name)
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Send a message when the command /start is issued."""
@@ -95,21 +89,26 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     
     db.register_user(user.id, username, user.first_name)
     
+    # The user's name is escaped as plain text, the rest keeps its bold markers
     welcome_message = (
-        f"👋 Здравствуйте, {user.first_name}!\n\n"
-        f"Я *PLEXY* - информационный бот, созданный *SAMGA_NIS*.\n\n"
-        f"Я могу:\n"
-        f"🌿 Определять растения по фото\n"
-        f"💊 Предоставлять информацию о витаминах и микроэлементах\n"
-        f"❓ Отвечать на ваши вопросы с помощью ИИ\n\n"
-        f"Выберите интересующую вас категорию или используйте команду /help для получения списка всех команд."
+        MessageBuilder()
+        .text(f"👋 Здравствуйте, {user.first_name}!")
+        .markdown(
+            "Я *PLEXY* - информационный бот, созданный *SAMGA_NIS*.\n\n"
+            "Я могу:\n"
+            "🌿 Определять растения по фото\n"
+            "💊 Предоставлять информацию о витаминах и микроэлементах\n"
+            "❓ Отвечать на ваши вопросы с помощью ИИ\n\n"
+            "Выберите интересующую вас категорию или используйте команду /help для получения списка всех команд."
+        )
+        .render()
     )
     
     # Track user interaction
     db.update_user_interaction(user.id, "start")
     
     await update.message.reply_markdown_v2(
-        escape_markdown(welcome_message, 2),
+        welcome_message,
         reply_markup=get_main_menu_keyboard()
     )
 
@@ -124,6 +123,9 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         "/plants - Информация о растениях\n"
         "/vitamins - Информация о витаминах\n"
         "/ai - ИИ-консультант\n"
+        "/addplant - Добавить растение и получать напоминания об уходе\n"
+        "/myplants - Мои растения и ближайшие напоминания\n"
+        "/removeplant - Удалить растение из списка\n"
         "/feedback - Оставить отзыв\n\n"
         
         "*Функции:*\n"
@@ -139,29 +141,129 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     db.update_user_interaction(user_id, "help")
     
     await update.message.reply_markdown_v2(
-        escape_markdown(help_text, 2),
+        from_markdown(help_text),
         reply_markup=get_main_menu_keyboard()
     )
 
 
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Show usage statistics from the daily rollups when /stats is issued by an admin."""
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+    
+    summary = db.get_usage_summary(days=7)
+    
+    text = f"📊 Статистика за {summary['days']} дн.\n\n"
+    text += f"Обращений: {summary['interactions']}\n"
+    text += f"Новых пользователей: {summary['new_users']}\n\n"
+    
+    text += "Активные пользователи по дням:\n"
+    for day, active_users in summary['active_users']:
+        text += f"• {day}: {active_users}\n"
+    
+    if summary['sections']:
+        text += "\nПопулярные разделы:\n"
+        for section, count in sorted(summary['sections'].items(), key=lambda item: item[1], reverse=True)[:10]:
+            text += f"• {section}: {count}\n"
+    
+    processor = context.application.update_processor
+    if isinstance(processor, ChatOrderedUpdateProcessor):
+        waits = processor.wait_stats.summary()
+        text += f"\nОбработка обновлений: {waits['updates']}, сейчас выполняется {processor.active}\n"
+        text += f"Ожидание в очереди: p50 {waits['p50']:.2f} с, p95 {waits['p95']:.2f} с, макс. {waits['max']:.2f} с\n"
+    
+    await update.message.reply_text(text)
+
+
+def format_due_dates(due_dates):
+    """Format a plant's next reminder dates, e.g. "💧 12.05, 🧪 20.05"""
+    icons = {"watering": "💧", "fertilizer": "🧪"}
+    return ", ".join(f"{icons[kind]} {due_at:%d.%m}" for kind, due_at in sorted(due_dates.items(), key=lambda item: item[1]))
+
+
+async def add_plant_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Add a plant to the user's list and schedule its care reminders when /addplant is issued."""
+    plant_name = " ".join(context.args).strip()
+    if not plant_name:
+        await update.message.reply_text("Укажите название растения, например: /addplant Монстера")
+        return
+    
+    user_id = update.effective_user.id
+    db.update_user_interaction(user_id, "addplant")
+    
+    tip = get_tip_by_name(plant_name)
+    if tip:
+        plant_name = tip["name"]
+    
+    if not db.add_user_plant(user_id, plant_name, tip["name"] if tip else None):
+        await update.message.reply_text(f"🌱 {plant_name} уже есть в вашем списке. Посмотреть: /myplants")
+        return
+    
+    reminders = reminder_scheduler.schedule_plant(user_id, update.effective_chat.id, plant_name, tip)
+    text = f"🌱 {plant_name} добавлено в ваши растения.\n"
+    if not tip:
+        text += "Растения нет в нашей базе, поэтому напоминания о поливе будут раз в неделю.\n"
+        suggestions = suggest_tips(plant_name)
+        if suggestions:
+            text += f"Возможно, вы имели в виду: {', '.join(s['name'] for s in suggestions)}.\n"
+    if reminders:
+        text += f"Ближайшие напоминания: {format_due_dates({r['kind']: r['due_at'] for r in reminders})}"
+    
+    await update.message.reply_text(text)
+
+
+async def my_plants_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """List the user's plants with their next reminders when /myplants is issued."""
+    user_id = update.effective_user.id
+    db.update_user_interaction(user_id, "myplants")
+    
+    plants = db.get_user_plants(user_id)
+    if not plants:
+        await update.message.reply_text("У вас пока нет растений. Добавьте первое: /addplant Монстера")
+        return
+    
+    text = "🪴 Ваши растения:\n\n"
+    for plant in plants:
+        due_dates = reminder_scheduler.next_due_for(user_id, plant["plant_name"])
+        text += f"• {plant['plant_name']}"
+        if due_dates:
+            text += f" — {format_due_dates(due_dates)}"
+        text += "\n"
+    
+    await update.message.reply_text(text)
+
+
+async def remove_plant_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Remove a plant and cancel its reminders when /removeplant is issued."""
+    plant_name = " ".join(context.args).strip()
+    if not plant_name:
+        await update.message.reply_text("Укажите название растения, например: /removeplant Монстера")
+        return
+    
+    user_id = update.effective_user.id
+    db.update_user_interaction(user_id, "removeplant")
+    
+    # Plants are stored under their catalog name when there is one
+    tip = get_tip_by_name(plant_name)
+    for name in ([tip["name"]] if tip else []) + [plant_name]:
+        if db.remove_user_plant(user_id, name):
+            reminder_scheduler.cancel_plant(user_id, name)
+            await update.message.reply_text(f"🗑 {name} удалено из ваших растений.")
+            return
+    
+    await update.message.reply_text(f"{plant_name} нет в вашем списке. Посмотреть: /myplants")
+
+
 async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handler for text messages"""
     text = update.message.text
     user_id = update.effective_user.id
     
     # Check if the message is a menu button press
-    if text == "🍏 Витамины и минералы":
-        return await show_vitamins_menu(update, context)
-    elif text == "🌱 Уход за растениями":
-        return await show_plants_menu(update, context)
-    elif text == "🤖 AI Консультант":
-        return await show_ai_menu(update, context)
-    elif text == "❓ FAQ":
-        return await show_faq(update, context)
-    elif text == "📝 Обратная связь":
-        return await start_feedback(update, context)
-    elif text == "🔍 Проблемы и решения":
-        return await show_problems_menu(update, context)
+    route = menu_router.resolve(text)
+    if route:
+        handler, args = route
+        return await handler(update, context, *args)
     
     # Check if in conversation state
     if context.user_data.get('state') == WAITING_FOR_GENERAL_QUESTION:
@@ -192,7 +294,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             if vitamin:
                 await update.message.reply_text(
                     format_vitamin_info(vitamin, detailed=True),
-                    parse_mode=ParseMode.MARKDOWN
+                    parse_mode=ParseMode.MARKDOWN_V2
                 )
                 db.update_user_interaction(user_id, "vitamins")
                 return
@@ -205,7 +307,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
                 # If only one result, show detailed info
                 await update.message.reply_text(
                     format_vitamin_info(results[0], detailed=True),
-                    parse_mode=ParseMode.MARKDOWN
+                    parse_mode=ParseMode.MARKDOWN_V2
                 )
             else:
                 # If multiple results, show list
@@ -228,7 +330,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
                 if plant_tip:
                     await update.message.reply_text(
                         format_plant_tip(plant_tip, detailed=True),
-                        parse_mode=ParseMode.MARKDOWN
+                        parse_mode=ParseMode.MARKDOWN_V2
                     )
                     db.update_user_interaction(user_id, "plants")
                     return
@@ -241,7 +343,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
                 # If only one result, show detailed info
                 await update.message.reply_text(
                     format_plant_tip(results[0], detailed=True),
-                    parse_mode=ParseMode.MARKDOWN
+                    parse_mode=ParseMode.MARKDOWN_V2
                 )
             else:
                 # If multiple results, show list
@@ -446,14 +548,9 @@ async def handle_ai_general_question(update: Update, context: ContextTypes.DEFAU
         # Get response from AI service
         response = await ai_service.get_ai_response(user_question)
         
-        # Clean any markdown to ensure proper formatting
-        response = clean_markdown(response)
-        
-        # Send the response
-        await update.message.reply_text(
-            response,
-            reply_markup=get_ai_menu_keyboard()
-        )
+        # Send the response, Markdown of the answer converted to MarkdownV2
+        await send_message_parts(context, update.effective_chat.id, MessageBuilder().markdown(response),
+                                 get_ai_menu_keyboard())
     except Exception as e:
         logging.error(f"Error getting AI response: {str(e)}")
         await update.message.reply_text(
@@ -509,15 +606,8 @@ async def handle_ai_vitamin_recommendation(update: Update, context: ContextTypes
     # Get response from AI
     response = await ai_service.recommend_vitamins(query)
     
-    # Clean response to ensure proper formatting
-    response = clean_markdown(response)
-    
     # Send response
-    await context.bot.send_message(
-        chat_id=update.effective_chat.id,
-        text=response,
-        parse_mode=ParseMode.MARKDOWN
-    )
+    await send_message_parts(context, update.effective_chat.id, MessageBuilder().markdown(response))
 
 
 async def start_ai_plant_analysis(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -592,84 +682,44 @@ async def handle_photo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         plant_name = plant_info.get("name", "Неизвестное растение")
         scientific_name = plant_info.get("scientific_name", "Научное название не найдено")
         
-        # Clean text to ensure proper formatting
-        description = clean_markdown(plant_info.get("description", ""))
-        care_tips = clean_markdown(plant_info.get("care_tips", ""))
-        
-        # Check if we have specific details about the plant
-        has_specific_info = (
-            plant_name != "Неизвестное растение" and 
-            scientific_name != "Научное название не найдено" and
-            description and care_tips
-        )
+        description = plant_info.get("description", "")
         
-        # Format information for display
-        plant_details = []
+        # Format information for display; AI text is escaped for MarkdownV2
+        # with its bold markers kept
+        message = MessageBuilder()
+        if plant_name == "Неизвестное растение":
+            message.title("Растение не определено", "🌿")
+            message.text("Не удалось точно определить вид растения, но вот общие рекомендации:")
+        else:
+            message.title("Растение найдено!", "🌿")
         
         # Always show name and scientific name first
-        plant_details.append(f"*Название:* {plant_name}")
-        plant_details.append(f"*Научное название:* {scientific_name}")
+        message.fields(("Название", plant_name), ("Научное название", scientific_name))
         
         # Add state information if available
-        if "state" in plant_info and plant_info["state"] and plant_info["state"] != "Состояние не определено":
-            state_info = clean_markdown(plant_info["state"])
-            plant_details.append(f"\n*Состояние растения:*\n{state_info}")
-        
-        # Add description
-        if description:
-            # Check for redundancy - don't add if it's too similar to state
-            if not "state" in plant_info or description != plant_info["state"]:
-                plant_details.append(f"\n*Описание:*\n{description}")
-        
-        # Add care tips with good formatting
-        if care_tips:
-            plant_details.append(f"\n*Советы по уходу:*\n{care_tips}")
-        
-        # Add light requirements if available
-        if "light" in plant_info and plant_info["light"] and plant_info["light"] != "Нет информации":
-            light_info = clean_markdown(plant_info["light"])
-            plant_details.append(f"\n*Освещение:*\n{light_info}")
-        
-        # Add watering info if available
-        if "water" in plant_info and plant_info["water"] and plant_info["water"] != "Нет информации":
-            water_info = clean_markdown(plant_info["water"])
-            plant_details.append(f"\n*Полив:*\n{water_info}")
-        
-        # Add temperature info if available
-        if "temperature" in plant_info and plant_info["temperature"] and plant_info["temperature"] != "Нет информации":
-            temp_info = clean_markdown(plant_info["temperature"])
-            plant_details.append(f"\n*Температура:*\n{temp_info}")
-        
-        # Add soil info if available
-        if "soil" in plant_info and plant_info["soil"] and plant_info["soil"] != "Нет информации":
-            soil_info = clean_markdown(plant_info["soil"])
-            plant_details.append(f"\n*Почва:*\n{soil_info}")
-        
-        # Add common problems if available
-        if "problems" in plant_info and plant_info["problems"] and plant_info["problems"] != "Нет информации":
-            problems_info = clean_markdown(plant_info["problems"])
-            plant_details.append(f"\n*Распространенные проблемы:*\n{problems_info}")
-        
-        # Format the final plant information text
-        if has_specific_info:
-            header = "🌿 *Растение найдено!*\n\n"
-        else:
-            header = "🌿 *Растение найдено!*\n\n"
-            
-            if plant_name == "Неизвестное растение":
-                header = "🌿 *Растение не определено*\n\nНе удалось точно определить вид растения, но вот общие рекомендации:\n\n"
-        
-        plant_info_text = header + "\n".join(plant_details)
-        
-        # Make sure the message isn't too long for Telegram
-        if len(plant_info_text) > 4000:
-            plant_info_text = plant_info_text[:3900] + "\n\n... (текст сокращен из-за ограничений Telegram)"
-        
-        # Delete processing message and send the result
+        state = plant_info.get("state")
+        if state and state != "Состояние не определено":
+            message.field("Состояние растения", state, block=True)
+        
+        # Add description, unless it just repeats the state
+        if description and description != state:
+            message.field("Описание", description, block=True)
+        
+        # Add care tips and the specific requirements that are known
+        message.field("Советы по уходу", plant_info.get("care_tips", ""), block=True)
+        for key, label in (("light", "Освещение"), ("water", "Полив"), ("temperature", "Температура"),
+                           ("soil", "Почва"), ("problems", "Распространенные проблемы")):
+            if plant_info.get(key) and plant_info[key] != "Нет информации":
+                message.field(label, plant_info[key], block=True)
+        
+        # Long answers go out as several messages, the keyboard under the last one
         await processing_message.delete()
+        parts = message.parts()
+        for part in parts[:-1]:
+            await update.message.reply_text(part, parse_mode=ParseMode.MARKDOWN_V2)
         await update.message.reply_text(
-            plant_info_text,
-            parse_mode=ParseMode.MARKDOWN,
+            parts[-1],
+            parse_mode=ParseMode.MARKDOWN_V2,
             reply_markup=get_plant_actions_keyboard(plant_name) if plant_name != "Неизвестное растение" else get_plants_menu_keyboard()
         )
         
@@ -710,445 +760,301 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
     query = update.callback_query
     await query.answer()
     
-    callback_data = query.data
-    user_id = update.effective_user.id
-    
-    # Cancel operation
-    if callback_data == "cancel_operation":
-        return await cancel_operation(update, context)
+    return await callback_router.dispatch(query.data, update, context)
+
+
+async def show_main_menu_inline(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Show the main menu in place of the current inline message"""
+    await update.callback_query.edit_message_text(
+        "Выберите интересующий вас раздел или задайте вопрос:",
+        reply_markup=get_main_menu_keyboard()
+    )
+
+
+async def show_all_vitamins(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """List all vitamins and minerals"""
+    vitamins = db.get_all_vitamins()
+    text = "*Список витаминов и минералов:*\n\n"
+    
+    for vitamin in vitamins:
+        text += f"• {vitamin['name']}: {vitamin['short_description']}\n\n"
+    
+    await update.callback_query.edit_message_text(
+        text,
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=get_back_keyboard("vitamins_menu")
+    )
+    db.update_user_interaction(update.effective_user.id, "vitamins")
+
+
+async def show_vitamin(update: Update, context: ContextTypes.DEFAULT_TYPE, name: str, not_found: str) -> None:
+    """Show a vitamin or mineral by its full name"""
+    vitamin = db.get_vitamin_by_name(name)
     
-    # Main menu navigation
-    if callback_data == "main_menu":
-        await query.edit_message_text(
-            "Выберите интересующий вас раздел или задайте вопрос:",
-            reply_markup=get_main_menu_keyboard()
+    if vitamin:
+        await update.callback_query.edit_message_text(
+            format_vitamin_info(vitamin, detailed=True),
+            parse_mode=ParseMode.MARKDOWN_V2,
+            reply_markup=get_back_keyboard("vitamins_menu")
         )
-    
-    # Handle feedback
-    elif callback_data == "feedback":
-        return await start_feedback(update, context)
-    
-    # Vitamins section
-    elif callback_data == "vitamins_menu":
-        await show_vitamins_menu(update, context)
-    
-    elif callback_data == "vitamins_all":
-        vitamins = db.get_all_vitamins()
-        text = "*Список витаминов и минералов:*\n\n"
-        
-        for vitamin in vitamins:
-            text += f"• {vitamin['name']}: {vitamin['short_description']}\n\n"
-        
-        await query.edit_message_text(
-            text,
-            parse_mode=ParseMode.MARKDOWN,
+    else:
+        await update.callback_query.edit_message_text(
+            not_found.format(name=name),
             reply_markup=get_back_keyboard("vitamins_menu")
         )
-        db.update_user_interaction(user_id, "vitamins")
     
-    elif callback_data.startswith("vitamin_"):
-        # Extract vitamin name
-        name = "Витамин " + callback_data[8:].upper()
-        
-        vitamin = db.get_vitamin_by_name(name)
-        
-        if vitamin:
-            await query.edit_message_text(
-                format_vitamin_info(vitamin, detailed=True),
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=get_back_keyboard("vitamins_menu")
-            )
-        else:
-            await query.edit_message_text(
-                f"Информация о {name} не найдена.",
-                reply_markup=get_back_keyboard("vitamins_menu")
-            )
-        
-        db.update_user_interaction(user_id, "vitamins")
-        
-    elif callback_data.startswith("mineral_"):
-        # Extract mineral name
-        name = callback_data[8:].capitalize()
-        
-        vitamin = db.get_vitamin_by_name(name)
-        
-        if vitamin:
-            await query.edit_message_text(
-                format_vitamin_info(vitamin, detailed=True),
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=get_back_keyboard("vitamins_menu")
-            )
-        else:
-            await query.edit_message_text(
-                f"Информация о минерале {name} не найдена.",
-                reply_markup=get_back_keyboard("vitamins_menu")
-            )
-        
-        db.update_user_interaction(user_id, "vitamins")
-    
-    # Plants section
-    elif callback_data == "plants_menu":
-        await show_plants_menu(update, context)
+    db.update_user_interaction(update.effective_user.id, "vitamins")
+
+
+async def show_all_plant_tips(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """List all household waste tips for plants"""
+    plant_tips = db.get_all_plant_tips()
+    text = "*Способы использования бытовых отходов для растений:*\n\n"
+    
+    for tip in plant_tips:
+        text += f"• {tip['waste_type']}: {tip['short_description']}\n\n"
+    
+    await update.callback_query.edit_message_text(
+        text,
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=get_back_keyboard("plants_menu")
+    )
+    db.update_user_interaction(update.effective_user.id, "plants")
+
+
+async def send_message_parts(context: ContextTypes.DEFAULT_TYPE, chat_id, message: MessageBuilder,
+                             reply_markup=None) -> None:
+    """Send a built message (MarkdownV2), split to Telegram's length limit
     
-    elif callback_data == "plants_all":
-        plant_tips = db.get_all_plant_tips()
-        text = "*Способы использования бытовых отходов для растений:*\n\n"
-        
-        for tip in plant_tips:
-            text += f"• {tip['waste_type']}: {tip['short_description']}\n\n"
-        
-        await query.edit_message_text(
-            text,
-            parse_mode=ParseMode.MARKDOWN,
-            reply_markup=get_back_keyboard("plants_menu")
+    The keyboard goes under the last part.
+    """
+    parts = message.parts()
+    for i, part in enumerate(parts, 1):
+        await context.bot.send_message(
+            chat_id=chat_id,
+            text=part,
+            parse_mode=ParseMode.MARKDOWN_V2,
+            reply_markup=reply_markup if i == len(parts) else None
         )
-        db.update_user_interaction(user_id, "plants")
-    
-    # Handle plant-specific actions
-    elif callback_data.startswith("plant_info_"):
-        # Extract plant name from callback data
-        plant_name = callback_data[11:]  # Remove "plant_info_" prefix
-        
-        # Try to get plant from database
-        plant = db.get_plant_by_name(plant_name)
-        
-        if plant:
-            # Format plant information
-            plant_text = f"🌿 *{plant['name']}*\n\n"
-            
-            if 'scientific_name' in plant and plant['scientific_name']:
-                plant_text += f"*Научное название:* {plant['scientific_name']}\n\n"
-            
-            if 'description' in plant and plant['description']:
-                plant_text += f"*Описание:*\n{plant['description']}\n\n"
-            
-            if 'care_tips' in plant and plant['care_tips']:
-                plant_text += f"*Рекомендации по уходу:*\n{plant['care_tips']}\n\n"
-            
-            if 'extra_data' in plant:
-                extra = plant['extra_data']
-                
-                if 'light' in extra:
-                    plant_text += f"*Освещение:*\n{extra['light']}\n\n"
-                
-                if 'watering' in extra:
-                    plant_text += f"*Полив:*\n{extra['watering']}\n\n"
-                
-                if 'temperature' in extra:
-                    plant_text += f"*Температура:*\n{extra['temperature']}\n\n"
-                
-                if 'soil' in extra:
-                    plant_text += f"*Почва:*\n{extra['soil']}\n\n"
-            
-            await query.edit_message_text(
-                plant_text,
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=get_plant_actions_keyboard(plant_name)
-            )
-        else:
-            # If plant not in database, use AI to get information
-            prompt = f"Дай информацию о растении {plant_name}. Включи научное название, описание, особенности."
-            
-            # Send typing action
-            await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-            
-            try:
-                response = await ai_service.generate_response(prompt, max_tokens=800)
-                response = clean_markdown(response)
-                
-                await query.edit_message_text(
-                    f"🌿 *Информация о растении*\n\n{response}",
-                    parse_mode=ParseMode.MARKDOWN,
-                    reply_markup=get_plant_actions_keyboard(plant_name)
-                )
-            except Exception as e:
-                logging.error(f"Error getting plant info: {e}")
-                await query.edit_message_text(
-                    f"Не удалось получить подробную информацию о растении {plant_name}.",
-                    reply_markup=get_plants_menu_keyboard()
-                )
-        
-        db.update_user_interaction(user_id, "plant_info", plant_name)
+
+
+async def edit_message_parts(query, message: MessageBuilder, reply_markup) -> None:
+    """Replace a callback query's message with a built one (MarkdownV2)
     
-    elif callback_data.startswith("plant_water_"):
-        # Extract plant name from callback data
-        plant_name = callback_data[12:]  # Remove "plant_water_" prefix
-        
-        # Try to get plant from database
-        plant = db.get_plant_by_name(plant_name)
-        watering_info = None
-        
-        if plant and 'extra_data' in plant and 'watering' in plant['extra_data']:
-            watering_info = plant['extra_data']['watering']
-        
-        if watering_info:
-            await query.edit_message_text(
-                f"💧 *Полив для {plant_name}*\n\n{watering_info}",
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=get_plant_actions_keyboard(plant_name)
-            )
-        else:
-            # If watering info not in database, use AI to get information
-            prompt = f"Как правильно поливать растение {plant_name}? Дай подробные рекомендации по поливу."
-            
-            # Send typing action
-            await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-            
-            try:
-                response = await ai_service.generate_response(prompt, max_tokens=500)
-                response = clean_markdown(response)
-                
-                await query.edit_message_text(
-                    f"💧 *Полив для {plant_name}*\n\n{response}",
-                    parse_mode=ParseMode.MARKDOWN,
-                    reply_markup=get_plant_actions_keyboard(plant_name)
-                )
-            except Exception as e:
-                logging.error(f"Error getting watering info: {e}")
-                await query.edit_message_text(
-                    f"Не удалось получить информацию о поливе для {plant_name}.",
-                    reply_markup=get_plant_actions_keyboard(plant_name)
-                )
-        
-        db.update_user_interaction(user_id, "plant_water", plant_name)
+    Text over Telegram's length limit continues in new messages; the
+    keyboard goes under the last one.
+    """
+    parts = message.parts()
+    await query.edit_message_text(
+        parts[0],
+        parse_mode=ParseMode.MARKDOWN_V2,
+        reply_markup=reply_markup if len(parts) == 1 else None
+    )
+    for i, part in enumerate(parts[1:], 2):
+        await query.message.reply_text(
+            part,
+            parse_mode=ParseMode.MARKDOWN_V2,
+            reply_markup=reply_markup if i == len(parts) else None
+        )
+
+
+async def show_plant_info(update: Update, context: ContextTypes.DEFAULT_TYPE, plant_name: str) -> None:
+    """Show what we know about a plant, asking the AI if it is not in the database"""
+    query = update.callback_query
     
-    elif callback_data.startswith("plant_light_"):
-        # Extract plant name from callback data
-        plant_name = callback_data[12:]  # Remove "plant_light_" prefix
-        
-        # Try to get plant from database
-        plant = db.get_plant_by_name(plant_name)
-        light_info = None
-        
-        if plant and 'extra_data' in plant and 'light' in plant['extra_data']:
-            light_info = plant['extra_data']['light']
+    # Try to get plant from database
+    plant = db.get_plant_by_name(plant_name)
+    
+    if plant:
+        # Format plant information
+        extra = plant.get('extra_data') or {}
+        message = (
+            MessageBuilder()
+            .title(plant['name'], "🌿")
+            .field("Научное название", plant.get('scientific_name'))
+            .field("Описание", plant.get('description'), block=True)
+            .field("Рекомендации по уходу", plant.get('care_tips'), block=True)
+            .field("Освещение", extra.get('light'), block=True)
+            .field("Полив", extra.get('watering'), block=True)
+            .field("Температура", extra.get('temperature'), block=True)
+            .field("Почва", extra.get('soil'), block=True)
+        )
         
-        if light_info:
+        await edit_message_parts(query, message, get_plant_actions_keyboard(plant_name))
+    else:
+        # If plant not in database, use AI to get information
+        prompt = f"Дай информацию о растении {plant_name}. Включи научное название, описание, особенности."
+        
+        # Send typing action
+        await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
+        
+        try:
+            response, _ = await ai_service.complete(prompt, max_tokens=800)
+            message = MessageBuilder().title("Информация о растении", "🌿").markdown(response)
+            await edit_message_parts(query, message, get_plant_actions_keyboard(plant_name))
+        except Exception as e:
+            logging.error(f"Error getting plant info: {e}")
             await query.edit_message_text(
-                f"☀️ *Освещение для {plant_name}*\n\n{light_info}",
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=get_plant_actions_keyboard(plant_name)
+                f"Не удалось получить подробную информацию о растении {plant_name}.",
+                reply_markup=get_plants_menu_keyboard()
             )
-        else:
-            # If light info not in database, use AI to get information
-            prompt = f"Какое освещение требуется для растения {plant_name}? Дай подробные рекомендации."
-            
-            # Send typing action
-            await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-            
-            try:
-                response = await ai_service.generate_response(prompt, max_tokens=500)
-                response = clean_markdown(response)
-                
-                await query.edit_message_text(
-                    f"☀️ *Освещение для {plant_name}*\n\n{response}",
-                    parse_mode=ParseMode.MARKDOWN,
-                    reply_markup=get_plant_actions_keyboard(plant_name)
-                )
-            except Exception as e:
-                logging.error(f"Error getting light info: {e}")
-                await query.edit_message_text(
-                    f"Не удалось получить информацию об освещении для {plant_name}.",
-                    reply_markup=get_plant_actions_keyboard(plant_name)
-                )
-        
-        db.update_user_interaction(user_id, "plant_light", plant_name)
     
-    elif callback_data.startswith("plant_temp_"):
-        # Extract plant name from callback data
-        plant_name = callback_data[11:]  # Remove "plant_temp_" prefix
-        
-        # Try to get plant from database
-        plant = db.get_plant_by_name(plant_name)
-        temp_info = None
-        
-        if plant and 'extra_data' in plant and 'temperature' in plant['extra_data']:
-            temp_info = plant['extra_data']['temperature']
-        
-        if temp_info:
-            await query.edit_message_text(
-                f"🌡️ *Температура для {plant_name}*\n\n{temp_info}",
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=get_plant_actions_keyboard(plant_name)
-            )
-        else:
-            # If temperature info not in database, use AI to get information
-            prompt = f"Какая температура требуется для растения {plant_name}? Дай подробные рекомендации."
-            
-            # Send typing action
-            await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-            
-            try:
-                response = await ai_service.generate_response(prompt, max_tokens=500)
-                response = clean_markdown(response)
-                
-                await query.edit_message_text(
-                    f"🌡️ *Температура для {plant_name}*\n\n{response}",
-                    parse_mode=ParseMode.MARKDOWN,
-                    reply_markup=get_plant_actions_keyboard(plant_name)
-                )
-            except Exception as e:
-                logging.error(f"Error getting temperature info: {e}")
-                await query.edit_message_text(
-                    f"Не удалось получить информацию о температуре для {plant_name}.",
-                    reply_markup=get_plant_actions_keyboard(plant_name)
-                )
-        
-        db.update_user_interaction(user_id, "plant_temperature", plant_name)
+    db.update_user_interaction(update.effective_user.id, "plant_info", plant_name)
+
+
+# Buttons of the plant actions keyboard: callback prefix -> where the answer
+# comes from (extra_data key of the plant, care tips renderer, AI prompt)
+PLANT_TOPICS = {
+    "plant_water_": {
+        "extra_key": "watering",
+        "render": "watering",
+        "title": "💧 *Полив для {plant}*",
+        "prompt": "Как правильно поливать растение {plant}? Дай подробные рекомендации по поливу.",
+        "max_tokens": 500,
+        "error": "Не удалось получить информацию о поливе для {plant}.",
+        "interaction": "plant_water",
+    },
+    "plant_light_": {
+        "extra_key": "light",
+        "render": "light",
+        "title": "☀️ *Освещение для {plant}*",
+        "prompt": "Какое освещение требуется для растения {plant}? Дай подробные рекомендации.",
+        "max_tokens": 500,
+        "error": "Не удалось получить информацию об освещении для {plant}.",
+        "interaction": "plant_light",
+    },
+    "plant_temp_": {
+        "extra_key": "temperature",
+        "render": "temperature",
+        "title": "🌡️ *Температура для {plant}*",
+        "prompt": "Какая температура требуется для растения {plant}? Дай подробные рекомендации.",
+        "max_tokens": 500,
+        "error": "Не удалось получить информацию о температуре для {plant}.",
+        "interaction": "plant_temperature",
+    },
+    "plant_soil_": {
+        "extra_key": "soil",
+        "render": "soil",
+        "title": "🌱 *Почва для {plant}*",
+        "prompt": "Какая почва требуется для растения {plant}? Дай подробные рекомендации.",
+        "max_tokens": 500,
+        "error": "Не удалось получить информацию о почве для {plant}.",
+        "interaction": "plant_soil",
+    },
+    "plant_problems_": {
+        "extra_key": "common_problems",
+        "render": "problems",
+        "title": "🩺 *Проблемы и болезни {plant}*",
+        "prompt": "Какие распространенные проблемы и болезни бывают у растения {plant}? Дай подробное описание и методы лечения.",
+        "max_tokens": 600,
+        "error": "Не удалось получить информацию о проблемах для {plant}.",
+        "interaction": "plant_problems",
+    },
+}
+
+# Answers to the most requested PLANT_TOPICS, generated during off-peak hours
+answer_prewarmer = AnswerPrewarmer(db, ai_service, PLANT_TOPICS)
+
+
+async def show_plant_topic(update: Update, context: ContextTypes.DEFAULT_TYPE, plant_name: str, topic: dict) -> None:
+    """Answer a plant actions button (watering, light, ...) from PLANT_TOPICS"""
+    query = update.callback_query
     
-    elif callback_data.startswith("plant_soil_"):
-        # Extract plant name from callback data
-        plant_name = callback_data[11:]  # Remove "plant_soil_" prefix
-        
-        # Try to get plant from database
-        plant = db.get_plant_by_name(plant_name)
-        soil_info = None
-        
-        if plant and 'extra_data' in plant and 'soil' in plant['extra_data']:
-            soil_info = plant['extra_data']['soil']
-        
-        if soil_info:
-            await query.edit_message_text(
-                f"🌱 *Почва для {plant_name}*\n\n{soil_info}",
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=get_plant_actions_keyboard(plant_name)
-            )
-        else:
-            # If soil info not in database, use AI to get information
-            prompt = f"Какая почва требуется для растения {plant_name}? Дай подробные рекомендации."
-            
-            # Send typing action
-            await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-            
-            try:
-                response = await ai_service.generate_response(prompt, max_tokens=500)
-                response = clean_markdown(response)
-                
-                await query.edit_message_text(
-                    f"🌱 *Почва для {plant_name}*\n\n{response}",
-                    parse_mode=ParseMode.MARKDOWN,
-                    reply_markup=get_plant_actions_keyboard(plant_name)
-                )
-            except Exception as e:
-                logging.error(f"Error getting soil info: {e}")
-                await query.edit_message_text(
-                    f"Не удалось получить информацию о почве для {plant_name}.",
-                    reply_markup=get_plant_actions_keyboard(plant_name)
-                )
-        
-        db.update_user_interaction(user_id, "plant_soil", plant_name)
+    # Try to get plant from database
+    plant = db.get_plant_by_name(plant_name)
+    info = None
     
-    elif callback_data.startswith("plant_problems_"):
-        # Extract plant name from callback data
-        plant_name = callback_data[15:]  # Remove "plant_problems_" prefix
-        
-        # Try to get plant from database
-        plant = db.get_plant_by_name(plant_name)
-        problems_info = None
-        
-        if plant and 'extra_data' in plant and 'common_problems' in plant['extra_data']:
-            problems_info = plant['extra_data']['common_problems']
-        
-        if problems_info:
+    if plant and 'extra_data' in plant and topic["extra_key"] in plant['extra_data']:
+        info = plant['extra_data'][topic["extra_key"]]
+    else:
+        # Prerendered section from the care tips catalog, before asking the AI
+        info = services.plant_care.render(plant_name, fmt=topic["render"])
+    
+    if not info:
+        # Answer generated earlier (off-peak or for another user)
+        answer = db.get_ai_answer(answer_key(plant_name, topic))
+        info = answer["text"] if answer else None
+    
+    if not info:
+        # Send typing action
+        await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
+        
+        try:
+            info, tokens = await ai_service.complete(topic["prompt"].format(plant=plant_name), max_tokens=topic["max_tokens"])
+            db.save_ai_answer(answer_key(plant_name, topic), info, AI_ANSWER_TTL_HOURS,
+                              plant_name=plant_name, section=topic["interaction"], tokens=tokens,
+                              source="on_demand")
+        except Exception as e:
+            logging.error(f"Error getting {topic['interaction']} info: {e}")
             await query.edit_message_text(
-                f"🩺 *Проблемы и болезни {plant_name}*\n\n{problems_info}",
-                parse_mode=ParseMode.MARKDOWN,
+                topic["error"].format(plant=plant_name),
                 reply_markup=get_plant_actions_keyboard(plant_name)
             )
-        else:
-            # If problems info not in database, use AI to get information
-            prompt = f"Какие распространенные проблемы и болезни бывают у растения {plant_name}? Дай подробное описание и методы лечения."
-            
-            # Send typing action
-            await context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-            
-            try:
-                response = await ai_service.generate_response(prompt, max_tokens=600)
-                response = clean_markdown(response)
-                
-                await query.edit_message_text(
-                    f"🩺 *Проблемы и болезни {plant_name}*\n\n{response}",
-                    parse_mode=ParseMode.MARKDOWN,
-                    reply_markup=get_plant_actions_keyboard(plant_name)
-                )
-            except Exception as e:
-                logging.error(f"Error getting problems info: {e}")
-                await query.edit_message_text(
-                    f"Не удалось получить информацию о проблемах для {plant_name}.",
-                    reply_markup=get_plant_actions_keyboard(plant_name)
-                )
-        
-        db.update_user_interaction(user_id, "plant_problems", plant_name)
-    
-    elif callback_data.startswith("waste_"):
-        waste_type = callback_data[6:].replace("_", " ")
-        
-        if waste_type == "eggshell":
-            waste_type = "яичная скорлупа"
-        elif waste_type == "banana":
-            waste_type = "банановая кожура"
-        elif waste_type == "coffee":
-            waste_type = "кофейная гуща"
-        elif waste_type == "tea":
-            waste_type = "чайная заварка"
-        
-        plant_tip = db.get_plant_tip_by_waste(waste_type)
-        
-        if plant_tip:
-            await query.edit_message_text(
-                format_plant_tip(plant_tip, detailed=True),
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=get_back_keyboard("plants_menu")
-            )
-        else:
-            await query.edit_message_text(
-                f"Информация о использовании {waste_type} не найдена.",
-                reply_markup=get_back_keyboard("plants_menu")
-            )
-        
-        db.update_user_interaction(user_id, "plants")
+            info = None
     
-    # AI Consultant section
-    elif callback_data == "ai_consultant_menu":
-        await show_ai_menu(update, context)
+    if info is not None:
+        message = MessageBuilder().markdown(topic['title'].format(plant=plant_name)).markdown(info)
+        await edit_message_parts(query, message, get_plant_actions_keyboard(plant_name))
     
-    elif callback_data == "ai_general_question":
-        return await start_ai_general_question(update, context)
+    db.update_user_interaction(update.effective_user.id, topic["interaction"], plant_name)
+
+
+# Callback codes of the waste buttons
+WASTE_TYPES = {
+    "eggshell": "яичная скорлупа",
+    "banana": "банановая кожура",
+    "coffee": "кофейная гуща",
+    "tea": "чайная заварка",
+}
+
+
+def parse_waste_type(code: str) -> str:
+    code = code.replace("_", " ")
+    return WASTE_TYPES.get(code, code)
+
+
+async def show_waste_tip(update: Update, context: ContextTypes.DEFAULT_TYPE, waste_type: str) -> None:
+    """Show how to use a kind of household waste for plants"""
+    plant_tip = db.get_plant_tip_by_waste(waste_type)
     
-    elif callback_data == "ai_vitamin_recommend":
-        return await start_ai_vitamin_recommendation(update, context)
+    if plant_tip:
+        await update.callback_query.edit_message_text(
+            format_plant_tip(plant_tip, detailed=True),
+            parse_mode=ParseMode.MARKDOWN_V2,
+            reply_markup=get_back_keyboard("plants_menu")
+        )
+    else:
+        await update.callback_query.edit_message_text(
+            f"Информация о использовании {waste_type} не найдена.",
+            reply_markup=get_back_keyboard("plants_menu")
+        )
     
-    elif callback_data == "ai_plant_analysis":
-        return await start_ai_plant_analysis(update, context)
+    db.update_user_interaction(update.effective_user.id, "plants")
+
+
+async def show_faq_answer(update: Update, context: ContextTypes.DEFAULT_TYPE, faq_id: str) -> None:
+    """Show one FAQ entry"""
+    faq_text = format_faq(faq_id)
     
-    # FAQ section
-    elif callback_data.startswith("faq_"):
-        faq_id = callback_data[4:]
-        faq_text = format_faq(faq_id)
-        
-        if faq_text:
-            await query.edit_message_text(
-                faq_text,
-                parse_mode=ParseMode.MARKDOWN,
-                reply_markup=get_back_keyboard("faq_menu")
-            )
-        else:
-            await query.edit_message_text(
-                "Информация не найдена.",
-                reply_markup=get_back_keyboard("faq_menu")
-            )
-        
-        db.update_user_interaction(user_id, "faq")
-        
-    elif callback_data == "faq_menu":
-        await show_faq(update, context)
+    if faq_text:
+        await update.callback_query.edit_message_text(
+            faq_text,
+            parse_mode=ParseMode.MARKDOWN,
+            reply_markup=get_back_keyboard("faq_menu")
+        )
+    else:
+        await update.callback_query.edit_message_text(
+            "Информация не найдена.",
+            reply_markup=get_back_keyboard("faq_menu")
+        )
     
-    # Problems section
-    elif callback_data == "problems_menu":
-        await show_problems_menu(update, context)
-    elif callback_data in ["vitamin_problems", "plant_problems"]:
-        context.user_data['problem_type'] = "vitamin" if callback_data == "vitamin_problems" else "plant"
-        return await start_problem_description(update, context)
+    db.update_user_interaction(update.effective_user.id, "faq")
+
+
+async def start_problem_type(update: Update, context: ContextTypes.DEFAULT_TYPE, problem_type: str) -> int:
+    """Ask the user to describe a vitamin or plant problem"""
+    context.user_data['problem_type'] = problem_type
+    return await start_problem_description(update, context)
 
 
 async def start_problem_description(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -1248,21 +1154,106 @@ async def handle_problem_description(update: Update, context: ContextTypes.DEFAU
     # Format analysis
     formatted_analysis = format_problem_analysis(analysis, problem_type)
     
-    # Clean response to ensure proper formatting
-    formatted_analysis = clean_markdown(formatted_analysis)
-    
     # Send analysis
-    await context.bot.send_message(
-        chat_id=update.effective_chat.id,
-        text=formatted_analysis,
-        parse_mode=ParseMode.MARKDOWN
-    )
+    await send_message_parts(context, update.effective_chat.id, MessageBuilder().raw(formatted_analysis))
+
+
+# Inline keyboard callbacks. Exact payloads take precedence over prefixes,
+# so e.g. "faq_menu" and "vitamin_problems" are not taken for a FAQ entry
+# or a vitamin.
+callback_router = Router()
+callback_router.exact("cancel_operation", cancel_operation)
+callback_router.exact("main_menu", show_main_menu_inline)
+callback_router.exact("feedback", start_feedback)
+
+# Vitamins section
+callback_router.exact("vitamins_menu", show_vitamins_menu)
+callback_router.exact("vitamins_all", show_all_vitamins)
+callback_router.prefix("vitamin_", partial(show_vitamin, not_found="Информация о {name} не найдена."),
+                       parse=lambda code: "Витамин " + code.upper())
+callback_router.prefix("mineral_", partial(show_vitamin, not_found="Информация о минерале {name} не найдена."),
+                       parse=str.capitalize)
+
+# Plants section
+callback_router.exact("plants_menu", show_plants_menu)
+callback_router.exact("plants_all", show_all_plant_tips)
+callback_router.prefix("plant_info_", show_plant_info)
+for prefix, topic in PLANT_TOPICS.items():
+    callback_router.prefix(prefix, partial(show_plant_topic, topic=topic))
+callback_router.prefix("waste_", show_waste_tip, parse=parse_waste_type)
+
+# AI Consultant section
+callback_router.exact("ai_consultant_menu", show_ai_menu)
+callback_router.exact("ai_general_question", start_ai_general_question)
+callback_router.exact("ai_vitamin_recommend", start_ai_vitamin_recommendation)
+callback_router.exact("ai_plant_analysis", start_ai_plant_analysis)
+
+# FAQ section
+callback_router.exact("faq_menu", show_faq)
+callback_router.prefix("faq_", show_faq_answer)
+
+# Problems section
+callback_router.exact("problems_menu", show_problems_menu)
+callback_router.exact("vitamin_problems", start_problem_type, "vitamin")
+callback_router.exact("plant_problems", start_problem_type, "plant")
+
+# Reply keyboard buttons
+menu_router = Router()
+menu_router.exact("🍏 Витамины и минералы", show_vitamins_menu)
+menu_router.exact("🌱 Уход за растениями", show_plants_menu)
+menu_router.exact("🤖 AI Консультант", show_ai_menu)
+menu_router.exact("❓ FAQ", show_faq)
+menu_router.exact("📝 Обратная связь", start_feedback)
+menu_router.exact("🔍 Проблемы и решения", show_problems_menu)
+
+
+def check_update_mode() -> None:
+    """Fail early on an unknown BOT_MODE or an incomplete webhook setup"""
+    if BOT_MODE not in ("polling", "webhook"):
+        raise ValueError(f"Unknown BOT_MODE {BOT_MODE!r}, expected 'polling' or 'webhook'")
+    if BOT_MODE == "webhook" and not (WEBHOOK_URL and WEBHOOK_SECRET):
+        raise ValueError("BOT_MODE=webhook requires WEBHOOK_URL and WEBHOOK_SECRET")
+
+
+async def start_receiving_updates(application: Application) -> None:
+    """Start long polling or the webhook server, depending on BOT_MODE"""
+    if BOT_MODE == "webhook":
+        webhook_url = f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH.strip('/')}"
+        # Registers the webhook with Telegram and serves it; updates without
+        # the secret token header are rejected
+        await application.updater.start_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH.strip('/'),
+            webhook_url=webhook_url,
+            secret_token=WEBHOOK_SECRET,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=ALLOWED_UPDATES
+        )
+        logging.info(f"Receiving updates via webhook {webhook_url} on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}")
+    else:
+        # Deletes a webhook left from webhook mode, Telegram then keeps its
+        # pending updates for polling
+        await application.updater.start_polling(allowed_updates=ALLOWED_UPDATES)
+        logging.info("Receiving updates via long polling")
 
 
 async def main() -> None:
     """Start the bot"""
-    # Create the Application
-    application = Application.builder().token(BOT_TOKEN).build()
+    check_update_mode()
+    
+    # Create the Application; updates from different chats are handled
+    # concurrently so a slow AI call only delays its own chat, and user_data
+    # and conversation states survive restarts. Outgoing messages are paced
+    # to Telegram's limits
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .concurrent_updates(ChatOrderedUpdateProcessor(MAX_CONCURRENT_UPDATES))
+        .persistence(SQLitePersistence())
+        .rate_limiter(BotRateLimiter())
+        .build()
+    )
     
     # Add command handlers
     application.add_handler(CommandHandler("start", start))
@@ -1271,6 +1262,10 @@ async def main() -> None:
     application.add_handler(CommandHandler("plants", show_plants_menu))
     application.add_handler(CommandHandler("ai", show_ai_menu))
     application.add_handler(CommandHandler("feedback", start_feedback))
+    application.add_handler(CommandHandler("stats", stats_command))
+    application.add_handler(CommandHandler("addplant", add_plant_command))
+    application.add_handler(CommandHandler("myplants", my_plants_command))
+    application.add_handler(CommandHandler("removeplant", remove_plant_command))
     
     # Add feedback conversation handler
     feedback_conv_handler = ConversationHandler(
@@ -1281,7 +1276,9 @@ async def main() -> None:
         states={
             FEEDBACK: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_feedback)]
         },
-        fallbacks=[CommandHandler("cancel", cancel_feedback)]
+        fallbacks=[CommandHandler("cancel", cancel_feedback)],
+        name="feedback",
+        persistent=True
     )
     application.add_handler(feedback_conv_handler)
     
@@ -1294,13 +1291,26 @@ async def main() -> None:
     # Add message handler (for text messages)
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_message))
     
-    # Start the bot with polling
     logging.info("Bot started")
     
+    # Open the database connection pool and load the care tips catalog
+    # (reloaded whenever its file changes) before taking updates, so
+    # handlers and the reminder scheduler find the database already probed;
+    # connect to the AI API in the background
+    await asyncio.get_running_loop().run_in_executor(None, services.warm_up, True)
+    asyncio.get_running_loop().create_task(services.warm_up_http())
+    
     # Start the bot
     await application.initialize()
     await application.start()
-    await application.updater.start_polling()
+    await start_receiving_updates(application)
+    
+    # Restore scheduled care reminders and start sending them
+    await asyncio.get_running_loop().run_in_executor(None, reminder_scheduler.load)
+    reminder_scheduler.start(application.bot)
+    
+    # Pre-generate AI answers for popular plant topics during off-peak hours
+    answer_prewarmer.start()
     
     logging.info("PLEXY бот запущен и готов к работе! Нажмите Ctrl+C для остановки.")
     
@@ -1322,7 +1332,14 @@ async def main() -> None:
     finally:
         # Stop the bot
         logging.info("Останавливаю бота...")
+        reminder_scheduler.stop()
+        answer_prewarmer.stop()
+        # Stop taking updates first; in webhook mode the webhook stays set so
+        # other instances keep receiving them
+        await application.updater.stop()
         await application.stop()
+        await application.shutdown()
+        await services.close()
         logging.info("Бот остановлен.")
 
 
@@ -0,0 +1,57 @@
+import logging
+from datetime import timedelta
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from rate_limiter import BULK, INTERACTIVE, LIMITED_METHODS, OutboundLimiter
+
+logger = logging.getLogger(__name__)
+
+# Times a request is retried after Telegram answers 429
+MAX_RETRIES = 3
+
+
+class BotRateLimiter(BaseRateLimiter):
+    """Rate limiter of bot.py's Application, backed by rate_limiter.OutboundLimiter
+
+    Requests that post or edit messages wait for the global and per-chat
+    buckets; other requests (getUpdates, answerCallbackQuery, ...) go
+    straight through. Bulk sends pass rate_limit_args=rate_limiter.BULK.
+    On a 429 the chat is paused for retry_after and the request retried.
+    """
+
+    def __init__(self, max_retries: int = MAX_RETRIES):
+        self.max_retries = max_retries
+        self.limiter = OutboundLimiter()
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def process_request(self, callback: Callable[..., Coroutine[Any, Any, Any]], args: Any,
+                              kwargs: Dict[str, Any], endpoint: str, data: Dict[str, Any],
+                              rate_limit_args: Optional[int]) -> Any:
+        limited = endpoint in LIMITED_METHODS
+        chat_id = data.get("chat_id")
+        priority = BULK if rate_limit_args == BULK else INTERACTIVE
+
+        for attempt in range(self.max_retries + 1):
+            if limited:
+                await self.limiter.acquire(chat_id, priority)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                logger.warning(f"Telegram asked to retry {endpoint} to {chat_id} after {retry_after}s")
+                self.limiter.pause(chat_id, retry_after)
+                if not limited:
+                    # Nothing to wait on in the limiter for these
+                    await self.limiter.acquire(chat_id, priority)
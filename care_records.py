@@ -0,0 +1,201 @@
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Optional, Tuple
+
+# Records are built from the plain JSON dicts of plant_care_tips.json and
+# convert back to equal dicts: absent keys stay absent (the slot is left
+# unset) and keys outside the schema are kept in an `extra` dict.
+
+_MISSING = object()
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _intern_list(values):
+    return tuple(_intern(value) for value in values)
+
+
+def _intern_keys(mapping):
+    return {_intern(key): value for key, value in mapping.items()}
+
+
+def _to_json(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_to_json(item) for item in value]
+    return value
+
+
+class Record(Mapping):
+    """Slotted record mirroring one of the care tip schemas
+
+    Subclasses list their JSON keys in FIELDS as (key, attribute) pairs.
+    Values of keys in INTERNED are interned (they repeat across tips), and
+    CONVERTERS maps keys to a function applied on load, e.g. to build nested
+    records. Records are read-only mappings keyed by the JSON keys, so code
+    written against the dict form keeps working.
+    """
+
+    __slots__ = ("extra",)
+
+    FIELDS: Tuple[Tuple[str, str], ...] = ()
+    INTERNED: frozenset = frozenset()
+    CONVERTERS: Dict[str, Any] = {}
+    _ATTRS: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ATTRS = dict(cls.FIELDS)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Record":
+        if isinstance(data, cls):
+            return data
+
+        record = cls.__new__(cls)
+        extra = None
+        for key, value in data.items():
+            attr = cls._ATTRS.get(key)
+            if attr is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+                continue
+            converter = cls.CONVERTERS.get(key)
+            if converter is not None and isinstance(value, (list, tuple, Mapping)):
+                value = converter(value)
+            elif key in cls.INTERNED:
+                value = _intern(value)
+            object.__setattr__(record, attr, value)
+        object.__setattr__(record, "extra", extra)
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        for key, attr in self.FIELDS:
+            value = getattr(self, attr, _MISSING)
+            if value is not _MISSING:
+                data[key] = _to_json(value)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key):
+        attr = self._ATTRS.get(key)
+        if attr is not None:
+            try:
+                return getattr(self, attr)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        for key, attr in self.FIELDS:
+            if hasattr(self, attr):
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_dict() == dict(other)
+
+    __hash__ = None
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Watering(Record):
+    __slots__ = ("frequency", "amount", "method", "seasonal_adjustments")
+    FIELDS = (("frequency", "frequency"), ("amount", "amount"), ("method", "method"),
+              ("seasonal_adjustments", "seasonal_adjustments"))
+    INTERNED = frozenset({"frequency", "amount"})
+    CONVERTERS = {"seasonal_adjustments": _intern_keys}
+
+
+class Light(Record):
+    __slots__ = ("type", "hours", "direction", "additional_info")
+    FIELDS = (("type", "type"), ("hours", "hours"), ("direction", "direction"),
+              ("additional_info", "additional_info"))
+    INTERNED = frozenset({"type", "hours", "direction"})
+
+
+class Soil(Record):
+    __slots__ = ("type", "ph", "drainage", "composition")
+    FIELDS = (("type", "type"), ("ph", "ph"), ("drainage", "drainage"), ("composition", "composition"))
+    INTERNED = frozenset({"type", "ph", "drainage"})
+
+
+class Fertilizer(Record):
+    __slots__ = ("frequency", "type", "strength", "seasonal", "special_needs")
+    FIELDS = (("frequency", "frequency"), ("type", "type"), ("strength", "strength"),
+              ("seasonal", "seasonal"), ("special_needs", "special_needs"))
+    INTERNED = frozenset({"frequency", "type", "strength", "seasonal", "special_needs"})
+
+
+class Temperature(Record):
+    __slots__ = ("optimal", "min", "max", "special_requirements")
+    FIELDS = (("optimal", "optimal"), ("min", "min"), ("max", "max"),
+              ("special_requirements", "special_requirements"))
+    INTERNED = frozenset({"optimal", "min", "max"})
+
+
+class Humidity(Record):
+    __slots__ = ("optimal", "methods", "special_requirements")
+    FIELDS = (("optimal", "optimal"), ("methods", "methods"), ("special_requirements", "special_requirements"))
+    INTERNED = frozenset({"optimal"})
+    CONVERTERS = {"methods": _intern_list}
+
+
+class CommonProblem(Record):
+    __slots__ = ("title", "solution")
+    FIELDS = (("название", "title"), ("решение", "solution"))
+
+
+def _problems(values):
+    return tuple(CommonProblem.from_dict(value) for value in values)
+
+
+class PlantCareTip(Record):
+    """A plant care tip, see PLANT_CARE_TIP_SCHEMA"""
+
+    __slots__ = ("name", "scientific_name", "category", "description", "origin", "watering", "light",
+                 "soil", "fertilizer", "temperature", "humidity", "pruning", "propagation",
+                 "common_problems", "toxicity", "seasonal_care", "difficulty", "tips", "aliases",
+                 "last_updated")
+    FIELDS = tuple((key, key) for key in __slots__)
+    INTERNED = frozenset({"category", "origin", "difficulty"})
+    CONVERTERS = {
+        "watering": Watering.from_dict,
+        "light": Light.from_dict,
+        "soil": Soil.from_dict,
+        "fertilizer": Fertilizer.from_dict,
+        "temperature": Temperature.from_dict,
+        "humidity": Humidity.from_dict,
+        "propagation": _intern_list,
+        "common_problems": _problems,
+        "toxicity": _intern_keys,
+        "seasonal_care": _intern_keys,
+        "tips": tuple,
+        "aliases": tuple,
+    }
+
+
+def to_record(tip: Optional[Mapping]) -> Optional[PlantCareTip]:
+    """Convert a care tip dict to a record (records are returned as is)"""
+    return None if tip is None else PlantCareTip.from_dict(tip)
@@ -7,12 +7,74 @@ load_dotenv()
 # Telegram Bot API Token
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 
+# Telegram user IDs allowed to use admin commands such as /stats (comma-separated)
+ADMIN_IDS = {int(user_id) for user_id in os.getenv("ADMIN_IDS", "").split(",") if user_id.strip()}
+
 # MongoDB Connection
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 DB_NAME = os.getenv("DB_NAME", "info_bot_db")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "2"))
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_HEALTH_CHECK_INTERVAL = float(os.getenv("MONGO_HEALTH_CHECK_INTERVAL", "30"))
+
+# Storage backend: "mongo" (default) or "sqlite" for the embedded local store
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/local.db")
 
 # Collection names
 VITAMINS_COLLECTION = "vitamins"
 PLANTS_COLLECTION = "plants"
 USERS_COLLECTION = "users"
-FEEDBACK_COLLECTION = "feedback" 
\ No newline at end of file
+FEEDBACK_COLLECTION = "feedback"
+STATS_DAILY_COLLECTION = "stats_daily"
+USER_PLANTS_COLLECTION = "user_plants"
+REMINDERS_COLLECTION = "reminders"
+AI_ANSWERS_COLLECTION = "ai_answers"
+
+# Keep-alive connections to the AI API per process
+AI_HTTP_POOL_SIZE = int(os.getenv("AI_HTTP_POOL_SIZE", "20"))
+
+# Care reminders: local hour they are sent at, reminders fired per batch,
+# and the sending rate (Telegram allows about 30 messages per second)
+REMINDER_HOUR = int(os.getenv("REMINDER_HOUR", "10"))
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "100"))
+REMINDER_MAX_PER_SECOND = float(os.getenv("REMINDER_MAX_PER_SECOND", "20")) 
+
+# Prewarming of AI answers for the most requested plant topics: the off-peak
+# window (local hours, end exclusive), the token budget of one run, how many
+# plant/topic answers to consider, and how long generated answers are served
+PREWARM_START_HOUR = int(os.getenv("PREWARM_START_HOUR", "3"))
+PREWARM_END_HOUR = int(os.getenv("PREWARM_END_HOUR", "6"))
+PREWARM_TOKEN_BUDGET = int(os.getenv("PREWARM_TOKEN_BUDGET", "50000"))
+PREWARM_MAX_ANSWERS = int(os.getenv("PREWARM_MAX_ANSWERS", "100"))
+AI_ANSWER_TTL_HOURS = float(os.getenv("AI_ANSWER_TTL_HOURS", "72"))
+
+# Where bot.py keeps user_data and conversation states between restarts, and
+# how often (seconds) changes are written there
+PERSISTENCE_PATH = os.getenv("PERSISTENCE_PATH", "data/bot_state.db")
+PERSISTENCE_INTERVAL = float(os.getenv("PERSISTENCE_INTERVAL", "5"))
+
+# Updates handled at the same time by bot.py (updates from one chat are still
+# handled one after another)
+MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", "32"))
+
+# How bot.py receives updates: "polling" (default) or "webhook". In webhook
+# mode Telegram posts updates to WEBHOOK_URL/WEBHOOK_PATH, served by an
+# embedded HTTP server on WEBHOOK_LISTEN:WEBHOOK_PORT; requests without the
+# WEBHOOK_SECRET header are rejected. Several instances can share the URL
+# behind a load balancer if they use the same secret.
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+
+# Updates webhook_server.py accepts but has not finished processing; above
+# this it answers 503 and Telegram delivers the update again later
+WEBHOOK_MAX_PENDING_UPDATES = int(os.getenv("WEBHOOK_MAX_PENDING_UPDATES", "1000"))
+
+# Update types Telegram sends to bot.py (comma-separated), in both modes
+ALLOWED_UPDATES = [kind.strip() for kind in os.getenv("ALLOWED_UPDATES", "message,callback_query").split(",") if kind.strip()]
\ No newline at end of file
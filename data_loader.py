@@ -1,95 +1,123 @@
+import argparse
+import hashlib
+import json
+import os
+
 from database import Database
-from plant_care_tips import plant_care_manager
+import plant_care_tips
 
-def load_initial_vitamin_data(db):
-    """Load initial vitamin data into the database"""
-    # Clear existing data
-    db.vitamins.delete_many({})
+# Seed files: one JSON document per line (NDJSON) or a JSON array
+SEED_DIR = os.path.join("data", "seed")
+VITAMINS_SEED_PATH = os.path.join(SEED_DIR, "vitamins.ndjson")
+WASTE_TIPS_SEED_PATH = os.path.join(SEED_DIR, "waste_tips.ndjson")
+
+# Field storing the content hash of the seed record a document came from
+SEED_HASH_FIELD = "seed_hash"
+
+
+def iter_seed_records(path):
+    """Stream records from an NDJSON file, or from a JSON array file"""
+    if path.endswith(".json"):
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        yield from records
+        return
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def record_hash(record):
+    """Content hash of a seed record, independent of key order"""
+    canonical = json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def seed_collection(db, collection, records, key, batch_size=500):
+    """Incrementally upsert seed records, writing only new or changed ones
+    
+    Existing documents are never deleted, so the collection stays readable
+    while seeding and re-running the seeder is a no-op.
+    
+    Args:
+        db: Database instance
+        collection: Collection to seed
+        records (iterable): Seed records, consumed lazily
+        key (str): Field identifying a record, e.g. "name"
+        batch_size (int): Number of records compared and written per batch
+        
+    Returns:
+        dict: Counts of "inserted", "updated" and "unchanged" records
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    batch = {}
     
-    # Sample vitamin data
-    vitamins_data = [
-        {
-            "name": "Витамин A",
-            "aliases": ["Ретинол", "Каротин"],
-            "short_description": "Жирорастворимый витамин, необходимый для зрения, иммунитета и здоровья кожи.",
-            "description": "Витамин A — группа жирорастворимых ретиноидов, включающая ретинол, ретиналь и ретиноевую кислоту. Играет важную роль в формировании и поддержании здоровья органов зрения, кожи, иммунной системы.",
-            "functions": "• Поддержание нормального зрения\n• Поддержка иммунной системы\n• Участие в делении и дифференциации клеток\n• Поддержание здоровья кожи и слизистых оболочек",
-            "deficiency_signs": "• Ухудшение сумеречного зрения (куриная слепота)\n• Сухость кожи и слизистых оболочек\n• Повышенная восприимчивость к инфекциям\n• Нарушение роста у детей",
-            "overdose_signs": "• Тошнота и рвота\n• Головная боль и головокружение\n• Раздражительность\n• Выпадение волос\n• В тяжелых случаях — поражение печени",
-            "daily_dose": "Взрослые: 900 мкг (мужчины), 700 мкг (женщины)\nДети 1-3 года: 300 мкг\nДети 4-8 лет: 400 мкг\nДети 9-13 лет: 600 мкг",
-            "sources": "• Печень трески и других рыб\n• Морковь, тыква, сладкий картофель\n• Шпинат, капуста, брокколи\n• Яичный желток\n• Сливочное масло\n• Сыр"
-        },
-        {
-            "name": "Витамин C",
-            "aliases": ["Аскорбиновая кислота"],
-            "short_description": "Водорастворимый витамин, необходимый для иммунитета, заживления ран и антиоксидантной защиты.",
-            "description": "Витамин C (аскорбиновая кислота) — важный водорастворимый витамин и мощный антиоксидант. Организм человека не способен самостоятельно синтезировать витамин C, поэтому необходимо получать его с пищей.",
-            "functions": "• Синтез коллагена и соединительной ткани\n• Антиоксидантная защита\n• Укрепление иммунитета\n• Улучшение усвоения железа из растительной пищи\n• Участие в синтезе некоторых гормонов и нейромедиаторов",
-            "deficiency_signs": "• Кровоточивость десен\n• Медленное заживление ран\n• Частые простудные заболевания\n• Сухость кожи\n• При сильном дефиците — цинга",
-            "overdose_signs": "• Расстройство желудка, диарея\n• Тошнота\n• Спазмы в животе\n• Головная боль\n• Повышенная возбудимость",
-            "daily_dose": "Взрослые: 75-90 мг\nПодростки: 65-75 мг\nДети 1-3 года: 15 мг\nДети 4-8 лет: 25 мг\nДети 9-13 лет: 45 мг\nБеременные: 85 мг\nКормящие: 120 мг",
-            "sources": "• Цитрусовые фрукты (апельсины, лимоны, грейпфруты)\n• Киви\n• Клубника\n• Болгарский перец\n• Брокколи, капуста\n• Помидоры\n• Шиповник (лидер по содержанию витамина C)"
-        },
-        {
-            "name": "Кальций",
-            "aliases": ["Ca", "Calcium"],
-            "short_description": "Основной минерал для формирования костей и зубов, также необходим для работы нервной системы и мышц.",
-            "description": "Кальций — наиболее распространенный минерал в организме человека. Около 99% кальция содержится в костях и зубах, остальная часть циркулирует в крови и тканях, участвуя в важных физиологических процессах.",
-            "functions": "• Формирование и поддержание здоровья костей и зубов\n• Регуляция мышечных сокращений\n• Передача нервных импульсов\n• Участие в процессе свертывания крови\n• Регуляция сердечного ритма",
-            "deficiency_signs": "• Остеопороз (снижение плотности костной ткани)\n• Судороги в мышцах\n• Онемение и покалывание в пальцах\n• Нарушение сердечного ритма\n• У детей — рахит",
-            "overdose_signs": "• Запоры\n• Камни в почках\n• Нарушение усвоения других минералов (железа, цинка)\n• Повышенная утомляемость\n• В тяжелых случаях — гиперкальциемия",
-            "daily_dose": "Взрослые 19-50 лет: 1000 мг\nВзрослые 51+ лет: 1200 мг\nПодростки 9-18 лет: 1300 мг\nДети 4-8 лет: 1000 мг\nДети 1-3 года: 700 мг",
-            "sources": "• Молочные продукты (молоко, йогурт, сыр)\n• Рыбные консервы с костями (сардины, лосось)\n• Обогащенные растительные напитки (соевое, миндальное молоко)\n• Зеленые листовые овощи (капуста, брокколи)\n• Бобовые\n• Орехи (особенно миндаль)"
-        }
-    ]
+    for record in records:
+        batch[record[key]] = record
+        if len(batch) >= batch_size:
+            _seed_batch(db, collection, batch, key, counts)
+            batch = {}
     
-    # Insert data into the collection
-    db.vitamins.insert_many(vitamins_data)
-    print(f"Loaded {len(vitamins_data)} vitamin records")
+    if batch:
+        _seed_batch(db, collection, batch, key, counts)
+    
+    return counts
 
 
-def load_initial_plant_data(db):
-    """Load initial plant care data into the database"""
-    # Clear existing data
-    db.plants.delete_many({})
+def _seed_batch(db, collection, batch, key, counts):
+    # One query fetches the stored hashes for the whole batch
+    stored = {
+        doc[key]: doc.get(SEED_HASH_FIELD)
+        for doc in collection.find({key: {"$in": list(batch)}}, {key: True, SEED_HASH_FIELD: True})
+    }
     
-    # Sample plant care data
-    plants_data = [
-        {
-            "waste_type": "Яичная скорлупа",
-            "short_description": "Натуральный источник кальция и других микроэлементов для ваших растений.",
-            "description": "Яичная скорлупа — отличный источник кальция и других микроэлементов для растений. Кальций помогает растениям формировать крепкие клеточные стенки, стимулирует рост и помогает предотвратить такие проблемы, как вершинная гниль у томатов.",
-            "application": "1. Тщательно вымойте скорлупу и высушите ее\n2. Измельчите в порошок (можно использовать кофемолку)\n3. Внесите в почву при посадке или пересадке (1-2 столовые ложки на растение)\n4. Для комнатных растений: рассыпьте тонким слоем по поверхности почвы (1 чайная ложка) и слегка заделайте\n5. Можно настоять порошок в воде (2 столовые ложки на 1 литр) в течение 24-48 часов, затем процедить и использовать для полива",
-            "plants": "• Томаты и перцы (предотвращает вершинную гниль)\n• Розы и другие цветущие растения\n• Большинство комнатных растений (особенно полезно для кактусов и суккулентов)\n• Плодовые деревья и ягодные кустарники",
-            "precautions": "• Не используйте скорлупу от яиц с признаками плесени или гнили\n• Не добавляйте слишком много скорлупы в почву для растений, предпочитающих кислую среду (азалии, гортензии, рододендроны)\n• Измельчайте скорлупу как можно мельче для лучшего усвоения растениями\n• После внесения скорлупы в почву хорошо полейте растение"
-        },
-        {
-            "waste_type": "Кофейная гуща",
-            "short_description": "Отличное удобрение, улучшающее структуру почвы и обогащающее ее азотом.",
-            "description": "Кофейная гуща — ценное органическое удобрение, богатое азотом, калием и фосфором. Она также улучшает структуру почвы, удерживает влагу и может отпугивать некоторых вредителей, например, слизней и улиток.",
-            "application": "1. Высушите использованную кофейную гущу на воздухе (чтобы избежать плесени)\n2. Внесите в почву при посадке или пересадке (смешайте с грунтом в пропорции 1:4)\n3. Используйте как мульчу, распределив тонким слоем (не более 1 см) вокруг растений\n4. Можно добавить в компост (не более 20% от общего объема)\n5. Для жидкой подкормки: настаивайте 1 стакан гущи в 4 литрах воды в течение суток, затем процедите и используйте для полива",
-            "plants": "• Розы, гортензии и другие цветущие кустарники\n• Овощные культуры (томаты, перцы, баклажаны)\n• Декоративно-лиственные растения\n• Цитрусовые и другие комнатные растения, предпочитающие кислую почву",
-            "precautions": "• Не используйте на растениях, предпочитающих щелочную почву\n• Избегайте использования свежей гущи, так как она может содержать слишком много кофеина\n• Не применяйте слишком часто и в больших количествах\n• Кофейная гуща может привлекать домашних животных, поэтому будьте осторожны\n• При использовании в помещении гуща может покрыться плесенью — своевременно удаляйте ее"
-        },
-        {
-            "waste_type": "Банановая кожура",
-            "short_description": "Богатый источник калия, фосфора и других питательных веществ для подкормки растений.",
-            "description": "Банановая кожура содержит большое количество калия (около 42%), а также фосфор, кальций и магний — элементы, необходимые для здорового роста и цветения растений. Калий особенно полезен для стимуляции цветения и плодоношения.",
-            "application": "1. Нарезанная кожура: измельчите кожуру на мелкие кусочки и закопайте в почву на глубину 5-7 см\n2. Сушеная и измельченная кожура: высушите кожуру, измельчите в порошок и рассыпьте вокруг растений (1-2 столовые ложки)\n3. Банановый чай: замочите кожуру в воде на 24-48 часов, затем удалите кожуру и используйте настой для полива\n4. Компост: добавьте измельченную кожуру в компостную кучу",
-            "plants": "• Розы и другие цветущие растения\n• Томаты, перцы, огурцы и другие овощные культуры\n• Комнатные растения, особенно орхидеи\n• Плодовые деревья и ягодные кустарники",
-            "precautions": "• Закапывайте кожуру, а не оставляйте на поверхности, чтобы избежать привлечения мух и других насекомых\n• Не используйте слишком много — это может привести к избытку калия\n• Убедитесь, что кожура полностью разложилась в почве перед посадкой новых растений\n• Желательно использовать органические бананы, чтобы избежать пестицидов"
-        }
-    ]
+    operations = []
+    for value, record in batch.items():
+        content_hash = record_hash(record)
+        if stored.get(value) == content_hash:
+            counts["unchanged"] += 1
+            continue
+        
+        counts["updated" if value in stored else "inserted"] += 1
+        operations.append(db.update_operation(
+            {key: value},
+            {"$set": {**record, SEED_HASH_FIELD: content_hash}},
+            upsert=True
+        ))
     
-    # Insert data into the collection
-    db.plants.insert_many(plants_data)
-    print(f"Loaded {len(plants_data)} plant care records")
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+
+
+def load_initial_vitamin_data(db, path=VITAMINS_SEED_PATH):
+    """Load initial vitamin data into the database"""
+    counts = seed_collection(db, db.vitamins, iter_seed_records(path), key="name")
+    print(f"Vitamin records: {counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged")
+    return counts
+
+
+def load_initial_plant_data(db, path=WASTE_TIPS_SEED_PATH):
+    """Load initial plant care data into the database"""
+    counts = seed_collection(db, db.plants, iter_seed_records(path), key="waste_type")
+    print(f"Plant care records: {counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged")
+    return counts
+
+
+def import_plants(db, path):
+    """Upsert plants from an NDJSON or JSON array file by name, in batched bulk writes"""
+    counts = db.bulk_upsert_plants(iter_seed_records(path))
+    print(f"Imported plants: {counts['inserted']} inserted, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged, {counts['errors']} errors")
+    return counts
 
 
 def initialize_plant_care_tips():
     """Initialize the plant care tips database"""
     # This will automatically load initial plant care tips if the database file doesn't exist
-    tips_count = len(plant_care_manager.get_all_tips())
+    tips_count = len(plant_care_tips.warm().get_all_tips())
     print(f"Initialized plant care tips database with {tips_count} entries")
     return tips_count
 
@@ -99,6 +127,10 @@ def initialize_data():
     try:
         # Connect to the database
         db = Database()
+        db.warm_up()
+        if db.vitamins is None:
+            print("Database not available - skipping seeding")
+            return False
         
         # Load vitamins data
         load_initial_vitamin_data(db)
@@ -117,4 +149,10 @@ def initialize_data():
 
 
 if __name__ == "__main__":
-    initialize_data() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed the bot's database")
+    parser.add_argument("--import-plants", metavar="PATH",
+                        help="also upsert plants (dicts with a name) from an NDJSON or JSON array file")
+    args = parser.parse_args()
+    
+    if initialize_data() and args.import_plants:
+        import_plants(Database(), args.import_plants)
@@ -1,8 +1,14 @@
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 import logging
-from config import MONGO_URI, DB_NAME, VITAMINS_COLLECTION, PLANTS_COLLECTION, USERS_COLLECTION, FEEDBACK_COLLECTION
-from datetime import datetime
+import os
+import threading
+import time
+from config import (
+    MONGO_URI, DB_NAME, STORAGE_BACKEND, SQLITE_PATH,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_MIN_POOL_SIZE, MONGO_MAX_POOL_SIZE, MONGO_HEALTH_CHECK_INTERVAL,
+    VITAMINS_COLLECTION, PLANTS_COLLECTION, USERS_COLLECTION, FEEDBACK_COLLECTION, STATS_DAILY_COLLECTION,
+    USER_PLANTS_COLLECTION, REMINDERS_COLLECTION, AI_ANSWERS_COLLECTION
+)
+from datetime import datetime, timedelta
 
 # Sample data for when DB is not available
 SAMPLE_VITAMINS = [
@@ -49,39 +55,293 @@ SAMPLE_PLANTS = [
     }
 ]
 
-class Database:
-    """Database class for interacting with MongoDB"""
-    def __init__(self):
+# Section names as stats_daily field names, the same mapping as _stats_key
+# ("$" is wrapped in $literal so it is not read as a field path; needs MongoDB 4.4)
+STATS_KEY_EXPRESSION = {"$replaceAll": {
+    "input": {"$replaceAll": {"input": "$interactions.section", "find": ".", "replacement": "_"}},
+    "find": {"$literal": "$"},
+    "replacement": "_"
+}}
+
+# Server-side rollup of the users' interaction logs into stats_daily
+DAILY_STATS_PIPELINE = [
+    {"$unwind": "$interactions"},
+    {"$match": {"interactions.section": {"$type": "string", "$ne": ""}, "interactions.timestamp": {"$type": "date"}}},
+    {"$group": {
+        "_id": {
+            "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$interactions.timestamp"}},
+            "section": STATS_KEY_EXPRESSION
+        },
+        "count": {"$sum": 1},
+        "users": {"$addToSet": "$user_id"}
+    }},
+    {"$group": {
+        "_id": "$_id.date",
+        "interactions": {"$sum": "$count"},
+        "sections": {"$push": {"k": "$_id.section", "v": "$count"}},
+        "users": {"$push": "$users"}
+    }},
+    {"$project": {
+        "_id": 0,
+        "date": "$_id",
+        "interactions": 1,
+        "sections": {"$arrayToObject": "$sections"},
+        "active_users": {"$size": {"$reduce": {
+            "input": "$users",
+            "initialValue": [],
+            "in": {"$setUnion": ["$$value", "$$this"]}
+        }}}
+    }},
+    {"$merge": {"into": STATS_DAILY_COLLECTION, "on": "date", "whenMatched": "merge", "whenNotMatched": "insert"}}
+]
+
+
+def plant_topic_demand_pipeline(sections, since, limit):
+    """Server-side count of plant topic requests (section + plant name) since a date"""
+    return [
+        {"$match": {"interactions.section": {"$in": sections}}},
+        {"$unwind": "$interactions"},
+        {"$match": {
+            "interactions.section": {"$in": sections},
+            "interactions.timestamp": {"$gte": since},
+            "interactions.query": {"$type": "string"}
+        }},
+        {"$group": {
+            "_id": {"plant_name": "$interactions.query", "section": "$interactions.section"},
+            "count": {"$sum": 1}
+        }},
+        {"$sort": {"count": -1}},
+        {"$limit": limit},
+        {"$project": {"_id": 0, "plant_name": "$_id.plant_name", "section": "$_id.section", "count": 1}}
+    ]
+
+
+def _stats_key(section):
+    """Section names become field names in stats_daily, so strip characters MongoDB reserves"""
+    return str(section).replace(".", "_").replace("$", "_")
+
+
+class MongoConnection:
+    """Lazily created, per-process MongoDB client with a background health probe
+    
+    The client is only built on first use, without blocking on server selection,
+    and is rebuilt when the process id changes so forked workers never share the
+    parent's sockets. `available` is None until the first probe completes.
+    """
+    def __init__(self, uri, db_name):
+        self.uri = uri
+        self.db_name = db_name
+        self.available = None
+        self._client = None
+        self._pid = None
+        self._indexes_ready = False
+        self._lock = threading.Lock()
+        self._probe_thread = None
+    
+    def client(self):
+        """Return the MongoClient for the current process, creating it if needed"""
+        pid = os.getpid()
+        if self._client is None or self._pid != pid:
+            with self._lock:
+                if self._client is None or self._pid != pid:
+                    from pymongo import MongoClient
+                    
+                    # connect=False defers server selection to the first operation
+                    self._client = MongoClient(
+                        self.uri,
+                        connect=False,
+                        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                        minPoolSize=MONGO_MIN_POOL_SIZE,
+                        maxPoolSize=MONGO_MAX_POOL_SIZE
+                    )
+                    self._pid = pid
+                    self.available = None
+                    self._indexes_ready = False
+                    self._start_probe()
+        return self._client
+    
+    def database(self):
+        """Return the database handle for the current process"""
+        return self.client()[self.db_name]
+    
+    def ping(self):
+        """Check server availability and prepare indexes on the first success"""
+        from pymongo.errors import PyMongoError
+        
         try:
-            self.client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-            self.client.server_info()  # Will raise exception if cannot connect
-            
-            self.db = self.client[DB_NAME]
-            self.vitamins = self.db[VITAMINS_COLLECTION]
-            self.plants = self.db[PLANTS_COLLECTION]
-            self.users = self.db[USERS_COLLECTION]
-            self.feedback = self.db[FEEDBACK_COLLECTION]
-            
-            # Create indexes for faster lookups
-            self.vitamins.create_index("name")
-            self.plants.create_index("name")
-            self.plants.create_index("waste_type")
-            self.users.create_index("user_id", unique=True)
-            
+            self.client().admin.command("ping")
+        except PyMongoError as e:
+            if self.available is not False:
+                logging.error(f"MongoDB is not available: {e}")
+            self.available = False
+            return False
+        
+        if self.available is not True:
             logging.info("Connected to MongoDB")
-        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-            logging.error(f"Could not connect to MongoDB: {e}")
-            # Continue without database - app will handle missing database gracefully
-            self.client = None
-            self.db = None
-            self.vitamins = None
-            self.plants = None
-            self.users = None
-            self.feedback = None
+        self.available = True
+        
+        if not self._indexes_ready:
+            try:
+                create_indexes(self.database())
+                self._indexes_ready = True
+            except PyMongoError as e:
+                logging.error(f"Error creating MongoDB indexes: {e}")
+        return True
+    
+    def warm_up(self):
+        """Pre-open the connection pool so the first request does not pay for it"""
+        # Once a server is selected, the driver's pool maintenance opens
+        # minPoolSize sockets in the background
+        return self.ping()
+    
+    def _start_probe(self):
+        # With periodic checks disabled the probe still runs once, so that
+        # `available` gets set
+        self._probe_thread = threading.Thread(
+            target=self._probe_loop, args=(self._pid,), name="mongo-health-probe", daemon=True
+        )
+        self._probe_thread.start()
+    
+    def _probe_loop(self, pid):
+        while self._pid == pid:
+            self.ping()
+            if MONGO_HEALTH_CHECK_INTERVAL <= 0:
+                return
+            time.sleep(MONGO_HEALTH_CHECK_INTERVAL)
+
+
+def create_indexes(db):
+    """Create indexes for faster lookups"""
+    db[VITAMINS_COLLECTION].create_index("name")
+    _create_plant_name_index(db[PLANTS_COLLECTION])
+    db[PLANTS_COLLECTION].create_index("waste_type")
+    db[USERS_COLLECTION].create_index("user_id", unique=True)
+    db[STATS_DAILY_COLLECTION].create_index("date", unique=True)
+    db[USER_PLANTS_COLLECTION].create_index("key", unique=True)
+    db[USER_PLANTS_COLLECTION].create_index("user_id")
+    db[REMINDERS_COLLECTION].create_index("key", unique=True)
+    db[AI_ANSWERS_COLLECTION].create_index("key", unique=True)
+    # MongoDB drops expired answers itself; reads check expires_at either way
+    db[AI_ANSWERS_COLLECTION].create_index("expires_at", expireAfterSeconds=0)
+
+
+def _create_plant_name_index(plants):
+    """Make plant names a unique key so concurrent upserts cannot create duplicates"""
+    # Waste tips share the collection but have no name, hence the partial index
+    options = {"unique": True, "partialFilterExpression": {"name": {"$exists": True}}}
+    try:
+        plants.create_index("name", **options)
+    except Exception as e:
+        # Older deployments have a plain index on name with the same key pattern
+        logging.warning(f"Replacing non-unique index on plant names: {e}")
+        try:
+            plants.drop_index("name_1")
+            plants.create_index("name", **options)
+        except Exception as e:
+            # E.g. duplicate names already stored; upserts still work without it
+            logging.error(f"Could not create unique index on plant names: {e}")
+            plants.create_index("name")
+
+
+_mongo_connection = None
+
+
+def get_mongo_connection():
+    """Get the shared MongoDB connection of this process"""
+    global _mongo_connection
+    if _mongo_connection is None:
+        _mongo_connection = MongoConnection(MONGO_URI, DB_NAME)
+    return _mongo_connection
+
+
+class Database:
+    """Database class for interacting with MongoDB or the embedded SQLite store"""
+    def __init__(self):
+        self._local = None
+        self._mongo = None
+        
+        if STORAGE_BACKEND == "sqlite":
+            self._connect_local()
+        else:
+            # No I/O here: the client is created on first use
+            self._mongo = get_mongo_connection()
+    
+    def _connect_local(self):
+        """Open the embedded SQLite store, which implements the same collection API"""
+        from local_storage import LocalStore
+        
+        self._local = LocalStore(SQLITE_PATH)
+        create_indexes(self._local)
+        
+        # Full-text (FTS5) mirrors speed up the regex searches over these collections
+        self._local[VITAMINS_COLLECTION].create_index([("$**", "text")])
+        self._local[PLANTS_COLLECTION].create_index([("$**", "text")])
+    
+    def warm_up(self):
+        """Open the database connection ahead of the first request"""
+        if self._mongo is not None:
+            return self._mongo.warm_up()
+        return True
+    
+    @property
+    def client(self):
+        if self._mongo is None:
+            return None
+        return self._mongo.client()
+    
+    @property
+    def db(self):
+        """Database handle, or None while MongoDB is known to be unreachable
+        
+        Entry points call warm_up() before serving updates, so the first probe
+        has finished by the time handlers get here and they do not wait out
+        server selection while MongoDB is down.
+        """
+        if self._local is not None:
+            return self._local
+        if self._mongo.available is False:
+            return None
+        return self._mongo.database()
+    
+    def _collection(self, name):
+        db = self.db
+        return db[name] if db is not None else None
+    
+    @property
+    def vitamins(self):
+        return self._collection(VITAMINS_COLLECTION)
+    
+    @property
+    def plants(self):
+        return self._collection(PLANTS_COLLECTION)
+    
+    @property
+    def users(self):
+        return self._collection(USERS_COLLECTION)
+    
+    @property
+    def feedback(self):
+        return self._collection(FEEDBACK_COLLECTION)
+    
+    @property
+    def stats_daily(self):
+        return self._collection(STATS_DAILY_COLLECTION)
+    
+    @property
+    def user_plants(self):
+        return self._collection(USER_PLANTS_COLLECTION)
+    
+    @property
+    def reminders(self):
+        return self._collection(REMINDERS_COLLECTION)
+    
+    @property
+    def ai_answers(self):
+        return self._collection(AI_ANSWERS_COLLECTION)
     
     def register_user(self, user_id, username, first_name=None):
         """Register new user or update existing user info"""
-        if not self.users:
+        if self.users is None:
             logging.warning("Database not available - skipping user registration")
             return
         
@@ -103,6 +363,7 @@ class Database:
             )
             
             if result.upserted_id:
+                self._record_daily_stats({"new_users": 1})
                 logging.info(f"New user registered: {username} (ID: {user_id})")
             else:
                 logging.info(f"User info updated: {username} (ID: {user_id})")
@@ -111,18 +372,21 @@ class Database:
     
     def update_user_interaction(self, user_id, section, query=None):
         """Update user interaction metrics"""
-        if not self.users:
+        if self.users is None:
             logging.warning("Database not available - skipping user interaction update")
             return
         
         try:
+            now = datetime.now()
             update_data = {
-                "last_interaction": datetime.now(),
-                "last_section": section
+                "last_interaction": now,
+                "last_section": section,
+                "last_active_day": now.strftime("%Y-%m-%d")
             }
             
-            # Increment interaction count
-            self.users.update_one(
+            # Increment interaction count; the previous active day tells
+            # whether this is the user's first interaction today
+            previous = self.users.find_one_and_update(
                 {"user_id": user_id},
                 {
                     "$set": update_data,
@@ -132,9 +396,15 @@ class Database:
                         "section": section,
                         "query": query
                     }}
-                }
+                },
+                projection={"last_active_day": True}
             )
             
+            counters = {"interactions": 1, f"sections.{_stats_key(section)}": 1}
+            if previous is not None and previous.get("last_active_day") != update_data["last_active_day"]:
+                counters["active_users"] = 1
+            self._record_daily_stats(counters)
+            
             # Update favorite sections counter
             self.users.update_one(
                 {"user_id": user_id, "favorite_sections.section": section},
@@ -149,9 +419,111 @@ class Database:
         except Exception as e:
             logging.error(f"Error updating user interaction: {e}")
     
+    def _record_daily_stats(self, counters, day=None):
+        """Increment the usage counters of a day in the stats_daily rollup"""
+        if self.stats_daily is None:
+            return
+        
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        try:
+            self.stats_daily.update_one({"date": day}, {"$inc": counters}, upsert=True)
+        except Exception as e:
+            logging.error(f"Error updating daily stats: {e}")
+    
+    def get_daily_stats(self, days=7):
+        """Get the daily usage rollups of the last `days` days, oldest first"""
+        if self.stats_daily is None:
+            logging.warning("Database not available - cannot get daily stats")
+            return []
+        
+        try:
+            since = (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+            stats = list(self.stats_daily.find({"date": {"$gte": since}}, {"_id": False}))
+            return sorted(stats, key=lambda day: day["date"])
+        except Exception as e:
+            logging.error(f"Error retrieving daily stats: {e}")
+            return []
+    
+    def get_daily_active_users(self, day=None):
+        """Get the number of distinct active users on a day (YYYY-MM-DD, default today)"""
+        if self.stats_daily is None:
+            logging.warning("Database not available - cannot get daily active users")
+            return 0
+        
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        try:
+            stats = self.stats_daily.find_one({"date": day}, {"active_users": True})
+            return stats.get("active_users", 0) if stats else 0
+        except Exception as e:
+            logging.error(f"Error retrieving daily active users: {e}")
+            return 0
+    
+    def get_usage_summary(self, days=7):
+        """Summarize the daily rollups of the last `days` days"""
+        summary = {"days": days, "interactions": 0, "new_users": 0, "active_users": [], "sections": {}}
+        for day in self.get_daily_stats(days):
+            summary["interactions"] += day.get("interactions", 0)
+            summary["new_users"] += day.get("new_users", 0)
+            summary["active_users"].append((day["date"], day.get("active_users", 0)))
+            for section, count in day.get("sections", {}).items():
+                summary["sections"][section] = summary["sections"].get(section, 0) + count
+        return summary
+    
+    def rebuild_daily_stats(self):
+        """Recompute interaction and active-user rollups from the users' interaction logs
+        
+        Meant as a periodic or one-off backfill job. On MongoDB the aggregation
+        runs server-side and merges into stats_daily; the embedded store has no
+        aggregation engine, so it computes the same result in Python.
+        """
+        if self.users is None or self.stats_daily is None:
+            logging.warning("Database not available - cannot rebuild daily stats")
+            return False
+        
+        try:
+            if self._local is None:
+                self.users.aggregate(DAILY_STATS_PIPELINE)
+            else:
+                self._rebuild_daily_stats_locally()
+            logging.info("Rebuilt daily usage stats")
+            return True
+        except Exception as e:
+            logging.error(f"Error rebuilding daily stats: {e}")
+            return False
+    
+    def _rebuild_daily_stats_locally(self):
+        days = {}
+        for user in self.users.find({"interactions": {"$exists": True}}, {"user_id": True, "interactions": True}):
+            for interaction in user["interactions"]:
+                if not interaction.get("section") or not isinstance(interaction.get("timestamp"), datetime):
+                    continue
+                day = days.setdefault(
+                    interaction["timestamp"].strftime("%Y-%m-%d"),
+                    {"interactions": 0, "sections": {}, "users": set()}
+                )
+                key = _stats_key(interaction["section"])
+                day["interactions"] += 1
+                day["sections"][key] = day["sections"].get(key, 0) + 1
+                day["users"].add(user["user_id"])
+        
+        operations = [
+            self.update_operation(
+                {"date": date},
+                {"$set": {
+                    "interactions": day["interactions"],
+                    "sections": day["sections"],
+                    "active_users": len(day["users"])
+                }},
+                upsert=True
+            )
+            for date, day in days.items()
+        ]
+        if operations:
+            self.stats_daily.bulk_write(operations, ordered=False)
+    
     def save_feedback(self, user_id, feedback_text):
         """Save user feedback"""
-        if not self.feedback:
+        if self.feedback is None:
             logging.warning("Database not available - skipping feedback save")
             return False
         
@@ -171,7 +543,7 @@ class Database:
     
     def get_vitamin_by_name(self, name):
         """Get vitamin information by name"""
-        if not self.vitamins:
+        if self.vitamins is None:
             logging.warning("Database not available - cannot get vitamin info")
             return None
         
@@ -183,7 +555,7 @@ class Database:
     
     def get_all_vitamins(self):
         """Get all vitamins"""
-        if not self.vitamins:
+        if self.vitamins is None:
             logging.warning("Database not available - cannot get all vitamins")
             return []
         
@@ -195,7 +567,7 @@ class Database:
     
     def search_vitamins(self, query):
         """Search vitamins by keyword"""
-        if not self.vitamins:
+        if self.vitamins is None:
             logging.warning("Database not available - cannot search vitamins")
             return []
         
@@ -220,7 +592,7 @@ class Database:
     
     def get_plant_tip_by_waste(self, waste_type):
         """Get plant care tip by waste type"""
-        if not self.plants:
+        if self.plants is None:
             logging.warning("Database not available - cannot get plant care tip")
             return None
         
@@ -232,7 +604,7 @@ class Database:
     
     def get_all_plant_tips(self):
         """Get all plant care tips"""
-        if not self.plants:
+        if self.plants is None:
             logging.warning("Database not available - cannot get all plant care tips")
             return []
         
@@ -244,7 +616,7 @@ class Database:
     
     def search_plant_tips(self, query):
         """Search plant care tips by keyword"""
-        if not self.plants:
+        if self.plants is None:
             logging.warning("Database not available - cannot search plant care tips")
             return []
         
@@ -275,7 +647,7 @@ class Database:
     
     def get_plant_by_name(self, plant_name):
         """Get plant information by name."""
-        if not self.plants:
+        if self.plants is None:
             logging.warning("Database not available - cannot get plant info")
             return None
         
@@ -300,24 +672,104 @@ class Database:
     
     def save_plant(self, plant_data):
         """Save or update plant information in the database."""
-        # Check if plant already exists
-        existing_plant = self.plants.find_one({"name": plant_data["name"]})
-        
-        if existing_plant:
-            # Update existing plant
-            self.plants.update_one(
-                {"name": plant_data["name"]},
-                {"$set": plant_data}
-            )
-            return existing_plant["_id"]
+        return self.upsert_plant(plant_data)
+    
+    def _plant_upsert(self, plant_data, defaults=None):
+        """Build the filter and update document for an upsert keyed by plant name"""
+        fields = {key: value for key, value in plant_data.items() if key != "_id"}
+        update = {"$set": fields}
+        
+        # Defaults only apply to new plants and never override the fields being set
+        on_insert = {key: value for key, value in (defaults or {}).items() if key not in fields}
+        if on_insert:
+            update["$setOnInsert"] = on_insert
+        
+        return {"name": plant_data["name"]}, update
+    
+    def upsert_plant(self, plant_data, defaults=None):
+        """Atomically insert or update a plant by name in a single round trip
+        
+        Args:
+            plant_data (dict): Fields to set; must contain "name"
+            defaults (dict): Fields set only when the plant is created
+            
+        Returns:
+            The _id of the plant, or None if the database is not available
+        """
+        if self.plants is None:
+            logging.warning("Database not available - cannot save plant")
+            return None
+        
+        filter, update = self._plant_upsert(plant_data, defaults)
+        plant = self.plants.find_one_and_update(
+            filter,
+            update,
+            projection={"_id": True},
+            upsert=True,
+            return_document=True  # ReturnDocument.AFTER
+        )
+        return plant["_id"] if plant else None
+    
+    def bulk_upsert_plants(self, plants, defaults=None, batch_size=1000):
+        """Upsert many plants by name with unordered bulk writes
+        
+        Args:
+            plants (iterable): Plant dicts, each containing "name"; consumed lazily
+            defaults (dict): Fields set only when a plant is created
+            batch_size (int): Number of operations sent per bulk_write call
+            
+        Returns:
+            dict: Counts of "inserted", "updated", "unchanged" and "errors"
+        """
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "errors": 0}
+        if self.plants is None:
+            logging.warning("Database not available - cannot save plants")
+            return counts
+        
+        batch = []
+        for plant_data in plants:
+            if not plant_data.get("name"):
+                counts["errors"] += 1
+                continue
+            batch.append(self.update_operation(*self._plant_upsert(plant_data, defaults), upsert=True))
+            if len(batch) >= batch_size:
+                self._write_plant_batch(batch, counts)
+                batch = []
+        
+        if batch:
+            self._write_plant_batch(batch, counts)
+        
+        logging.info(f"Bulk plant upsert: {counts}")
+        return counts
+    
+    def update_operation(self, filter, update, upsert=False):
+        """Create an UpdateOne bulk operation for the active backend"""
+        if self._local is not None:
+            from local_storage import UpdateOne
         else:
-            # Insert new plant
-            result = self.plants.insert_one(plant_data)
-            return result.inserted_id
+            from pymongo import UpdateOne
+        return UpdateOne(filter, update, upsert=upsert)
+    
+    def _write_plant_batch(self, batch, counts):
+        try:
+            result = self.plants.bulk_write(batch, ordered=False).bulk_api_result
+        except Exception as e:
+            # BulkWriteError carries the partial result of an unordered batch
+            result = getattr(e, "details", None)
+            if result is None:
+                logging.error(f"Error writing plant batch: {e}")
+                counts["errors"] += len(batch)
+                return
+            logging.error(f"Errors in plant batch: {result['writeErrors'][:3]}")
+        
+        counts["inserted"] += result["nUpserted"]
+        counts["updated"] += result["nModified"]
+        counts["unchanged"] += result["nMatched"] - result["nModified"]
+        counts["errors"] += len(result["writeErrors"])
     
     def get_all_plants(self):
         """Get all plants from the database."""
-        if not self.plants:
+        if self.plants is None:
             logging.warning("Database not available - cannot get all plants")
             return []
         
@@ -334,7 +786,7 @@ class Database:
     
     def update_plant(self, plant_id, update_data):
         """Update an existing plant in the database"""
-        if not self.plants:
+        if self.plants is None:
             logging.warning("Database not available - cannot update plant")
             return False
         
@@ -359,7 +811,7 @@ class Database:
     
     def search_plants(self, query):
         """Search plants by keyword"""
-        if not self.plants:
+        if self.plants is None:
             logging.warning("Database not available - cannot search plants")
             return []
         
@@ -388,7 +840,7 @@ class Database:
     
     def increment_plant_image_count(self, plant_name):
         """Increment the count of images processed for a plant"""
-        if not self.plants:
+        if self.plants is None:
             logging.warning("Database not available - cannot update plant image count")
             return False
         
@@ -423,4 +875,171 @@ class Database:
 
     def delete_plant(self, plant_name):
         """Delete a plant from the database."""
-        self.plants.delete_one({"name": plant_name}) 
\ No newline at end of file
+        self.plants.delete_one({"name": plant_name}) 
+    
+    def add_user_plant(self, user_id, plant_name, catalog_name=None):
+        """Add a plant to a user's "my plants" list
+        
+        Returns:
+            bool: True if the plant was added, False if it was already there
+        """
+        if self.user_plants is None:
+            logging.warning("Database not available - cannot add user plant")
+            return False
+        
+        try:
+            result = self.user_plants.update_one(
+                {"key": f"{user_id}:{plant_name.lower()}"},
+                {
+                    "$set": {"catalog_name": catalog_name},
+                    "$setOnInsert": {"user_id": user_id, "plant_name": plant_name, "added_at": datetime.now()}
+                },
+                upsert=True
+            )
+            return bool(result.upserted_id)
+        except Exception as e:
+            logging.error(f"Error adding user plant: {e}")
+            return False
+    
+    def get_user_plants(self, user_id):
+        """Get a user's plants in the order they were added"""
+        if self.user_plants is None:
+            logging.warning("Database not available - cannot get user plants")
+            return []
+        
+        try:
+            return sorted(self.user_plants.find({"user_id": user_id}), key=lambda plant: plant["added_at"])
+        except Exception as e:
+            logging.error(f"Error getting user plants: {e}")
+            return []
+    
+    def remove_user_plant(self, user_id, plant_name):
+        """Remove a plant from a user's list; returns True if it was there"""
+        if self.user_plants is None:
+            logging.warning("Database not available - cannot remove user plant")
+            return False
+        
+        try:
+            result = self.user_plants.delete_one({"key": f"{user_id}:{plant_name.lower()}"})
+            return result.deleted_count > 0
+        except Exception as e:
+            logging.error(f"Error removing user plant: {e}")
+            return False
+    
+    def get_reminders(self):
+        """Get all scheduled care reminders"""
+        if self.reminders is None:
+            logging.warning("Database not available - cannot load reminders")
+            return []
+        
+        try:
+            return list(self.reminders.find({}, {"_id": False}))
+        except Exception as e:
+            logging.error(f"Error loading reminders: {e}")
+            return []
+    
+    def save_reminders(self, reminders):
+        """Upsert reminders by key in one unordered bulk write"""
+        if self.reminders is None or not reminders:
+            return
+        
+        try:
+            self.reminders.bulk_write(
+                [self.update_operation({"key": reminder["key"]}, {"$set": reminder}, upsert=True) for reminder in reminders],
+                ordered=False
+            )
+        except Exception as e:
+            logging.error(f"Error saving reminders: {e}")
+    
+    def delete_reminders(self, keys):
+        """Delete reminders by key"""
+        if self.reminders is None or not keys:
+            return
+        
+        try:
+            self.reminders.delete_many({"key": {"$in": list(keys)}})
+        except Exception as e:
+            logging.error(f"Error deleting reminders: {e}")
+    
+    def get_plant_topic_demand(self, sections, days=14, limit=500):
+        """Most requested (plant, section) pairs of the last `days` days
+        
+        Returns:
+            list: {"plant_name", "section", "count"} dicts, most requested first
+        """
+        if self.users is None:
+            logging.warning("Database not available - cannot get plant topic demand")
+            return []
+        
+        since = datetime.now() - timedelta(days=days)
+        try:
+            if self._local is None:
+                return list(self.users.aggregate(plant_topic_demand_pipeline(list(sections), since, limit)))
+            
+            counts = {}
+            for user in self.users.find({"interactions": {"$exists": True}}, {"interactions": True}):
+                for interaction in user["interactions"]:
+                    if (interaction.get("section") in sections and isinstance(interaction.get("query"), str)
+                            and isinstance(interaction.get("timestamp"), datetime) and interaction["timestamp"] >= since):
+                        key = (interaction["query"], interaction["section"])
+                        counts[key] = counts.get(key, 0) + 1
+            top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+            return [{"plant_name": plant_name, "section": section, "count": count}
+                    for (plant_name, section), count in top]
+        except Exception as e:
+            logging.error(f"Error getting plant topic demand: {e}")
+            return []
+    
+    def get_plants_by_image_count(self, limit=50):
+        """Plants recognized from photos most often, as {"name", "image_count"} dicts"""
+        if self.plants is None:
+            logging.warning("Database not available - cannot get popular plants")
+            return []
+        
+        try:
+            plants = self.plants.find({"image_count": {"$gt": 0}}, {"name": True, "image_count": True})
+            if self._local is None:
+                return list(plants.sort("image_count", -1).limit(limit))
+            return sorted(plants, key=lambda plant: plant["image_count"], reverse=True)[:limit]
+        except Exception as e:
+            logging.error(f"Error getting popular plants: {e}")
+            return []
+    
+    def get_ai_answer(self, key):
+        """Get a stored AI answer by key, or None if there is none or it expired"""
+        if self.ai_answers is None:
+            return None
+        
+        try:
+            return self.ai_answers.find_one({"key": key, "expires_at": {"$gt": datetime.now()}}, {"_id": False})
+        except Exception as e:
+            logging.error(f"Error getting AI answer: {e}")
+            return None
+    
+    def save_ai_answer(self, key, text, ttl_hours, **fields):
+        """Store an AI answer to be served until it is ttl_hours old"""
+        if self.ai_answers is None:
+            return False
+        
+        now = datetime.now()
+        try:
+            self.ai_answers.update_one(
+                {"key": key},
+                {"$set": {"text": text, "created_at": now, "expires_at": now + timedelta(hours=ttl_hours), **fields}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logging.error(f"Error saving AI answer: {e}")
+            return False
+    
+    def delete_expired_ai_answers(self):
+        """Delete expired AI answers (MongoDB also does this through its TTL index)"""
+        if self.ai_answers is None:
+            return 0
+        
+        try:
+            return self.ai_answers.delete_many({"expires_at": {"$lte": datetime.now()}}).deleted_count
+        except Exception as e:
+            logging.error(f"Error deleting expired AI answers: {e}")
+            return 0
\ No newline at end of file
@@ -0,0 +1,202 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def levenshtein(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """Edit distance between two strings
+
+    With max_distance, stops early and returns max_distance + 1 as soon as
+    the distance is known to exceed it.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a string padded at both ends"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def default_max_distance(query: str) -> int:
+    """Typo budget for a query: none for very short names, growing with length"""
+    if len(query) < 5:
+        return 0
+    if len(query) < 9:
+        return 1
+    if len(query) < 13:
+        return 2
+    return 3
+
+
+class BKTree:
+    """Burkhard-Keller tree for edit-distance bounded search"""
+
+    def __init__(self):
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, key: str):
+        if self._root is None:
+            self._root = (key, {})
+            self._size = 1
+            return
+
+        node_key, children = self._root
+        while True:
+            distance = levenshtein(key, node_key)
+            if distance == 0:
+                return
+            if distance not in children:
+                children[distance] = (key, {})
+                self._size += 1
+                return
+            node_key, children = children[distance]
+
+    def search(self, query: str, max_distance: int) -> List[Tuple[int, str]]:
+        """Keys within max_distance of the query, as (distance, key) pairs"""
+        if self._root is None:
+            return []
+
+        results = []
+        stack = [self._root]
+        while stack:
+            node_key, children = stack.pop()
+            distance = levenshtein(query, node_key)
+            if distance <= max_distance:
+                results.append((distance, node_key))
+            # Triangle inequality: only subtrees in [d - max, d + max] can match
+            for child_distance in range(distance - max_distance, distance + max_distance + 1):
+                child = children.get(child_distance)
+                if child is not None:
+                    stack.append(child)
+        return results
+
+
+class FuzzyIndex:
+    """Typo-tolerant lookup of values by key
+
+    Candidates come from a trigram inverted index using the q-gram count
+    filter (k edits destroy at most 3k trigrams). When that filter cannot
+    prune anything (short queries with a large budget), the BK-tree bounds
+    the search. The tree is only built on first use since inserting into
+    it costs a distance computation per level. Removed keys stay in it as
+    tombstones until it is rebuilt.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, List] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._tree: Optional[BKTree] = None
+
+    def __len__(self):
+        return len(self._values)
+
+    def copy(self) -> "FuzzyIndex":
+        """An index with the same entries that can be changed independently
+
+        The BK-tree is not copied; the copy builds its own on first use.
+        """
+        clone = FuzzyIndex()
+        clone._values = {key: list(values) for key, values in self._values.items()}
+        clone._trigrams = {gram: set(keys) for gram, keys in self._trigrams.items()}
+        return clone
+
+    def add(self, key: str, value):
+        if key not in self._values:
+            self._values[key] = []
+            for gram in trigrams(key):
+                self._trigrams.setdefault(gram, set()).add(key)
+            if self._tree is not None:
+                self._tree.add(key)
+        self._values[key].append(value)
+
+    def remove(self, key: str, value):
+        values = self._values.get(key)
+        if values is None:
+            return
+        values[:] = [other for other in values if other is not value]
+        if values:
+            return
+
+        del self._values[key]
+        for gram in trigrams(key):
+            keys = self._trigrams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._trigrams[gram]
+
+        if self._tree is not None and len(self._tree) > 2 * len(self._values) + 64:
+            self._tree = None
+
+    def _bk_tree(self) -> BKTree:
+        if self._tree is None:
+            self._tree = BKTree()
+            for key in self._values:
+                self._tree.add(key)
+        return self._tree
+
+    def _candidates(self, query: str, max_distance: int) -> Optional[Iterable[str]]:
+        """Keys passing the q-gram count filter, or None if the filter cannot prune"""
+        query_grams = trigrams(query)
+        threshold = len(query_grams) - 3 * max_distance
+        if threshold <= 0:
+            return None
+
+        counts: Dict[str, int] = {}
+        for gram in query_grams:
+            for key in self._trigrams.get(gram, ()):
+                counts[key] = counts.get(key, 0) + 1
+        return [key for key, count in counts.items() if count >= threshold]
+
+    def search(self, query: str, max_distance: Optional[int] = None, limit: int = 5) -> List[Tuple[object, int]]:
+        """Values whose keys are within max_distance edits of the query
+
+        Returns:
+            (value, distance) pairs ranked by distance, then by trigram overlap
+        """
+        if max_distance is None:
+            max_distance = default_max_distance(query)
+
+        candidates = self._candidates(query, max_distance)
+        if candidates is None:
+            matches = [(key, distance) for distance, key in self._bk_tree().search(query, max_distance)
+                       if key in self._values]
+        else:
+            matches = []
+            for key in candidates:
+                distance = levenshtein(query, key, max_distance)
+                if distance <= max_distance:
+                    matches.append((key, distance))
+
+        query_grams = trigrams(query)
+        matches.sort(key=lambda match: (match[1], -len(query_grams & trigrams(match[0])), match[0]))
+
+        results = []
+        for key, distance in matches:
+            for value in self._values[key]:
+                results.append((value, distance))
+                if len(results) >= limit:
+                    return results
+        return results
@@ -0,0 +1,202 @@
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking is per process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_json(path: str, data, **dump_kwargs):
+    """Write JSON to a temp file next to path, fsync it and rename it over path
+
+    Readers see either the old or the new file, never a partial one.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Persist the rename itself
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class FileLock:
+    """Advisory inter-process lock (flock on a lock file)
+
+    Reentrant within a process; a nested acquire keeps the outer mode.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+        self._depth = 0
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def acquire(self, shared: bool = False):
+        with self._lock:
+            if self._depth == 0 and fcntl is not None:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class AppendOnlyJournal:
+    """Newline-delimited JSON change log with batched fsync
+
+    Every append is written and flushed to the OS right away, so it survives
+    a process crash. fsync (durability across power loss) is batched: it runs
+    once sync_every entries are pending, or sync_interval seconds after the
+    first unsynced append, whichever comes first.
+    """
+
+    def __init__(self, path: str, sync_every: int = 32, sync_interval: float = 1.0):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = None
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._timer: Optional[threading.Timer] = None
+        self.entries = 0
+        # Bytes of the file already replayed (other processes may append more)
+        self.offset = 0
+        atexit.register(self.close)
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        return self._file
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def read(self, start: int = 0) -> Tuple[List[Dict], int]:
+        """Read the logged entries from byte offset start, without replaying them
+
+        Unreadable lines are skipped; an unterminated last line (a write in
+        progress or torn by a crash) is left for the next read.
+
+        Returns:
+            (entries, offset just past the last complete line)
+        """
+        entries = []
+        offset = start
+        if not os.path.exists(self.path):
+            return entries, offset
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                offset += len(raw)
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line.decode('utf-8')))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    logger.warning(f"Skipping unreadable journal entry in {self.path} before byte {offset}")
+        return entries, offset
+
+    def replay(self, start: int = 0) -> List[Dict]:
+        """Read the entries from byte offset start and mark them as replayed"""
+        entries, offset = self.read(start)
+        self.entries = (self.entries if start else 0) + len(entries)
+        self.offset = offset
+        return entries
+
+    def append(self, entry: Dict):
+        """Log an entry"""
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            f = self._open()
+            if not self._ends_with_newline():
+                # Terminate a line torn by a crashed writer so ours stays readable
+                line = "\n" + line
+            f.write(line)
+            f.flush()
+            self.offset = f.tell()
+            self.entries += 1
+            self._pending += 1
+
+            if self._pending >= self.sync_every:
+                self._sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.sync_interval, self.sync)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            if f.seek(0, os.SEEK_END) == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def sync(self):
+        """fsync pending entries"""
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def truncate(self):
+        """Drop all entries, e.g. after they were folded into a snapshot"""
+        with self._lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries = 0
+            self.offset = 0
+
+    def close(self):
+        with self._lock:
+            try:
+                self._sync()
+            finally:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
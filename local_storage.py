@@ -0,0 +1,680 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# Embedded document store used when STORAGE_BACKEND is "sqlite".
+# Each collection is a SQLite table holding one JSON document per row, and
+# LocalCollection exposes the subset of the pymongo Collection API that
+# Database relies on, so both backends share the same query code.
+
+_REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+
+def _encode_default(value):
+    """Tag datetimes so they survive the JSON round trip"""
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_hook(obj):
+    """Restore datetimes tagged by _encode_default"""
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def dumps(doc):
+    """Serialize a document to JSON text"""
+    return json.dumps(doc, ensure_ascii=False, default=_encode_default)
+
+
+def loads(text):
+    """Deserialize a document from JSON text"""
+    return json.loads(text, object_hook=_decode_hook)
+
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+
+class UpdateResult:
+    def __init__(self, matched_count, modified_count, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class DeleteResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+
+class BulkWriteResult:
+    def __init__(self, details):
+        self.bulk_api_result = details
+        self.inserted_count = details["nInserted"]
+        self.matched_count = details["nMatched"]
+        self.modified_count = details["nModified"]
+        self.deleted_count = details["nRemoved"]
+        self.upserted_count = details["nUpserted"]
+
+
+class BulkWriteError(Exception):
+    """Raised by bulk_write when some operations failed; `details` mirrors pymongo"""
+    def __init__(self, details):
+        super().__init__(f"batch op errors occurred: {details['writeErrors']}")
+        self.details = details
+
+
+# Bulk write operations, constructed like their pymongo counterparts
+
+class InsertOne:
+    def __init__(self, document):
+        self.document = document
+
+
+class UpdateOne:
+    def __init__(self, filter, update, upsert=False):
+        self.filter = filter
+        self.update = update
+        self.upsert = upsert
+
+
+class UpdateMany:
+    def __init__(self, filter, update, upsert=False):
+        self.filter = filter
+        self.update = update
+        self.upsert = upsert
+
+
+class DeleteOne:
+    def __init__(self, filter):
+        self.filter = filter
+
+
+class DeleteMany:
+    def __init__(self, filter):
+        self.filter = filter
+
+
+# Query matching
+
+def _get_values(value, parts):
+    """Collect the values reachable by a dotted path, descending into arrays like MongoDB"""
+    if not parts:
+        if isinstance(value, list):
+            return [value] + value
+        return [value]
+
+    if isinstance(value, dict):
+        if parts[0] not in value:
+            return []
+        return _get_values(value[parts[0]], parts[1:])
+
+    if isinstance(value, list):
+        if parts[0].isdigit():
+            index = int(parts[0])
+            return _get_values(value[index], parts[1:]) if index < len(value) else []
+        values = []
+        for item in value:
+            values.extend(_get_values(item, parts))
+        return values
+
+    return []
+
+
+def _compile_regex(pattern, options=""):
+    flags = 0
+    if "i" in options:
+        flags |= re.IGNORECASE
+    if "m" in options:
+        flags |= re.MULTILINE
+    if "s" in options:
+        flags |= re.DOTALL
+    if "x" in options:
+        flags |= re.VERBOSE
+    return re.compile(pattern, flags)
+
+
+def _compare(values, op, operand):
+    for value in values:
+        try:
+            if op == "$gt" and value > operand:
+                return True
+            if op == "$gte" and value >= operand:
+                return True
+            if op == "$lt" and value < operand:
+                return True
+            if op == "$lte" and value <= operand:
+                return True
+        except TypeError:
+            continue
+    return False
+
+
+def _match_condition(values, condition):
+    """Check a single field condition against the values found at its path"""
+    if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+        for op, operand in condition.items():
+            if op == "$regex":
+                regex = _compile_regex(operand, condition.get("$options", ""))
+                if not any(isinstance(v, str) and regex.search(v) for v in values):
+                    return False
+            elif op == "$options":
+                continue
+            elif op == "$exists":
+                if bool(values) != bool(operand):
+                    return False
+            elif op == "$ne":
+                if any(v == operand for v in values):
+                    return False
+            elif op == "$in":
+                if not any(v in operand for v in values if not isinstance(v, list)):
+                    return False
+            elif op == "$nin":
+                if any(v in operand for v in values if not isinstance(v, list)):
+                    return False
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                if not _compare(values, op, operand):
+                    return False
+            else:
+                raise ValueError(f"Unsupported query operator: {op}")
+        return True
+
+    return any(v == condition for v in values)
+
+
+def match(doc, query):
+    """Check whether a document matches a MongoDB-style query"""
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(match(doc, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(match(doc, sub) for sub in condition):
+                return False
+        elif key == "$nor":
+            if any(match(doc, sub) for sub in condition):
+                return False
+        elif not _match_condition(_get_values(doc, key.split(".")), condition):
+            return False
+    return True
+
+
+# Updates
+
+def _positional_index(doc, query, array_path):
+    """Find the array element matched by the query for the positional `$` operator"""
+    items = doc.get(array_path) if isinstance(doc, dict) else None
+    if not isinstance(items, list):
+        return None
+
+    prefix = array_path + "."
+    conditions = {key[len(prefix):]: value for key, value in (query or {}).items() if key.startswith(prefix)}
+    for index, item in enumerate(items):
+        if all(_match_condition(_get_values(item, key.split(".")), value) for key, value in conditions.items()):
+            return index
+    return None
+
+
+def _resolve_path(doc, path, query):
+    parts = path.split(".")
+    if "$" in parts:
+        position = parts.index("$")
+        index = _positional_index(doc, query, ".".join(parts[:position]))
+        if index is None:
+            raise ValueError(f"The positional operator did not find the match needed from the query: {path}")
+        parts[position] = str(index)
+    return parts
+
+
+def _get_path(doc, parts, default=None):
+    current = doc
+    for part in parts:
+        if isinstance(current, list) and part.isdigit() and int(part) < len(current):
+            current = current[int(part)]
+        elif isinstance(current, dict) and part in current:
+            current = current[part]
+        else:
+            return default
+    return current
+
+
+def _set_path(doc, parts, value):
+    current = doc
+    for part in parts[:-1]:
+        if isinstance(current, list):
+            current = current[int(part)]
+        else:
+            current = current.setdefault(part, {})
+    if isinstance(current, list):
+        current[int(parts[-1])] = value
+    else:
+        current[parts[-1]] = value
+
+
+def _unset_path(doc, parts):
+    parent = _get_path(doc, parts[:-1]) if len(parts) > 1 else doc
+    if isinstance(parent, dict):
+        parent.pop(parts[-1], None)
+
+
+def apply_update(doc, update, query=None, is_insert=False):
+    """Apply MongoDB update operators to a document in place"""
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not is_insert:
+            continue
+        for path, value in fields.items():
+            parts = _resolve_path(doc, path, query)
+            if op in ("$set", "$setOnInsert"):
+                _set_path(doc, parts, value)
+            elif op == "$unset":
+                _unset_path(doc, parts)
+            elif op == "$inc":
+                _set_path(doc, parts, _get_path(doc, parts, 0) + value)
+            elif op == "$max":
+                current = _get_path(doc, parts)
+                if current is None or value > current:
+                    _set_path(doc, parts, value)
+            elif op == "$min":
+                current = _get_path(doc, parts)
+                if current is None or value < current:
+                    _set_path(doc, parts, value)
+            elif op == "$push":
+                items = _get_path(doc, parts)
+                if items is None:
+                    items = []
+                    _set_path(doc, parts, items)
+                if isinstance(value, dict) and "$each" in value:
+                    items.extend(value["$each"])
+                else:
+                    items.append(value)
+            else:
+                raise ValueError(f"Unsupported update operator: {op}")
+    return doc
+
+
+def _upsert_seed(query):
+    """Build the base document for an upsert from the equality fields of the query"""
+    doc = {}
+    for key, value in (query or {}).items():
+        if key.startswith("$") or (isinstance(value, dict) and any(k.startswith("$") for k in value)):
+            continue
+        if "." not in key:
+            doc[key] = value
+    return doc
+
+
+def _project(doc, projection):
+    if not projection:
+        return doc
+    include = {key for key, flag in projection.items() if flag and key != "_id"}
+    # {"_id": 1} alone is an inclusion projection too, as in MongoDB
+    if include or projection.keys() == {"_id"} and projection["_id"]:
+        result = {key: doc[key] for key in include if key in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    return {key: value for key, value in doc.items() if projection.get(key, 1)}
+
+
+def _text_of(value, chunks):
+    """Flatten all string values of a document for the full-text mirror"""
+    if isinstance(value, str):
+        chunks.append(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _text_of(item, chunks)
+    elif isinstance(value, list):
+        for item in value:
+            _text_of(item, chunks)
+    return chunks
+
+
+def _literal_regex(condition):
+    """Return the literal substring of a simple $regex condition, or None"""
+    if not isinstance(condition, dict) or "$regex" not in condition:
+        return None
+    if "x" in condition.get("$options", ""):
+        return None
+    pattern = condition["$regex"]
+    if pattern.startswith("^"):
+        pattern = pattern[1:]
+    if pattern.endswith("$") and not pattern.endswith("\\$"):
+        pattern = pattern[:-1]
+    if len(pattern) < 3 or any(ch in _REGEX_SPECIAL for ch in pattern):
+        return None
+    return pattern
+
+
+class LocalCollection:
+    """A SQLite table of JSON documents with a pymongo-compatible interface"""
+
+    def __init__(self, store, name):
+        if not re.fullmatch(r"\w+", name):
+            raise ValueError(f"Invalid collection name: {name}")
+        self.store = store
+        self.name = name
+        self.fts_name = f"{name}_fts"
+        self.indexed_fields = set()
+        self.text_search = False
+
+        with self.store.lock, self.store.conn:
+            self.store.conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.name}" ('
+                '_id INTEGER PRIMARY KEY AUTOINCREMENT, doc TEXT NOT NULL CHECK (json_valid(doc)))'
+            )
+            self.text_search = self.store.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = ?", (self.fts_name,)
+            ).fetchone() is not None
+
+    def create_index(self, keys, unique=False, partialFilterExpression=None, **kwargs):
+        """Create an expression index on a JSON field, or a text index with `[("$**", "text")]`
+        
+        Partial indexes support `{"field": {"$exists": True}}` filters only.
+        """
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        
+        partial = ""
+        if partialFilterExpression:
+            conditions = []
+            for field, condition in partialFilterExpression.items():
+                if condition != {"$exists": True} or not re.fullmatch(r"[\w.]+", field):
+                    raise ValueError(f"Unsupported partial index filter: {partialFilterExpression}")
+                conditions.append(f"json_type(doc, '$.{field}') IS NOT NULL")
+            partial = " WHERE " + " AND ".join(conditions)
+
+        with self.store.lock, self.store.conn:
+            for field, kind in keys:
+                if kind == "text":
+                    self._enable_text_search()
+                    continue
+                if not re.fullmatch(r"[\w.]+", field):
+                    raise ValueError(f"Invalid index field: {field}")
+                index_name = f"ix_{self.name}_{field.replace('.', '_')}{'_unique' if unique else ''}"
+                self.store.conn.execute(
+                    f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS "{index_name}" '
+                    f'ON "{self.name}" (json_extract(doc, \'$.{field}\')){partial}'
+                )
+                self.indexed_fields.add(field)
+        return "_".join(str(part) for key in keys for part in key)
+
+    def _enable_text_search(self):
+        if self.text_search:
+            return
+        self.store.conn.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS "{self.fts_name}" USING fts5(body, tokenize=\'trigram\')'
+        )
+        for _id, text in self.store.conn.execute(f'SELECT _id, doc FROM "{self.name}"').fetchall():
+            self._index_text(_id, loads(text))
+        self.text_search = True
+
+    def _index_text(self, _id, doc):
+        self.store.conn.execute(
+            f'INSERT OR REPLACE INTO "{self.fts_name}" (rowid, body) VALUES (?, ?)',
+            (_id, "\n".join(_text_of(doc, [])))
+        )
+
+    # Candidate selection: narrow the scan in SQL, then verify every row with match()
+
+    def _fts_terms(self, query):
+        """Literal substrings of which at least one must occur in any matching document"""
+        if not self.text_search:
+            return None
+
+        for key, condition in query.items():
+            if key == "$or":
+                terms = []
+                for sub in condition:
+                    sub_terms = self._fts_terms(sub)
+                    if not sub_terms:
+                        break
+                    terms.extend(sub_terms)
+                else:
+                    return terms
+            elif key == "$and":
+                for sub in condition:
+                    sub_terms = self._fts_terms(sub)
+                    if sub_terms:
+                        return sub_terms
+            elif not key.startswith("$"):
+                literal = _literal_regex(condition)
+                if literal:
+                    return [literal]
+        return None
+
+    def _where(self, query):
+        clauses = []
+        params = []
+
+        for key, condition in query.items():
+            if key in self.indexed_fields and isinstance(condition, (str, int, float)):
+                clauses.append(f"json_extract(doc, '$.{key}') = ?")
+                params.append(condition)
+
+        terms = self._fts_terms(query)
+        if terms:
+            clauses.append(f'_id IN (SELECT rowid FROM "{self.fts_name}" WHERE "{self.fts_name}" MATCH ?)')
+            params.append(" OR ".join('"' + term.replace('"', '""') + '"' for term in terms))
+
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _iter_matches(self, query):
+        query = query or {}
+        if "_id" in query and not isinstance(query["_id"], dict):
+            rows = self.store.conn.execute(
+                f'SELECT _id, doc FROM "{self.name}" WHERE _id = ?', (query["_id"],)
+            ).fetchall()
+        else:
+            where, params = self._where(query)
+            rows = self.store.conn.execute(
+                f'SELECT _id, doc FROM "{self.name}"{where} ORDER BY _id', params
+            ).fetchall()
+
+        for _id, text in rows:
+            doc = loads(text)
+            doc["_id"] = _id
+            if match(doc, query):
+                yield doc
+
+    # Reads
+
+    def find(self, filter=None, projection=None):
+        with self.store.lock:
+            return [_project(doc, projection) for doc in self._iter_matches(filter)]
+
+    def find_one(self, filter=None, projection=None):
+        with self.store.lock:
+            for doc in self._iter_matches(filter):
+                return _project(doc, projection)
+        return None
+
+    def count_documents(self, filter):
+        with self.store.lock:
+            return sum(1 for _ in self._iter_matches(filter))
+
+    # Writes
+
+    def _insert(self, doc):
+        body = {key: value for key, value in doc.items() if key != "_id"}
+        if "_id" in doc:
+            cursor = self.store.conn.execute(
+                f'INSERT INTO "{self.name}" (_id, doc) VALUES (?, ?)', (doc["_id"], dumps(body))
+            )
+        else:
+            cursor = self.store.conn.execute(f'INSERT INTO "{self.name}" (doc) VALUES (?)', (dumps(body),))
+        doc["_id"] = cursor.lastrowid
+        if self.text_search:
+            self._index_text(doc["_id"], body)
+        return doc["_id"]
+
+    def _replace(self, doc):
+        body = {key: value for key, value in doc.items() if key != "_id"}
+        self.store.conn.execute(f'UPDATE "{self.name}" SET doc = ? WHERE _id = ?', (dumps(body), doc["_id"]))
+        if self.text_search:
+            self._index_text(doc["_id"], body)
+
+    def _delete(self, _id):
+        self.store.conn.execute(f'DELETE FROM "{self.name}" WHERE _id = ?', (_id,))
+        if self.text_search:
+            self.store.conn.execute(f'DELETE FROM "{self.fts_name}" WHERE rowid = ?', (_id,))
+
+    def insert_one(self, document):
+        with self.store.lock, self.store.conn:
+            return InsertOneResult(self._insert(document))
+
+    def insert_many(self, documents):
+        with self.store.lock, self.store.conn:
+            return InsertManyResult([self._insert(doc) for doc in documents])
+
+    def _update(self, filter, update, upsert, many, documents=None):
+        matched = modified = 0
+        for doc in list(self._iter_matches(filter)):
+            matched += 1
+            before = dumps(doc)
+            apply_update(doc, update, filter)
+            if dumps(doc) != before:
+                self._replace(doc)
+                modified += 1
+            if documents is not None:
+                documents.append(doc)
+            if not many:
+                break
+
+        if matched == 0 and upsert:
+            doc = apply_update(_upsert_seed(filter), update, filter, is_insert=True)
+            upserted_id = self._insert(doc)
+            if documents is not None:
+                documents.append(doc)
+            return UpdateResult(0, 0, upserted_id)
+        return UpdateResult(matched, modified)
+
+    def update_one(self, filter, update, upsert=False):
+        with self.store.lock, self.store.conn:
+            return self._update(filter, update, upsert, many=False)
+
+    def update_many(self, filter, update, upsert=False):
+        with self.store.lock, self.store.conn:
+            return self._update(filter, update, upsert, many=True)
+
+    def find_one_and_update(self, filter, update, projection=None, upsert=False, return_document=False):
+        """Update one document and return it as it was before (or after, if return_document is true)"""
+        with self.store.lock, self.store.conn:
+            before = self.find_one(filter)
+            documents = []
+            self._update(filter, update, upsert, many=False, documents=documents)
+        if return_document:
+            return _project(documents[0], projection) if documents else None
+        return _project(before, projection) if before else None
+
+    def bulk_write(self, requests, ordered=True):
+        """Apply a batch of write operations in a single transaction"""
+        details = {
+            "writeErrors": [], "nInserted": 0, "nUpserted": 0,
+            "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []
+        }
+        with self.store.lock, self.store.conn:
+            if not self.store.conn.in_transaction:
+                self.store.conn.execute("BEGIN")
+            for index, request in enumerate(requests):
+                try:
+                    with self.store.savepoint():
+                        self._bulk_apply(request, index, details)
+                except (sqlite3.IntegrityError, ValueError) as e:
+                    details["writeErrors"].append({"index": index, "errmsg": str(e), "op": request})
+                    if ordered:
+                        break
+        if details["writeErrors"]:
+            raise BulkWriteError(details)
+        return BulkWriteResult(details)
+
+    def _bulk_apply(self, request, index, details):
+        if isinstance(request, InsertOne):
+            self._insert(request.document)
+            details["nInserted"] += 1
+        elif isinstance(request, (UpdateOne, UpdateMany)):
+            result = self._update(request.filter, request.update, request.upsert, isinstance(request, UpdateMany))
+            details["nMatched"] += result.matched_count
+            details["nModified"] += result.modified_count
+            if result.upserted_id is not None:
+                details["nUpserted"] += 1
+                details["upserted"].append({"index": index, "_id": result.upserted_id})
+        elif isinstance(request, DeleteOne):
+            for doc in self._iter_matches(request.filter):
+                self._delete(doc["_id"])
+                details["nRemoved"] += 1
+                break
+        elif isinstance(request, DeleteMany):
+            for doc in list(self._iter_matches(request.filter)):
+                self._delete(doc["_id"])
+                details["nRemoved"] += 1
+        else:
+            raise ValueError(f"Unsupported bulk write operation: {request!r}")
+
+    def drop_index(self, index_name):
+        """Indexes are managed by create_index; dropping is a no-op for the local store"""
+
+    def delete_one(self, filter):
+        with self.store.lock, self.store.conn:
+            for doc in self._iter_matches(filter):
+                self._delete(doc["_id"])
+                return DeleteResult(1)
+        return DeleteResult(0)
+
+    def delete_many(self, filter):
+        with self.store.lock, self.store.conn:
+            ids = [doc["_id"] for doc in self._iter_matches(filter)]
+            for _id in ids:
+                self._delete(_id)
+        return DeleteResult(len(ids))
+
+
+class LocalStore:
+    """SQLite database file holding one table per collection"""
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.collections = {}
+        logging.info(f"Opened local storage at {path}")
+
+    @contextmanager
+    def savepoint(self):
+        """Roll back the enclosed statements on error without ending the outer transaction"""
+        self.conn.execute("SAVEPOINT op")
+        try:
+            yield
+        except Exception:
+            self.conn.execute("ROLLBACK TO op")
+            self.conn.execute("RELEASE op")
+            raise
+        self.conn.execute("RELEASE op")
+
+    def __getitem__(self, name):
+        with self.lock:
+            if name not in self.collections:
+                self.collections[name] = LocalCollection(self, name)
+            return self.collections[name]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -12,13 +12,50 @@ from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 from aiogram.types import ParseMode, ChatActions, InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove, ForceReply, ChatAction
 from aiogram.utils.callback_data import CallbackData
+from aiogram.utils.exceptions import RetryAfter
 
-from config import BOT_TOKEN, CHUTES_API_TOKEN
-from ai_service import AIService
-from utils import format_vitamin_info, format_plant_tip, log_user_interaction
-from database import Database
+from config import BOT_TOKEN
+from utils import format_vitamin_info, format_plant_tip
+from plant_care_tips import format_care_response
+from message_builder import MessageBuilder
+from rate_limiter import LIMITED_METHODS, OutboundLimiter
+from services import get_services
 from states import UserState
 
+logger = logging.getLogger(__name__)
+
+# Сколько раз повторять запрос, если Telegram ответил 429
+MAX_RETRIES = 3
+
+
+class RateLimitedBot(Bot):
+    """Bot, отправляющий сообщения с учетом лимитов Telegram (общего и для каждого чата)"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = OutboundLimiter()
+    
+    async def request(self, method, data=None, files=None, **kwargs):
+        chat_id = (data or {}).get("chat_id")
+        for attempt in range(MAX_RETRIES + 1):
+            if method in LIMITED_METHODS:
+                await self.limiter.acquire(chat_id)
+            try:
+                return await super().request(method, data, files, **kwargs)
+            except RetryAfter as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                logger.warning(f"Telegram asked to retry {method} to {chat_id} after {e.timeout}s")
+                self.limiter.pause(chat_id, e.timeout)
+                if method not in LIMITED_METHODS:
+                    await self.limiter.acquire(chat_id)
+
+
+# Один бот, диспетчер и набор сервисов на процесс; api/webhook.py использует их же
+bot = RateLimitedBot(token=BOT_TOKEN)
+dp = Dispatcher(bot, storage=MemoryStorage())
+services = get_services()
+
 # Add a new handler for plant care tips
 
 @dp.message_handler(commands=['care'])
@@ -43,37 +80,11 @@ async def cmd_plant_care(message: types.Message):
     
     # Get plant care tips
     plant_name = args
-    ai_service = AIService()
-    care_response = await ai_service.get_plant_care_tips(plant_name)
+    care_response = await services.ai_service.get_plant_care_tips(plant_name)
     
     if care_response["found"]:
-        # Create nicely formatted message
-        reply_text = f"🌱 *{care_response['name']}*\n\n"
-        
-        # Add emoji to each section
-        reply_text += f"💧 *Полив:* {care_response['care_tips']['watering']}\n\n"
-        reply_text += f"☀️ *Освещение:* {care_response['care_tips']['light']}\n\n"
-        reply_text += f"🌡️ *Температура:* {care_response['care_tips']['temperature']}\n\n"
-        reply_text += f"🌱 *Почва:* {care_response['care_tips']['soil']}\n\n"
-        
-        if care_response['care_tips'].get('humidity'):
-            reply_text += f"💦 *Влажность:* {care_response['care_tips']['humidity']}\n\n"
-        
-        if care_response['care_tips'].get('fertilizing'):
-            reply_text += f"🧪 *Удобрение:* {care_response['care_tips']['fertilizing']}\n\n"
-        
-        # Common problems
-        if care_response.get('common_problems'):
-            reply_text += "⚠️ *Распространенные проблемы:*\n"
-            for problem in care_response['common_problems']:
-                reply_text += f"• {problem}\n"
-            reply_text += "\n"
-        
-        # Helpful tips
-        if care_response.get('tips'):
-            reply_text += "💡 *Полезные советы:*\n"
-            for tip in care_response['tips']:
-                reply_text += f"• {tip}\n"
+        # Catalog answers come prerendered; AI answers are formatted here
+        reply_text = care_response.get("text") or format_care_response(care_response)
         
         # Create keyboard
         keyboard = InlineKeyboardMarkup()
@@ -82,21 +93,26 @@ async def cmd_plant_care(message: types.Message):
             InlineKeyboardButton("👍 Спасибо!", callback_data=f"thanks_care_{care_response['name']}")
         )
         
-        await message.reply(reply_text, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
+        await message.reply(reply_text, parse_mode=ParseMode.MARKDOWN_V2, reply_markup=keyboard)
     else:
         # Plant not found
-        reply_text = f"{care_response['message']}\n\n"
-        for i, tip in enumerate(care_response['generic_tips'], 1):
-            reply_text += f"{i}. {tip}\n"
+        suggestions = [tip["name"] for tip in services.plant_care.suggest_tips(plant_name)]
+        reply_text = (
+            MessageBuilder()
+            .markdown(care_response['message'])
+            .section("Возможно, вы имели в виду", suggestions)
+            .bullets(care_response['generic_tips'], numbered=True)
+            .render()
+        )
         
         # Create keyboard for not found
         keyboard = InlineKeyboardMarkup()
         keyboard.add(InlineKeyboardButton("🔍 Искать другое растение", callback_data="new_plant_care"))
         
-        await message.reply(reply_text, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
+        await message.reply(reply_text, parse_mode=ParseMode.MARKDOWN_V2, reply_markup=keyboard)
     
     # Log user interaction
-    log_user_interaction(message.from_user, "plant_care", plant_name)
+    services.db.update_user_interaction(message.from_user.id, "plant_care", plant_name)
 
 
 @dp.callback_query_handler(lambda c: c.data == "new_plant_care")
@@ -129,37 +145,11 @@ async def process_plant_name(message: types.Message, state: FSMContext):
     await message.answer_chat_action(ChatAction.TYPING)
     
     # Get plant care tips
-    ai_service = AIService()
-    care_response = await ai_service.get_plant_care_tips(plant_name)
+    care_response = await services.ai_service.get_plant_care_tips(plant_name)
     
     if care_response["found"]:
-        # Create nicely formatted message
-        reply_text = f"🌱 *{care_response['name']}*\n\n"
-        
-        # Add emoji to each section
-        reply_text += f"💧 *Полив:* {care_response['care_tips']['watering']}\n\n"
-        reply_text += f"☀️ *Освещение:* {care_response['care_tips']['light']}\n\n"
-        reply_text += f"🌡️ *Температура:* {care_response['care_tips']['temperature']}\n\n"
-        reply_text += f"🌱 *Почва:* {care_response['care_tips']['soil']}\n\n"
-        
-        if care_response['care_tips'].get('humidity'):
-            reply_text += f"💦 *Влажность:* {care_response['care_tips']['humidity']}\n\n"
-        
-        if care_response['care_tips'].get('fertilizing'):
-            reply_text += f"🧪 *Удобрение:* {care_response['care_tips']['fertilizing']}\n\n"
-        
-        # Common problems
-        if care_response.get('common_problems'):
-            reply_text += "⚠️ *Распространенные проблемы:*\n"
-            for problem in care_response['common_problems']:
-                reply_text += f"• {problem}\n"
-            reply_text += "\n"
-        
-        # Helpful tips
-        if care_response.get('tips'):
-            reply_text += "💡 *Полезные советы:*\n"
-            for tip in care_response['tips']:
-                reply_text += f"• {tip}\n"
+        # Catalog answers come prerendered; AI answers are formatted here
+        reply_text = care_response.get("text") or format_care_response(care_response)
         
         # Create keyboard
         keyboard = InlineKeyboardMarkup()
@@ -168,21 +158,26 @@ async def process_plant_name(message: types.Message, state: FSMContext):
             InlineKeyboardButton("👍 Спасибо!", callback_data=f"thanks_care_{care_response['name']}")
         )
         
-        await message.reply(reply_text, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
+        await message.reply(reply_text, parse_mode=ParseMode.MARKDOWN_V2, reply_markup=keyboard)
     else:
         # Plant not found
-        reply_text = f"{care_response['message']}\n\n"
-        for i, tip in enumerate(care_response['generic_tips'], 1):
-            reply_text += f"{i}. {tip}\n"
+        suggestions = [tip["name"] for tip in services.plant_care.suggest_tips(plant_name)]
+        reply_text = (
+            MessageBuilder()
+            .markdown(care_response['message'])
+            .section("Возможно, вы имели в виду", suggestions)
+            .bullets(care_response['generic_tips'], numbered=True)
+            .render()
+        )
         
         # Create keyboard for not found
         keyboard = InlineKeyboardMarkup()
         keyboard.add(InlineKeyboardButton("🔍 Искать другое растение", callback_data="new_plant_care"))
         
-        await message.reply(reply_text, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
+        await message.reply(reply_text, parse_mode=ParseMode.MARKDOWN_V2, reply_markup=keyboard)
     
     # Log user interaction
-    log_user_interaction(message.from_user, "plant_care", plant_name)
+    services.db.update_user_interaction(message.from_user.id, "plant_care", plant_name)
 
 # Добавляем функцию для обработки обновлений от вебхука
 async def process_telegram_update(update_data):
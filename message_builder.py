@@ -0,0 +1,217 @@
+import re
+from typing import Iterable, List, Union
+
+MARKDOWN_V2 = "MarkdownV2"
+HTML = "HTML"
+
+# Telegram rejects longer message texts
+MAX_MESSAGE_LENGTH = 4096
+
+# One translation table per parse mode, so escaping is a single str.translate
+_ESCAPE_TABLES = {
+    MARKDOWN_V2: str.maketrans({char: "\\" + char for char in "\\_*[]()~`>#+-=|{}.!"}),
+    HTML: str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"}),
+}
+
+_BOLD = {MARKDOWN_V2: "*{}*", HTML: "<b>{}</b>"}
+_BOLD_MARKERS = {MARKDOWN_V2: ("*", "*"), HTML: ("<b>", "</b>")}
+
+# Markup found in AI answers and hand-written texts: **bold**, __bold__,
+# *bold* and "# heading" lines, all shown as bold
+_MARKDOWN_BOLD = re.compile(
+    r"\*\*(?P<double>[^*\n]+?)\*\*"
+    r"|__(?P<underscore>[^_\n]+?)__"
+    r"|\*(?P<single>[^*\s](?:[^*\n]*?[^*\s])?)\*"
+    r"|^[ \t]*#{1,6}[ \t]+(?P<heading>[^\n]+?)[ \t]*#*[ \t]*$",
+    re.MULTILINE
+)
+
+Items = Union[str, Iterable[str], None]
+
+
+def escape(text, parse_mode: str = MARKDOWN_V2) -> str:
+    """Escape text for a parse mode"""
+    return str(text).translate(_ESCAPE_TABLES[parse_mode])
+
+
+def bold(text, parse_mode: str = MARKDOWN_V2) -> str:
+    """Escaped text in bold"""
+    return _BOLD[parse_mode].format(escape(text, parse_mode))
+
+
+def from_markdown(text, parse_mode: str = MARKDOWN_V2) -> str:
+    """Convert loose Markdown (bold and headings) into escaped markup in one pass
+
+    Unmatched markers are escaped like any other character, so the result
+    always parses.
+    """
+    text = str(text)
+    table = _ESCAPE_TABLES[parse_mode]
+    pieces = []
+    position = 0
+    for match in _MARKDOWN_BOLD.finditer(text):
+        pieces.append(text[position:match.start()].translate(table))
+        pieces.append(_BOLD[parse_mode].format(match.group(match.lastgroup).translate(table)))
+        position = match.end()
+    pieces.append(text[position:].translate(table))
+    return "".join(pieces)
+
+
+def _lines(items: Items) -> List[str]:
+    """Non-empty stripped lines of a newline-separated string or of an iterable"""
+    if not items:
+        return []
+    if isinstance(items, str):
+        items = items.split("\n")
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+_STAR = re.compile(r"(\\*)\*")
+
+
+def _unclosed_bold(head: str, parse_mode: str) -> int:
+    """Start of a bold span left open at the end of head, or -1"""
+    if parse_mode == HTML:
+        opening = head.rfind("<b>")
+        return opening if opening > head.rfind("</b>") else -1
+    # A star after an even number of backslashes is markup
+    stars = [match.end() - 1 for match in _STAR.finditer(head) if len(match.group(1)) % 2 == 0]
+    return stars[-1] if len(stars) % 2 else -1
+
+
+def _cut(text: str, limit: int, parse_mode: str) -> int:
+    """Where to cut rendered text so the head fits in limit
+
+    Prefers a line break, then whitespace, and never cuts an escape
+    sequence (MarkdownV2 "\\." or an HTML entity) or a bold span in two,
+    unless the span starts the text (split_message closes and reopens it).
+    """
+    position = -1
+    for separator in ("\n", " "):
+        position = text.rfind(separator, 0, limit)
+        if position > limit // 2:
+            break
+    else:
+        position = limit
+        while position > 1 and text[position - 1] == "\\":
+            position -= 1
+        entity = text.rfind("&", max(0, position - 5), position)
+        if entity > 0 and ";" not in text[entity:position]:
+            position = entity
+
+    opening = _unclosed_bold(text[:position], parse_mode)
+    return opening if opening > 0 else position
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH, parse_mode: str = MARKDOWN_V2) -> List[str]:
+    """Split rendered text into messages of at most limit characters
+
+    Cuts at paragraph breaks where possible, then at line breaks and
+    spaces. A bold span longer than a message is closed at the cut and
+    reopened in the next part.
+    """
+    parts = []
+    while len(text) > limit:
+        position = text.rfind("\n\n", 0, limit)
+        if position <= limit // 2:
+            position = _cut(text, limit, parse_mode)
+        head, tail = text[:position].rstrip(), text[position:].lstrip()
+        if _unclosed_bold(head, parse_mode) == 0:
+            opening, closing = _BOLD_MARKERS[parse_mode]
+            position = _cut(text, limit - len(closing), parse_mode)
+            head, tail = text[:position].rstrip() + closing, opening + text[position:].lstrip()
+        parts.append(head)
+        text = tail
+    if text:
+        parts.append(text)
+    return parts
+
+
+class MessageBuilder:
+    """A message assembled from blocks (paragraphs, fields, bulleted sections)
+
+    Every value is escaped once, when it is added, for the builder's parse
+    mode; blocks are separated by blank lines. parts() splits the result
+    into messages that fit Telegram's length limit.
+
+        text = (MessageBuilder()
+                .title("Витамин C")
+                .text(vitamin["description"])
+                .section("Польза для организма", vitamin["benefits"])
+                .field("Суточная норма", vitamin["daily_intake"])
+                .render())
+    """
+
+    def __init__(self, parse_mode: str = MARKDOWN_V2):
+        self.parse_mode = parse_mode
+        self._blocks: List[str] = []
+
+    def _add(self, block: str) -> "MessageBuilder":
+        if block:
+            self._blocks.append(block)
+        return self
+
+    def title(self, text, emoji: str = "") -> "MessageBuilder":
+        """A bold line, optionally led by an emoji"""
+        line = bold(text, self.parse_mode)
+        return self._add(f"{escape(emoji, self.parse_mode)} {line}" if emoji else line)
+
+    def text(self, text) -> "MessageBuilder":
+        """Plain text, shown as is"""
+        return self._add(escape(text, self.parse_mode).strip() if text else "")
+
+    def markdown(self, text) -> "MessageBuilder":
+        """Text with loose Markdown (e.g. an AI answer), bold markers kept"""
+        return self._add(from_markdown(text, self.parse_mode).strip() if text else "")
+
+    def raw(self, markup: str) -> "MessageBuilder":
+        """Markup already escaped for the builder's parse mode"""
+        return self._add(markup)
+
+    def field(self, label, value, block: bool = False, emoji: str = "") -> "MessageBuilder":
+        """"*Label:* value", or the value on the lines below the label when block is true"""
+        if not value:
+            return self
+        label = bold(f"{label}:", self.parse_mode)
+        if emoji:
+            label = f"{escape(emoji, self.parse_mode)} {label}"
+        separator = "\n" if block else " "
+        return self._add(f"{label}{separator}{from_markdown(value, self.parse_mode).strip()}")
+
+    def fields(self, *fields) -> "MessageBuilder":
+        """Several "*Label:* value" lines in one block, given as (label, value) pairs"""
+        return self._add("\n".join(
+            f"{bold(f'{label}:', self.parse_mode)} {from_markdown(value, self.parse_mode).strip()}"
+            for label, value in fields if value
+        ))
+
+    def section(self, title, items: Items, numbered: bool = False, emoji: str = "") -> "MessageBuilder":
+        """A bold title followed by one bullet per item; nothing if there are no items"""
+        lines = _lines(items)
+        if not lines:
+            return self
+        title = bold(f"{title}:", self.parse_mode)
+        if emoji:
+            title = f"{escape(emoji, self.parse_mode)} {title}"
+        return self._add(title + "\n" + self._list(lines, numbered))
+
+    def bullets(self, items: Items, numbered: bool = False) -> "MessageBuilder":
+        """A bulleted (or numbered) list without a title"""
+        lines = _lines(items)
+        return self._add(self._list(lines, numbered) if lines else "")
+
+    def _list(self, lines: List[str], numbered: bool) -> str:
+        if numbered:
+            return "\n".join(escape(f"{i}. ", self.parse_mode) + from_markdown(line, self.parse_mode)
+                             for i, line in enumerate(lines, 1))
+        return "\n".join("• " + from_markdown(line, self.parse_mode) for line in lines)
+
+    def __bool__(self):
+        return bool(self._blocks)
+
+    def render(self) -> str:
+        return "\n\n".join(self._blocks)
+
+    def parts(self, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+        """The message split into texts of at most limit characters"""
+        return split_message(self.render(), limit, self.parse_mode)
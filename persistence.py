@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+from typing import Dict, Optional, Tuple
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from config import PERSISTENCE_INTERVAL, PERSISTENCE_PATH
+from local_storage import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+USER_DATA = "user_data"
+CONVERSATION = "conversation"
+
+
+class SQLitePersistence(BasePersistence):
+    """user_data and ConversationHandler states kept in memory and saved to SQLite
+
+    The file is read once, on the first get_* call. python-telegram-bot
+    hands over changed data every update_interval seconds; those changes
+    are serialized right away and written in a single transaction, off the
+    event loop, so the number of writes does not grow with the number of
+    messages. Anything still pending is written by flush() on shutdown.
+    """
+
+    def __init__(self, path: str = PERSISTENCE_PATH, update_interval: float = PERSISTENCE_INTERVAL):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval
+        )
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        # In-memory copy of the table: (kind, key) -> JSON value
+        self._rows: Optional[Dict[Tuple[str, str], str]] = None
+        # (kind, key) -> JSON value, or None to delete the row
+        self._dirty: Dict[Tuple[str, str], Optional[str]] = {}
+        self._writer: Optional[asyncio.Task] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS bot_state "
+                "(kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (kind, key))"
+            )
+        return self._conn
+
+    def _load(self) -> Dict[Tuple[str, str], str]:
+        if self._rows is None:
+            try:
+                rows = self._connect().execute("SELECT kind, key, value FROM bot_state").fetchall()
+                self._rows = {(kind, key): value for kind, key, value in rows}
+                logger.info(f"Loaded {len(self._rows)} bot state entries from {self.path}")
+            except sqlite3.Error as e:
+                logger.error(f"Error loading bot state from {self.path}: {e}")
+                self._rows = {}
+        return self._rows
+
+    def _set(self, kind: str, key: str, value):
+        """Record a changed entry (None deletes it) and schedule a write if it differs"""
+        rows = self._load()
+        text = None if value is None else dumps(value)
+        if rows.get((kind, key)) == text:
+            return
+        if text is None:
+            del rows[(kind, key)]
+        else:
+            rows[(kind, key)] = text
+        self._dirty[(kind, key)] = text
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(self._write_dirty())
+
+    async def _write_dirty(self):
+        # Runs after the current round of update_* calls, so they share one transaction
+        while self._dirty:
+            dirty, self._dirty = self._dirty, {}
+            await asyncio.get_running_loop().run_in_executor(None, self._write_rows, dirty)
+
+    def _write_rows(self, dirty: Dict[Tuple[str, str], Optional[str]]):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO bot_state (kind, key, value) VALUES (?, ?, ?)",
+                    [(kind, key, value) for (kind, key), value in dirty.items() if value is not None]
+                )
+                conn.executemany(
+                    "DELETE FROM bot_state WHERE kind = ? AND key = ?",
+                    [(kind, key) for (kind, key), value in dirty.items() if value is None]
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error saving bot state to {self.path}: {e}")
+
+    async def get_user_data(self) -> Dict[int, dict]:
+        return {int(key): loads(value) for (kind, key), value in self._load().items() if kind == USER_DATA}
+
+    async def get_chat_data(self) -> Dict[int, dict]:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name: str) -> Dict[tuple, object]:
+        kind = f"{CONVERSATION}:{name}"
+        return {tuple(json.loads(key)): loads(value) for (row_kind, key), value in self._load().items()
+                if row_kind == kind}
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        self._set(USER_DATA, str(user_id), data)
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def update_conversation(self, name: str, key: tuple, new_state: Optional[object]) -> None:
+        self._set(f"{CONVERSATION}:{name}", json.dumps(list(key)), new_state)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._set(USER_DATA, str(user_id), None)
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
+
+    async def flush(self) -> None:
+        if self._writer is not None:
+            await self._writer
+        if self._dirty:
+            dirty, self._dirty = self._dirty, {}
+            self._write_rows(dirty)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
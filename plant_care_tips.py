@@ -1,8 +1,19 @@
+import itertools
 import json
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
+
+from care_records import PlantCareTip, to_record
+from fuzzy_index import FuzzyIndex
+from journal import AppendOnlyJournal, FileLock, atomic_write_json
+from message_builder import MessageBuilder
+from text_index import InvertedIndex
 
 # Configure logging
 logging.basicConfig(
@@ -14,8 +25,41 @@ logger = logging.getLogger(__name__)
 # Path to the plant care tips JSON file
 CARE_TIPS_PATH = "data/plant_care_tips.json"
 
-# Ensure the data directory exists
-os.makedirs(os.path.dirname(CARE_TIPS_PATH), exist_ok=True)
+# Changes since the last snapshot of CARE_TIPS_PATH, one JSON object per line
+CARE_TIPS_JOURNAL_PATH = "data/plant_care_tips.journal"
+
+# Held while writing the snapshot or journal, so that several bot worker
+# processes can share one catalog
+CARE_TIPS_LOCK_PATH = "data/plant_care_tips.lock"
+
+# How often (seconds) readers check for changes made by other processes
+REFRESH_INTERVAL = 1.0
+
+# Rendered texts and instructions kept by PlantCareTipsManager
+RENDER_CACHE_SIZE = 2048
+
+# Versions of catalog entries for the render cache, unique across catalogs
+_render_versions = itertools.count()
+
+# Fold the journal into a new snapshot once it holds this many entries
+# (or as many entries as there are tips, whichever is larger)
+JOURNAL_COMPACT_MIN_ENTRIES = 1000
+
+# How often (seconds) watch() checks the snapshot file for changes
+CARE_TIPS_WATCH_INTERVAL = 2.0
+
+# A changed snapshot is only reloaded once it has not been modified for this
+# long (seconds), so a file still being written is not parsed
+CARE_TIPS_SETTLE_TIME = 0.5
+
+# suggest_tips() offers a tip when its name is at least this similar to the
+# query (1 - edit distance / query length), or contains a query of at least
+# SUGGEST_MIN_SUBSTRING characters
+SUGGEST_MIN_SIMILARITY = 0.75
+SUGGEST_MIN_SUBSTRING = 4
+
+# Default care tips, loaded only when there is no catalog yet
+CARE_TIPS_SEED_PATH = os.path.join("data", "seed", "plant_care_tips.json")
 
 # Define schemas for different types of care tips
 WATERING_SCHEMA = {
@@ -80,462 +124,841 @@ PLANT_CARE_TIP_SCHEMA = {
     "seasonal_care": Dict[str, str],  # {"весна": "...", "лето": "...", "осень": "...", "зима": "..."}
     "difficulty": str,  # "легкое", "среднее", "сложное"
     "tips": List[str],  # ["защищайте от прямых солнечных лучей", etc.]
+    "aliases": List[str],  # optional: other common names, e.g. ["фикус Робуста"]
     "last_updated": str,  # ISO datetime string
 }
 
-# Initial plant care tips data
-INITIAL_PLANT_CARE_TIPS = [
-    {
-        "name": "Фикус каучуконосный",
-        "scientific_name": "Ficus elastica",
-        "category": "комнатное",
-        "description": "Популярное комнатное растение с крупными глянцевыми листьями, неприхотливое в уходе.",
-        "origin": "Юго-Восточная Азия",
-        "watering": {
-            "frequency": "раз в 7-10 дней",
-            "amount": "умеренно",
-            "method": "когда верхний слой почвы просохнет на 2-3 см",
-            "seasonal_adjustments": {"зима": "сократите полив", "лето": "увеличьте при необходимости"}
-        },
-        "light": {
-            "type": "яркий непрямой свет",
-            "hours": "6-8 часов в день",
-            "direction": "восточное или западное окно",
-            "additional_info": "избегайте прямых солнечных лучей, которые могут обжечь листья"
-        },
-        "soil": {
-            "type": "легкая, питательная",
-            "ph": "нейтральная или слабокислая",
-            "drainage": "хороший дренаж обязателен",
-            "composition": "универсальный грунт с добавлением перлита"
-        },
-        "fertilizer": {
-            "frequency": "раз в месяц с весны до осени",
-            "type": "универсальное удобрение для комнатных растений",
-            "strength": "половинная доза от рекомендуемой",
-            "seasonal": "не удобряйте зимой",
-            "special_needs": ""
-        },
-        "temperature": {
-            "optimal": "18-24°C",
-            "min": "не ниже 12°C",
-            "max": "не выше 30°C",
-            "special_requirements": "избегайте резких перепадов температуры и сквозняков"
-        },
-        "humidity": {
-            "optimal": "средняя",
-            "methods": ["регулярное опрыскивание", "влажная галька в поддоне"],
-            "special_requirements": "вытирайте пыль с листьев влажной тряпкой"
-        },
-        "pruning": "обрезайте верхушку для контроля роста; удаляйте поврежденные листья",
-        "propagation": ["верхушечные черенки", "воздушные отводки"],
-        "common_problems": [
-            {
-                "название": "Опадение листьев",
-                "решение": "чаще всего из-за переувлажнения или низкой температуры; сократите полив и держите в тепле"
-            },
-            {
-                "название": "Пожелтение листьев",
-                "решение": "обычно из-за чрезмерного полива или недостатка питательных веществ"
-            },
-            {
-                "название": "Коричневые пятна на листьях",
-                "решение": "часто из-за солнечных ожогов; переместите растение из прямых солнечных лучей"
-            }
-        ],
-        "toxicity": {"для_людей": True, "для_животных": True},
-        "seasonal_care": {
-            "весна": "начните увеличивать полив и удобрение по мере роста",
-            "лето": "регулярное опрыскивание, защита от прямых солнечных лучей",
-            "осень": "постепенно сокращайте полив и удобрение",
-            "зима": "редкий полив, без удобрений, защита от холодных сквозняков"
-        },
-        "difficulty": "легкое",
-        "tips": [
-            "Протирайте листья влажной тряпкой для удаления пыли и сохранения блеска",
-            "При обрезке выделяется млечный сок, который может вызвать раздражение кожи, поэтому используйте перчатки",
-            "Поворачивайте растение каждые 2-3 недели для равномерного роста"
-        ],
-        "last_updated": datetime.now().isoformat()
-    },
-    {
-        "name": "Монстера",
-        "scientific_name": "Monstera deliciosa",
-        "category": "комнатное",
-        "description": "Крупное тропическое растение с характерными разрезными листьями, популярное в домашнем озеленении.",
-        "origin": "Центральная Америка",
-        "watering": {
-            "frequency": "раз в неделю",
-            "amount": "умеренно",
-            "method": "когда верхний слой почвы подсохнет",
-            "seasonal_adjustments": {"зима": "сократите полив", "лето": "следите за влажностью почвы"}
-        },
-        "light": {
-            "type": "яркий непрямой свет",
-            "hours": "6-8 часов в день",
-            "direction": "восточное или северное окно",
-            "additional_info": "может переносить небольшое количество прямого солнца утром"
-        },
-        "soil": {
-            "type": "рыхлая, питательная",
-            "ph": "слабокислая",
-            "drainage": "отличный дренаж",
-            "composition": "универсальный грунт с добавлением перлита и кокосового волокна"
-        },
-        "fertilizer": {
-            "frequency": "раз в 2-4 недели с весны до осени",
-            "type": "удобрение для лиственных растений",
-            "strength": "по инструкции",
-            "seasonal": "не удобряйте зимой",
-            "special_needs": ""
-        },
-        "temperature": {
-            "optimal": "18-27°C",
-            "min": "не ниже 15°C",
-            "max": "не выше 32°C",
-            "special_requirements": "избегайте холодных сквозняков"
-        },
-        "humidity": {
-            "optimal": "высокая",
-            "methods": ["регулярное опрыскивание", "увлажнитель воздуха", "поддон с влажной галькой"],
-            "special_requirements": "в сухом воздухе края листьев могут коричневеть"
-        },
-        "pruning": "удаляйте пожелтевшие или поврежденные листья; направляйте рост с помощью опоры",
-        "propagation": ["стеблевые черенки с узлами", "деление при пересадке"],
-        "common_problems": [
-            {
-                "название": "Коричневые края листьев",
-                "решение": "обычно из-за низкой влажности воздуха; увеличьте влажность"
-            },
-            {
-                "название": "Желтые листья",
-                "решение": "чаще всего из-за переувлажнения; сократите полив и проверьте дренаж"
-            },
-            {
-                "название": "Отсутствие разрезов на листьях",
-                "решение": "растению может не хватать света; переместите в более светлое место"
-            }
-        ],
-        "toxicity": {"для_людей": True, "для_животных": True},
-        "seasonal_care": {
-            "весна": "идеальное время для пересадки и увеличения полива",
-            "лето": "период активного роста; регулярные подкормки и опрыскивание",
-            "осень": "постепенно сокращайте полив и удобрение",
-            "зима": "минимальный полив, без удобрений, защита от сквозняков"
-        },
-        "difficulty": "легкое",
-        "tips": [
-            "Используйте мох на опоре для поддержки воздушных корней",
-            "Большие листья собирают пыль — регулярно протирайте их влажной тряпкой",
-            "По мере роста растению понадобится опора или мох-столб для поддержки"
-        ],
-        "last_updated": datetime.now().isoformat()
-    },
-    {
-        "name": "Суккуленты (общие рекомендации)",
-        "scientific_name": "Различные виды",
-        "category": "комнатное",
-        "description": "Суккуленты — растения с мясистыми листьями, накапливающими влагу. Отличаются неприхотливостью и разнообразием форм.",
-        "origin": "Различные регионы с засушливым климатом",
-        "watering": {
-            "frequency": "раз в 2-3 недели",
-            "amount": "умеренно",
-            "method": "полностью просушивайте почву между поливами",
-            "seasonal_adjustments": {"зима": "сократите полив до 1 раза в месяц", "лето": "следите за почвой"}
-        },
-        "light": {
-            "type": "яркое освещение",
-            "hours": "6+ часов в день",
-            "direction": "южное или западное окно",
-            "additional_info": "большинство видов любят прямой солнечный свет, но некоторые могут требовать защиты в полдень"
-        },
-        "soil": {
-            "type": "хорошо дренированная, песчаная",
-            "ph": "нейтральная",
-            "drainage": "превосходный дренаж обязателен",
-            "composition": "специальная почвенная смесь для кактусов и суккулентов"
-        },
-        "fertilizer": {
-            "frequency": "раз в 2-3 месяца в период роста",
-            "type": "удобрение для кактусов и суккулентов",
-            "strength": "половинная доза",
-            "seasonal": "не удобряйте зимой",
-            "special_needs": "избегайте удобрений с высоким содержанием азота"
-        },
-        "temperature": {
-            "optimal": "18-27°C",
-            "min": "большинство видов 5-10°C",
-            "max": "не выше 40°C",
-            "special_requirements": "большинство суккулентов переносят высокие температуры, но некоторые чувствительны к заморозкам"
-        },
-        "humidity": {
-            "optimal": "низкая",
-            "methods": ["хорошая вентиляция", "обеспечение сухого воздуха"],
-            "special_requirements": "избегайте чрезмерной влажности, которая может вызвать гниение"
-        },
-        "pruning": "обычно не требуется; удаляйте отмершие листья",
-        "propagation": ["листовые черенки", "отводки", "семена"],
-        "common_problems": [
-            {
-                "название": "Вытягивание побегов",
-                "решение": "недостаток света; переместите растение в более солнечное место"
-            },
-            {
-                "название": "Гниение стебля или корней",
-                "решение": "чрезмерный полив; дайте растению полностью высохнуть и сократите полив"
-            },
-            {
-                "название": "Сморщивание листьев",
-                "решение": "недостаток влаги; увеличьте частоту полива"
-            }
-        ],
-        "toxicity": {"для_людей": False, "для_животных": False},
-        "seasonal_care": {
-            "весна": "постепенно увеличивайте полив после зимнего покоя",
-            "лето": "регулярный полив, защита от экстремальной жары",
-            "осень": "подготовка к периоду покоя, сокращение полива",
-            "зима": "минимальный полив, сохранение сухости, яркий свет"
-        },
-        "difficulty": "легкое",
-        "tips": [
-            "Лучше недолить, чем перелить",
-            "Используйте терракотовые горшки, которые позволяют почве быстрее просыхать",
-            "Большинство суккулентов входят в период покоя зимой, когда их рост замедляется"
-        ],
-        "last_updated": datetime.now().isoformat()
-    },
-    {
-        "name": "Хлорофитум",
-        "scientific_name": "Chlorophytum comosum",
-        "category": "комнатное",
-        "description": "Неприхотливое комнатное растение с длинными узкими листьями, часто пестрыми. Также известен как «паучья лилия».",
-        "origin": "Южная Африка",
-        "watering": {
-            "frequency": "раз в 7-10 дней",
-            "amount": "умеренно",
-            "method": "поддерживайте почву слегка влажной, но не мокрой",
-            "seasonal_adjustments": {"зима": "сократите полив", "лето": "следите за почвой"}
-        },
-        "light": {
-            "type": "яркий непрямой свет",
-            "hours": "6+ часов в день",
-            "direction": "подходит любое окно",
-            "additional_info": "пестролистные сорта нуждаются в большем количестве света для сохранения окраски"
-        },
-        "soil": {
-            "type": "легкая, хорошо дренированная",
-            "ph": "нейтральная",
-            "drainage": "хороший дренаж",
-            "composition": "универсальный грунт с добавлением перлита"
-        },
-        "fertilizer": {
-            "frequency": "раз в месяц с весны до осени",
-            "type": "универсальное удобрение для комнатных растений",
-            "strength": "по инструкции",
-            "seasonal": "не удобряйте зимой",
-            "special_needs": ""
-        },
-        "temperature": {
-            "optimal": "18-24°C",
-            "min": "не ниже 10°C",
-            "max": "не выше 30°C",
-            "special_requirements": "переносит широкий диапазон температур"
-        },
-        "humidity": {
-            "optimal": "средняя",
-            "methods": ["опрыскивание", "влажный воздух"],
-            "special_requirements": "нормально чувствует себя в условиях обычной комнатной влажности"
-        },
-        "pruning": "удаляйте пожелтевшие или поврежденные листья; можно удалять столоны (детки) или оставлять для размножения",
-        "propagation": ["разделение кустов", "столоны (молодые растения на концах длинных побегов)"],
-        "common_problems": [
-            {
-                "название": "Коричневые кончики листьев",
-                "решение": "низкая влажность воздуха или недостаток воды; увеличьте влажность или полив"
-            },
-            {
-                "название": "Бледные листья",
-                "решение": "недостаток света у пестролистных сортов; переместите в более светлое место"
-            },
-            {
-                "название": "Отсутствие роста",
-                "решение": "возможно, растению нужно удобрение или пересадка в больший горшок"
-            }
-        ],
-        "toxicity": {"для_людей": False, "для_животных": False},
-        "seasonal_care": {
-            "весна": "хорошее время для деления и пересадки",
-            "лето": "регулярный полив и подкормки, период активного роста",
-            "осень": "сокращение полива и удобрений",
-            "зима": "минимальный полив, без удобрений"
+def load_initial_care_tips(path: str = None) -> List[Dict]:
+    """Read the default care tips used to seed an empty catalog"""
+    with open(path or CARE_TIPS_SEED_PATH, 'r', encoding='utf-8') as f:
+        tips = json.load(f)
+    now = datetime.now().isoformat()
+    for tip in tips:
+        tip.setdefault("last_updated", now)
+    return tips
+
+def normalize_name(name: str) -> str:
+    """Normalize a plant name for index lookups"""
+    return " ".join(name.lower().replace("ё", "е").split())
+
+
+# Fields that identify a plant weigh more in full-text search than care details
+NAME_FIELDS = ("name", "scientific_name", "aliases")
+NAME_FIELD_WEIGHT = 3.0
+UNINDEXED_FIELDS = ("last_updated",)
+
+
+def _field_texts(value) -> List[str]:
+    """All strings nested in a tip field"""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, Mapping):
+        value = value.values()
+    if isinstance(value, (list, tuple, type({}.values()))):
+        return [text for item in value for text in _field_texts(item)]
+    return []
+
+
+def tip_search_fields(tip: Dict) -> List[tuple]:
+    """(text, weight) pairs of a tip for the full-text index"""
+    fields = []
+    for field, value in tip.items():
+        if field in UNINDEXED_FIELDS:
+            continue
+        weight = NAME_FIELD_WEIGHT if field in NAME_FIELDS else 1.0
+        fields.extend((text, weight) for text in _field_texts(value))
+    return fields
+
+
+def build_care_instructions(tip: PlantCareTip) -> Dict:
+    """Structured care instructions for a tip"""
+    return {
+        "name": tip["name"],
+        "scientific_name": tip["scientific_name"],
+        "care_summary": f"Уровень сложности: {tip['difficulty']}",
+        "watering": f"Поливайте {tip['watering']['frequency']}, {tip['watering']['method']}.",
+        "light": f"Требуется {tip['light']['type']} {tip['light']['hours']}.",
+        "temperature": f"Оптимальная температура {tip['temperature']['optimal']}.",
+        "soil": f"{tip['soil']['type']} почва с {tip['soil']['drainage']}.",
+        "humidity": f"{tip['humidity']['optimal']} влажность.",
+        "fertilizing": tip.get("fertilizer", {}).get("frequency", "По необходимости"),
+        "common_problems": [p["название"] for p in tip["common_problems"]],
+        "tips": list(tip["tips"])
+    }
+
+
+def care_response_from_instructions(instructions: Dict) -> Dict:
+    """Care instructions in the shape returned by AIService.get_plant_care_tips"""
+    return {
+        "name": instructions["name"],
+        "care_tips": {
+            "watering": instructions["watering"],
+            "light": instructions["light"],
+            "temperature": instructions["temperature"],
+            "soil": instructions["soil"],
+            "humidity": instructions.get("humidity", ""),
+            "fertilizing": instructions.get("fertilizing", "")
         },
-        "difficulty": "очень легкое",
-        "tips": [
-            "Отлично очищает воздух от формальдегида и других загрязнителей",
-            "Хорошо растет в подвесных кашпо, где могут свободно свисать детки",
-            "Можно выращивать в воде"
-        ],
-        "last_updated": datetime.now().isoformat()
+        "common_problems": instructions.get("common_problems", []),
+        "tips": instructions.get("tips", [])
     }
-]
+
+
+def format_care_response(care_response: Dict) -> str:
+    """Format a found care response as the /care reply (MarkdownV2)"""
+    care_tips = care_response["care_tips"]
+    return (
+        MessageBuilder()
+        .title(care_response['name'], "🌱")
+        .field("Полив", care_tips['watering'], emoji="💧")
+        .field("Освещение", care_tips['light'], emoji="☀️")
+        .field("Температура", care_tips['temperature'], emoji="🌡️")
+        .field("Почва", care_tips['soil'], emoji="🌱")
+        .field("Влажность", care_tips.get('humidity'), emoji="💦")
+        .field("Удобрение", care_tips.get('fertilizing'), emoji="🧪")
+        .section("Распространенные проблемы", care_response.get('common_problems'), emoji="⚠️")
+        .section("Полезные советы", care_response.get('tips'), emoji="💡")
+        .render()
+    )
+
+
+def _render_watering(tip: PlantCareTip, detailed: bool = True) -> str:
+    watering = tip.watering
+    text = f"• Частота: {watering.frequency}\n• Метод: {watering.method}\n"
+    if watering.seasonal_adjustments:
+        adjustments = "".join(f"{season} - {adj}; " for season, adj in watering.seasonal_adjustments.items())
+        text += ("• Сезонные корректировки: " + adjustments).rstrip("; ") + "\n"
+    return text
+
+
+def _render_light(tip: PlantCareTip, detailed: bool = True) -> str:
+    light = tip.light
+    text = f"• Тип: {light.type}\n• Длительность: {light.hours}\n"
+    if light.additional_info:
+        text += f"• Дополнительно: {light.additional_info}\n"
+    return text
+
+
+def _render_soil(tip: PlantCareTip, detailed: bool = True) -> str:
+    soil = tip.soil
+    return f"• Тип: {soil.type}\n• pH: {soil.ph}\n• Дренаж: {soil.drainage}\n"
+
+
+def _render_temperature(tip: PlantCareTip, detailed: bool = True) -> str:
+    temperature = tip.temperature
+    return f"• Оптимальная: {temperature.optimal}\n• Мин.: {temperature.min}\n• Макс.: {temperature.max}\n"
+
+
+def _render_humidity(tip: PlantCareTip, detailed: bool = True) -> str:
+    humidity = tip.humidity
+    return f"• Оптимальная: {humidity.optimal}\n• Методы поддержания: " + ", ".join(humidity.methods) + "\n"
+
+
+def _render_problems(tip: PlantCareTip, detailed: bool = True) -> str:
+    return "".join(f"• *{problem.title}*: {problem.solution}\n" for problem in tip.common_problems)
+
+
+def _render_markdown(tip: PlantCareTip, detailed: bool = True) -> str:
+    if not detailed:
+        return f"*{tip.name}* (*{tip.scientific_name}*): {tip.description}"
+    
+    parts = [
+        f"*{tip.name}* (*{tip.scientific_name}*)\n\n{tip.description}\n\n",
+        "*Полив:*\n", _render_watering(tip),
+        "\n*Освещение:*\n", _render_light(tip),
+        "\n*Почва:*\n", _render_soil(tip),
+        "\n*Температура:*\n", _render_temperature(tip),
+        "\n*Влажность:*\n", _render_humidity(tip),
+    ]
+    if tip.common_problems:
+        parts += ["\n*Распространенные проблемы:*\n", _render_problems(tip)]
+    if tip.tips:
+        parts += ["\n*Полезные советы:*\n"] + [f"• {tip_item}\n" for tip_item in tip.tips]
+    parts.append(f"\n*Сложность ухода:* {tip.difficulty}")
+    return "".join(parts)
+
+
+def _render_care_message(tip: PlantCareTip, detailed: bool = True) -> str:
+    return format_care_response(care_response_from_instructions(build_care_instructions(tip)))
+
+
+# Output formats of PlantCareTipsManager.render_tip: the full card, the /care
+# reply, and single sections for the per-topic buttons
+RENDERERS = {
+    "markdown": _render_markdown,
+    "care": _render_care_message,
+    "watering": _render_watering,
+    "light": _render_light,
+    "soil": _render_soil,
+    "temperature": _render_temperature,
+    "humidity": _render_humidity,
+    "problems": _render_problems,
+}
+
+
+class CareTipCatalog:
+    """One version of the care tips together with their lookup indexes
+    
+    Once installed by the manager a catalog is never changed: reloads build
+    a new one off to the side, and journal entries and local changes are
+    applied to a copy(). The manager swaps it in by replacing its reference,
+    so readers that already hold the old one keep a consistent view.
+    """
+    
+    def __init__(self, tips: List[PlantCareTip] = ()):
+        # Slot -> tip in catalog order, and id(tip) -> slot, so that replacing
+        # or removing a tip does not scan or shift a list
+        self._slots: Dict[int, PlantCareTip] = {}
+        self._slot_of: Dict[int, int] = {}
+        self._next_slot = 0
+        # List view of _slots, rebuilt on first use after a change
+        self._tips: Optional[List[PlantCareTip]] = None
+        # Normalized name -> tips, and normalized scientific name/alias -> tips
+        self.name_index: Dict[str, List[PlantCareTip]] = {}
+        self.alias_index: Dict[str, List[PlantCareTip]] = {}
+        # Typo-tolerant lookup over the same keys
+        self.fuzzy_index = FuzzyIndex()
+        # Ranked full-text search over all text fields
+        self.text_index = InvertedIndex()
+        # Render cache version per name key; changed by put() and remove()
+        self.base_version = next(_render_versions)
+        self.versions: Dict[str, int] = {}
+        for tip in tips:
+            self._store(tip)
+            self.index_tip(tip)
+    
+    def __len__(self):
+        return len(self._slots)
+    
+    def copy(self) -> "CareTipCatalog":
+        """A catalog with the same tips whose changes do not affect this one
+        
+        Copies the indexes instead of rebuilding them, so applying a few
+        changes costs far less than a reload.
+        """
+        clone = CareTipCatalog.__new__(CareTipCatalog)
+        clone._slots = dict(self._slots)
+        clone._slot_of = dict(self._slot_of)
+        clone._next_slot = self._next_slot
+        clone._tips = self._tips
+        clone.name_index = {key: list(tips) for key, tips in self.name_index.items()}
+        clone.alias_index = {key: list(tips) for key, tips in self.alias_index.items()}
+        clone.fuzzy_index = self.fuzzy_index.copy()
+        clone.text_index = self.text_index.copy()
+        clone.base_version = self.base_version
+        clone.versions = dict(self.versions)
+        return clone
+    
+    def version(self, key: str) -> int:
+        """Render cache version of the tip stored under a name key"""
+        return self.versions.get(key, self.base_version)
+    
+    @property
+    def tips(self) -> List[PlantCareTip]:
+        """The tips in catalog order (shared, do not modify)"""
+        tips = self._tips
+        if tips is None:
+            tips = self._tips = list(self._slots.values())
+        return tips
+    
+    def _store(self, tip: PlantCareTip, slot: Optional[int] = None):
+        """Put a tip in a slot, by default a new one at the end"""
+        if slot is None:
+            slot = self._next_slot
+            self._next_slot += 1
+        self._slots[slot] = tip
+        self._slot_of[id(tip)] = slot
+        self._tips = None
+    
+    @staticmethod
+    def _alias_keys(tip: PlantCareTip) -> List[str]:
+        keys = [tip.get("scientific_name") or ""] + list(tip.get("aliases") or [])
+        return [normalize_name(key) for key in keys if key and key.strip()]
+    
+    def index_tip(self, tip: PlantCareTip):
+        """Add a tip to the lookup indexes"""
+        name_key = normalize_name(tip["name"])
+        self.name_index.setdefault(name_key, []).append(tip)
+        self.fuzzy_index.add(name_key, tip)
+        for key in self._alias_keys(tip):
+            self.alias_index.setdefault(key, []).append(tip)
+            self.fuzzy_index.add(key, tip)
+        self.text_index.add(tip, tip_search_fields(tip))
+    
+    def unindex_tip(self, tip: PlantCareTip):
+        """Remove a tip from the lookup indexes"""
+        self.text_index.remove(tip)
+        
+        entries = [(self.name_index, normalize_name(tip["name"]))]
+        entries += [(self.alias_index, key) for key in self._alias_keys(tip)]
+        
+        for index, key in entries:
+            tips = index.get(key, [])
+            tips[:] = [other for other in tips if other is not tip]
+            if not tips:
+                index.pop(key, None)
+            self.fuzzy_index.remove(key, tip)
+    
+    def find_exact(self, name: str) -> Optional[PlantCareTip]:
+        """Find a tip by exact (normalized) name, scientific name or alias"""
+        key = normalize_name(name)
+        tips = self.name_index.get(key) or self.alias_index.get(key)
+        return tips[0] if tips else None
+    
+    def put(self, key: str, tip: PlantCareTip) -> Optional[PlantCareTip]:
+        """Insert a tip, or replace the one stored under key
+        
+        Returns:
+            The replaced tip, if any
+        """
+        tips = self.name_index.get(key)
+        old_tip = tips[0] if tips else None
+        slot = None
+        if old_tip is not None:
+            # Keep the replacement (possibly renamed) at the same position
+            slot = self._slot_of.pop(id(old_tip))
+            self.unindex_tip(old_tip)
+        self._store(tip, slot)
+        self.index_tip(tip)
+        if old_tip is not None:
+            self.versions[key] = next(_render_versions)
+        self.versions[normalize_name(tip.name)] = next(_render_versions)
+        return old_tip
+    
+    def remove(self, key: str) -> Optional[PlantCareTip]:
+        """Remove the tip stored under key, returning it"""
+        tips = self.name_index.get(key)
+        if not tips:
+            return None
+        tip = tips[0]
+        del self._slots[self._slot_of.pop(id(tip))]
+        self._tips = None
+        self.unindex_tip(tip)
+        self.versions[key] = next(_render_versions)
+        return tip
+    
+    def apply(self, entry: Dict):
+        """Apply a journal entry"""
+        if entry.get("op") == "delete":
+            self.remove(entry.get("key"))
+        elif entry.get("op") == "put":
+            self.put(entry.get("key"), to_record(entry["tip"]))
+
 
 class PlantCareTipsManager:
     """Class for managing plant care tips database"""
     
     def __init__(self):
-        self.care_tips = []
+        self._catalog = CareTipCatalog()
+        self._journal = AppendOnlyJournal(CARE_TIPS_JOURNAL_PATH)
+        # Serializes writers across worker processes; see refresh()
+        self._file_lock = FileLock(CARE_TIPS_LOCK_PATH)
+        self._snapshot_id: Optional[tuple] = None
+        # Snapshot that failed to parse; retried once the file changes again
+        self._bad_snapshot_id: Optional[tuple] = None
+        self._last_refresh = time.monotonic()
+        # Rendered text per (name key, version, ...); see _memoized
+        self._render_cache: OrderedDict = OrderedDict()
+        # Background reloads; see reload_in_background()
+        self._reload_lock = threading.Lock()
+        self._reloading = False
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
         self.load_care_tips()
     
+    @property
+    def care_tips(self) -> List[PlantCareTip]:
+        return self._catalog.tips
+    
+    def _find_exact(self, name: str) -> Optional[PlantCareTip]:
+        """Find a tip by exact (normalized) name, scientific name or alias"""
+        return self._catalog.find_exact(name)
+    
+    def find_similar(self, name: str, limit: int = 5, max_distance: Optional[int] = None) -> List[Tuple[PlantCareTip, int]]:
+        """Find tips whose name, scientific name or alias is close to the given one
+        
+        Args:
+            name: Plant name, possibly misspelled
+            limit: Maximum number of candidates
+            max_distance: Edit distance budget; by default it grows with the name length
+            
+        Returns:
+            (tip, distance) pairs, closest first, each tip at most once
+        """
+        self.refresh()
+        results = []
+        seen = set()
+        # Over-fetch since one tip can match through several keys
+        for tip, distance in self._catalog.fuzzy_index.search(normalize_name(name), max_distance, limit * 3):
+            if id(tip) in seen:
+                continue
+            seen.add(id(tip))
+            results.append((tip, distance))
+            if len(results) >= limit:
+                break
+        return results
+    
     def load_care_tips(self):
-        """Load care tips from JSON file or initialize with defaults"""
+        """Load care tips from the JSON snapshot and replay the change journal"""
+        os.makedirs(os.path.dirname(CARE_TIPS_PATH), exist_ok=True)
+        with self._file_lock.acquire():
+            self._load(compact=True)
+    
+    def _load(self, compact: bool):
+        """Load snapshot and journal; the caller holds the file lock"""
+        snapshot_id, raw, entries, offset = self._read_files()
         try:
-            if os.path.exists(CARE_TIPS_PATH):
-                with open(CARE_TIPS_PATH, 'r', encoding='utf-8') as f:
-                    self.care_tips = json.load(f)
-                    logger.info(f"Loaded {len(self.care_tips)} plant care tips from {CARE_TIPS_PATH}")
+            # Fall back to the defaults only if there is nothing to keep serving
+            catalog = self._build_catalog(raw, entries, fallback=not self._catalog.tips)
+        except ValueError as e:
+            logger.error(f"Error loading plant care tips, keeping the current catalog: {e}")
+            self._bad_snapshot_id = snapshot_id
+            return
+        self._install(catalog, snapshot_id, offset, len(entries))
+        
+        if compact and (entries or raw is None):
+            self.save_care_tips()
+    
+    def _read_files(self) -> Tuple[Optional[tuple], Optional[bytes], List[Dict], int]:
+        """Read the snapshot and journal; the caller holds the file lock
+        
+        Returns:
+            (snapshot id, snapshot bytes or None if there is no snapshot,
+            journal entries, journal offset after them)
+        """
+        snapshot_id = self._snapshot_stat()
+        raw = None
+        if snapshot_id is not None:
+            try:
+                with open(CARE_TIPS_PATH, 'rb') as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                snapshot_id = None
+        
+        try:
+            entries, offset = self._journal.read()
+        except Exception as e:
+            logger.error(f"Error reading plant care tips journal: {e}")
+            entries, offset = [], self._journal.size()
+        return snapshot_id, raw, entries, offset
+    
+    def _build_catalog(self, raw: Optional[bytes], entries: List[Dict], fallback: bool = True) -> CareTipCatalog:
+        """Parse a snapshot, apply journal entries and index the result
+        
+        Needs no lock, so reloads can do the expensive part off to the side.
+        
+        Raises:
+            ValueError: The snapshot cannot be parsed and fallback is False
+        """
+        try:
+            if raw is not None:
+                tips = json.loads(raw)
+                logger.info(f"Loaded {len(tips)} plant care tips from {CARE_TIPS_PATH}")
             else:
-                self.care_tips = INITIAL_PLANT_CARE_TIPS
-                self.save_care_tips()
-                logger.info(f"Initialized plant care tips database with {len(self.care_tips)} default entries")
+                tips = load_initial_care_tips()
+                logger.info(f"Initialized plant care tips database with {len(tips)} default entries")
         except Exception as e:
+            if not fallback:
+                raise ValueError(e) from e
             logger.error(f"Error loading plant care tips: {e}")
-            self.care_tips = INITIAL_PLANT_CARE_TIPS
+            tips = self._fallback_care_tips()
             logger.info("Using default plant care tips due to loading error")
+        
+        if entries:
+            tips_by_key = {normalize_name(tip["name"]): tip for tip in tips}
+            try:
+                for entry in entries:
+                    self._apply_journal_entry(tips_by_key, entry)
+            except Exception as e:
+                logger.error(f"Error replaying plant care tips journal: {e}")
+            tips = list(tips_by_key.values())
+            logger.info(f"Replayed {len(entries)} plant care tip changes from {CARE_TIPS_JOURNAL_PATH}")
+        
+        return CareTipCatalog(to_record(tip) for tip in tips)
+    
+    def _install(self, catalog: CareTipCatalog, snapshot_id: Optional[tuple], offset: int, entries: int):
+        """Swap in a catalog built from the snapshot and journal up to offset
+        
+        Readers holding the old catalog keep using it; rendered texts of
+        the old tips are not reused.
+        """
+        self._catalog = catalog
+        self._render_cache = OrderedDict()
+        self._snapshot_id = snapshot_id
+        self._bad_snapshot_id = None
+        self._journal.offset = offset
+        self._journal.entries = entries
+    
+    @staticmethod
+    def _snapshot_stat() -> Optional[tuple]:
+        """Identity of the snapshot file; changes when another process compacts"""
+        try:
+            st = os.stat(CARE_TIPS_PATH)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    def _snapshot_changed(self) -> bool:
+        """Whether the snapshot was replaced (or edited) since we loaded it"""
+        snapshot_id = self._snapshot_stat()
+        # A deleted snapshot is not reloaded as the defaults; the next save rewrites it
+        if snapshot_id is not None and snapshot_id not in (self._snapshot_id, self._bad_snapshot_id):
+            return True
+        return self._journal.size() < self._journal.offset
+    
+    def refresh(self, force: bool = False) -> bool:
+        """Pick up changes other processes made to the catalog
+        
+        The snapshot and journal are the change feed: a cheap stat shows
+        whether anything changed since we last read them. Called from the
+        read methods (on the event loop) at most every REFRESH_INTERVAL
+        seconds, so it never takes the file lock: new journal entries and
+        a new snapshot are both picked up by a background thread, and the
+        current catalog is served until it is ready.
+        
+        Returns:
+            True if a background update was started
+        """
+        now = time.monotonic()
+        if not force and now - self._last_refresh < REFRESH_INTERVAL:
+            return False
+        self._last_refresh = now
+        
+        if self._snapshot_changed() or self._journal.size() > self._journal.offset:
+            return self.reload_in_background()
+        return False
+    
+    def _catch_up(self) -> bool:
+        """Apply changes written by other processes; the caller holds the file lock
+        
+        The journal entries are applied to a copy of the catalog, which is
+        then swapped in.
+        """
+        if self._snapshot_changed():
+            # Another process compacted: reload from the new snapshot
+            self._load(compact=False)
+            return True
+        
+        entries, offset = self._journal.read(self._journal.offset)
+        if entries:
+            catalog = self._catalog.copy()
+            for entry in entries:
+                catalog.apply(entry)
+            self._catalog = catalog
+            logger.info(f"Applied {len(entries)} plant care tip changes from other workers")
+        self._journal.offset = offset
+        self._journal.entries += len(entries)
+        return bool(entries)
+    
+    def reload_in_background(self) -> bool:
+        """Update the catalog from the files in a background thread
+        
+        A new snapshot is loaded in full; new journal entries alone are
+        applied to a copy of the current catalog.
+        
+        Returns:
+            False if a reload is already running
+        """
+        with self._reload_lock:
+            if self._reloading:
+                return False
+            self._reloading = True
+        threading.Thread(target=self._reload, name="care-tips-reload", daemon=True).start()
+        return True
+    
+    def _reload(self):
+        """Build a new catalog without holding the file lock, then swap it in
+        
+        The file lock is only held to read the files and, at the end, to
+        apply journal entries written during the build. If the snapshot was
+        replaced meanwhile, the build starts over. A snapshot that cannot be
+        parsed (e.g. a bad manual edit) leaves the current catalog in place.
+        If only the journal grew, its new entries are applied by _catch_up().
+        """
+        try:
+            while True:
+                wait = self._settle_time(self._snapshot_stat()) if self._snapshot_changed() else 0
+                if wait > 0:
+                    # Still being written
+                    time.sleep(wait)
+                    continue
+                
+                with self._file_lock.acquire(shared=True):
+                    if not self._snapshot_changed():
+                        self._catch_up()
+                        return
+                    snapshot_id, raw, entries, offset = self._read_files()
+                
+                started = time.monotonic()
+                try:
+                    catalog = self._build_catalog(raw, entries, fallback=False)
+                except ValueError as e:
+                    if self._snapshot_stat() != snapshot_id or self._settle_time(snapshot_id) > 0:
+                        continue
+                    logger.error(f"Error reloading plant care tips, keeping the current catalog: {e}")
+                    self._bad_snapshot_id = snapshot_id
+                    return
+                
+                with self._file_lock.acquire(shared=True):
+                    if self._snapshot_stat() != snapshot_id or self._journal.size() < offset:
+                        continue
+                    tail, tail_offset = self._journal.read(offset)
+                    for entry in tail:
+                        catalog.apply(entry)
+                    self._install(catalog, snapshot_id, tail_offset, len(entries) + len(tail))
+                
+                logger.info(f"Reloaded {len(catalog)} plant care tips in {time.monotonic() - started:.2f}s")
+                return
+        except Exception as e:
+            logger.error(f"Error reloading plant care tips: {e}")
+        finally:
+            with self._reload_lock:
+                self._reloading = False
+    
+    @staticmethod
+    def _settle_time(snapshot_id: Optional[tuple]) -> float:
+        """Seconds until a snapshot has gone CARE_TIPS_SETTLE_TIME without changes"""
+        if snapshot_id is None:
+            return 0.0
+        return CARE_TIPS_SETTLE_TIME - (time.time() - snapshot_id[1] / 1e9)
+    
+    def watch(self, interval: float = CARE_TIPS_WATCH_INTERVAL) -> threading.Thread:
+        """Reload the catalog whenever the snapshot file changes
+        
+        Polls the file's inode, mtime and size every interval seconds in a
+        daemon thread, so edits to CARE_TIPS_PATH are picked up without a
+        restart and without waiting for a read to notice them.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+        
+        def poll():
+            while not self._stop_watching.wait(interval):
+                if self._snapshot_changed():
+                    self.reload_in_background()
+        
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=poll, name="care-tips-watcher", daemon=True)
+        self._watcher.start()
+        return self._watcher
+    
+    def stop_watching(self):
+        self._stop_watching.set()
+        self._watcher = None
+    
+    @staticmethod
+    def _fallback_care_tips() -> List[Dict]:
+        try:
+            return load_initial_care_tips()
+        except Exception as e:
+            logger.error(f"Error loading default plant care tips: {e}")
+            return []
+    
+    @staticmethod
+    def _apply_journal_entry(tips_by_key: Dict[str, Dict], entry: Dict):
+        key = entry.get("key")
+        if entry.get("op") == "delete":
+            tips_by_key.pop(key, None)
+        elif entry.get("op") == "put":
+            tip = entry["tip"]
+            new_key = normalize_name(tip["name"])
+            if key != new_key and key in tips_by_key:
+                # Renamed: keep the tip at its position
+                items = [(new_key, tip) if k == key else (k, v) for k, v in tips_by_key.items()]
+                tips_by_key.clear()
+                tips_by_key.update(items)
+            else:
+                tips_by_key[new_key] = tip
+    
+    def _put_tip(self, key: str, tip: PlantCareTip):
+        """Insert a tip, or replace the one stored under key, in a new catalog"""
+        catalog = self._catalog.copy()
+        catalog.put(key, tip)
+        self._catalog = catalog
+    
+    def _remove_tip(self, key: str):
+        catalog = self._catalog.copy()
+        catalog.remove(key)
+        self._catalog = catalog
+    
+    def _log_change(self, op: str, key: str, tip: Optional[PlantCareTip] = None) -> bool:
+        """Append a change to the journal, compacting it when it grows too long"""
+        entry = {"op": op, "key": key}
+        if tip is not None:
+            entry["tip"] = tip.to_dict()
+        try:
+            self._journal.append(entry)
+        except Exception as e:
+            logger.error(f"Error writing plant care tips journal: {e}")
+            return False
+        
+        if self._journal.entries >= max(JOURNAL_COMPACT_MIN_ENTRIES, len(self.care_tips)):
+            return self.save_care_tips()
+        return True
     
     def save_care_tips(self):
-        """Save care tips to JSON file"""
+        """Write a full snapshot of the care tips and truncate the journal"""
         try:
-            with open(CARE_TIPS_PATH, 'w', encoding='utf-8') as f:
-                json.dump(self.care_tips, f, ensure_ascii=False, indent=2)
+            with self._file_lock.acquire():
+                atomic_write_json(CARE_TIPS_PATH, [tip.to_dict() for tip in self.care_tips], indent=2)
+                self._journal.truncate()
+                self._snapshot_id = self._snapshot_stat()
             logger.info(f"Saved {len(self.care_tips)} plant care tips to {CARE_TIPS_PATH}")
             return True
         except Exception as e:
             logger.error(f"Error saving plant care tips: {e}")
             return False
     
-    def get_all_tips(self) -> List[Dict]:
+    def get_all_tips(self) -> List[PlantCareTip]:
         """Get all plant care tips"""
+        self.refresh()
         return self.care_tips
     
-    def get_tip_by_name(self, name: str) -> Optional[Dict]:
-        """Get plant care tip by name"""
-        for tip in self.care_tips:
-            if tip["name"].lower() == name.lower():
-                return tip
-        
-        # Try partial match
-        for tip in self.care_tips:
-            if name.lower() in tip["name"].lower():
-                return tip
+    def get_tip_by_name(self, name: str) -> Optional[PlantCareTip]:
+        """Get plant care tip by exact name, scientific name or alias
         
-        return None
+        Misspelled or partial names give None; use suggest_tips() to offer
+        close matches instead of silently picking another plant.
+        """
+        self.refresh()
+        return self._catalog.find_exact(name)
     
-    def search_tips(self, query: str) -> List[Dict]:
-        """Search plant care tips by query"""
-        query = query.lower()
-        results = []
+    def suggest_tips(self, name: str, limit: int = 3,
+                     min_similarity: float = SUGGEST_MIN_SIMILARITY) -> List[PlantCareTip]:
+        """Tips the user may have meant by a name that has no exact match
         
-        for tip in self.care_tips:
-            if (query in tip["name"].lower() or 
-                query in tip["scientific_name"].lower() or 
-                query in tip["description"].lower()):
-                results.append(tip)
+        Close misspellings come first, then tips whose name contains the
+        query. Meant for "did you mean ..." replies, not for lookups.
+        """
+        key = normalize_name(name)
+        if not key:
+            return []
         
-        return results
+        suggestions = []
+        seen = set()
+        for tip, distance in self.find_similar(key, limit=limit):
+            if 1 - distance / len(key) >= min_similarity:
+                suggestions.append(tip)
+                seen.add(id(tip))
+        
+        if len(key) >= SUGGEST_MIN_SUBSTRING:
+            for tip in self._catalog.tips:
+                if len(suggestions) >= limit:
+                    break
+                if id(tip) not in seen and key in normalize_name(tip["name"]):
+                    suggestions.append(tip)
+                    seen.add(id(tip))
+        
+        return suggestions[:limit]
+    
+    def search_tips(self, query: str, limit: int = 10) -> List[PlantCareTip]:
+        """Search plant care tips by query, most relevant first"""
+        self.refresh()
+        return [tip for tip, _ in self._catalog.text_index.search(query, limit)]
     
     def add_tip(self, tip_data: Dict) -> bool:
         """Add new plant care tip"""
-        # Check if plant already exists
-        existing_tip = self.get_tip_by_name(tip_data["name"])
-        if existing_tip:
-            return False
-        
-        # Add timestamp
-        tip_data["last_updated"] = datetime.now().isoformat()
-        
-        # Add to tips list
-        self.care_tips.append(tip_data)
-        
-        # Save to file
-        return self.save_care_tips()
+        with self._file_lock.acquire():
+            # Another worker may have added the same plant meanwhile
+            self._catch_up()
+            
+            # Check if plant already exists (exact match only, so that
+            # similarly spelled species are not rejected as typos)
+            existing_tip = self._find_exact(tip_data["name"])
+            if existing_tip:
+                return False
+            
+            # Add timestamp
+            tip_data["last_updated"] = datetime.now().isoformat()
+            tip = to_record(tip_data)
+            
+            key = normalize_name(tip.name)
+            self._put_tip(key, tip)
+            return self._log_change("put", key, tip)
     
     def update_tip(self, name: str, updated_data: Dict) -> bool:
         """Update existing plant care tip"""
-        for i, tip in enumerate(self.care_tips):
-            if tip["name"].lower() == name.lower():
-                # Update timestamp
-                updated_data["last_updated"] = datetime.now().isoformat()
-                
-                # Update tip
-                self.care_tips[i] = {**tip, **updated_data}
-                
-                # Save to file
-                return self.save_care_tips()
-        
-        return False
+        with self._file_lock.acquire():
+            self._catch_up()
+            
+            key = normalize_name(name)
+            tips = self._catalog.name_index.get(key)
+            if not tips:
+                return False
+            
+            # Update timestamp
+            updated_data["last_updated"] = datetime.now().isoformat()
+            
+            updated_tip = to_record({**tips[0], **updated_data})
+            self._put_tip(key, updated_tip)
+            return self._log_change("put", key, updated_tip)
     
     def delete_tip(self, name: str) -> bool:
         """Delete plant care tip by name"""
-        for i, tip in enumerate(self.care_tips):
-            if tip["name"].lower() == name.lower():
-                self.care_tips.pop(i)
-                return self.save_care_tips()
-        
-        return False
+        with self._file_lock.acquire():
+            self._catch_up()
+            
+            key = normalize_name(name)
+            if key not in self._catalog.name_index:
+                return False
+            
+            self._remove_tip(key)
+            return self._log_change("delete", key)
     
-    def format_care_tip(self, tip: Dict, detailed: bool = True) -> str:
+    def format_care_tip(self, tip: Union[PlantCareTip, Dict], detailed: bool = True) -> str:
         """Format plant care tip for display"""
         if not tip:
             return "Информация не найдена"
         
-        if not detailed:
-            return f"*{tip['name']}* (*{tip['scientific_name']}*): {tip['description']}"
-        
-        text = f"*{tip['name']}* (*{tip['scientific_name']}*)\n\n"
-        text += f"{tip['description']}\n\n"
-        
-        text += "*Полив:*\n"
-        text += f"• Частота: {tip['watering']['frequency']}\n"
-        text += f"• Метод: {tip['watering']['method']}\n"
-        if tip['watering']['seasonal_adjustments']:
-            text += "• Сезонные корректировки: "
-            for season, adj in tip['watering']['seasonal_adjustments'].items():
-                text += f"{season} - {adj}; "
-            text = text.rstrip("; ") + "\n"
-        
-        text += "\n*Освещение:*\n"
-        text += f"• Тип: {tip['light']['type']}\n"
-        text += f"• Длительность: {tip['light']['hours']}\n"
-        if tip['light']['additional_info']:
-            text += f"• Дополнительно: {tip['light']['additional_info']}\n"
-        
-        text += "\n*Почва:*\n"
-        text += f"• Тип: {tip['soil']['type']}\n"
-        text += f"• pH: {tip['soil']['ph']}\n"
-        text += f"• Дренаж: {tip['soil']['drainage']}\n"
-        
-        text += "\n*Температура:*\n"
-        text += f"• Оптимальная: {tip['temperature']['optimal']}\n"
-        text += f"• Мин.: {tip['temperature']['min']}\n"
-        text += f"• Макс.: {tip['temperature']['max']}\n"
-        
-        text += "\n*Влажность:*\n"
-        text += f"• Оптимальная: {tip['humidity']['optimal']}\n"
-        text += "• Методы поддержания: " + ", ".join(tip['humidity']['methods']) + "\n"
-        
-        if tip['common_problems']:
-            text += "\n*Распространенные проблемы:*\n"
-            for problem in tip['common_problems']:
-                text += f"• *{problem['название']}*: {problem['решение']}\n"
+        return self.render_tip(tip, detailed)
+    
+    def render_tip(self, tip: Union[PlantCareTip, Dict], detailed: bool = True, fmt: str = "markdown") -> str:
+        """Render a tip in one of RENDERERS, memoized for tips in the catalog"""
+        return self._memoized(to_record(tip), ("render", detailed, fmt), lambda tip: RENDERERS[fmt](tip, detailed))
+    
+    def render(self, plant_name: str, fmt: str = "markdown", detailed: bool = True) -> Optional[str]:
+        """Find a plant by name and render its tip, or None if it is not in the catalog
         
-        if tip['tips']:
-            text += "\n*Полезные советы:*\n"
-            for tip_item in tip['tips']:
-                text += f"• {tip_item}\n"
+        Missing sections (e.g. no watering data) also give None.
+        """
+        tip = self.get_tip_by_name(plant_name)
+        if not tip:
+            return None
+        try:
+            return self.render_tip(tip, detailed, fmt)
+        except AttributeError:
+            return None
+    
+    def _memoized(self, tip: PlantCareTip, kind: tuple, build):
+        """Cached build(tip) keyed by (name key, version, *kind)
         
-        text += f"\n*Сложность ухода:* {tip['difficulty']}"
+        Only the current catalog entry for a name is cached; a catalog that
+        replaces or removes it gives the name a new version, so stale
+        entries are never hit again and age out of the LRU.
+        """
+        key = normalize_name(tip.name)
+        # The tip and its version must come from the same catalog
+        catalog = self._catalog
+        tips = catalog.name_index.get(key)
+        if not tips or tips[0] is not tip:
+            return build(tip)
         
-        return text
+        # A reload replaces the cache; keep using the one we looked at
+        cache = self._render_cache
+        cache_key = (key, catalog.version(key)) + kind
+        value = cache.get(cache_key)
+        if value is None:
+            value = build(tip)
+            cache[cache_key] = value
+            if len(cache) > RENDER_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(cache_key)
+        return value
+    
+    def care_instructions(self, tip: PlantCareTip) -> Dict:
+        """Structured care instructions for a tip (a fresh copy of the cached dict)"""
+        return dict(self._memoized(tip, ("instructions",), build_care_instructions))
 
     def generate_care_instructions(self, plant_name: str) -> Optional[Dict]:
         """Generate structured care instructions for a plant"""
@@ -543,22 +966,7 @@ class PlantCareTipsManager:
         if not tip:
             return None
         
-        # Create structured care instructions
-        instructions = {
-            "name": tip["name"],
-            "scientific_name": tip["scientific_name"],
-            "care_summary": f"Уровень сложности: {tip['difficulty']}",
-            "watering": f"Поливайте {tip['watering']['frequency']}, {tip['watering']['method']}.",
-            "light": f"Требуется {tip['light']['type']} {tip['light']['hours']}.",
-            "temperature": f"Оптимальная температура {tip['temperature']['optimal']}.",
-            "soil": f"{tip['soil']['type']} почва с {tip['soil']['drainage']}.",
-            "humidity": f"{tip['humidity']['optimal']} влажность.",
-            "fertilizing": tip.get("fertilizer", {}).get("frequency", "По необходимости"),
-            "common_problems": [p["название"] for p in tip["common_problems"]],
-            "tips": tip["tips"]
-        }
-        
-        return instructions
+        return self.care_instructions(tip)
     
     def get_seasonal_care(self, plant_name: str, season: str) -> Optional[str]:
         """Get seasonal care advice for a plant"""
@@ -573,32 +981,63 @@ class PlantCareTipsManager:
         return None
 
 
-# Initialize the manager
-plant_care_manager = PlantCareTipsManager()
+# The manager is created on first use (or by warm()), so importing this
+# module does no file I/O
+_manager: Optional[PlantCareTipsManager] = None
+_manager_lock = threading.Lock()
+
 
-# Add to global scope for easy access
-def get_plant_care_manager():
-    """Get the plant care tips manager instance"""
-    return plant_care_manager
+def get_plant_care_manager() -> PlantCareTipsManager:
+    """Get the plant care tips manager instance, loading the catalog on first call"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = PlantCareTipsManager()
+    return _manager
 
-def get_tip_by_name(name: str) -> Optional[Dict]:
+
+def warm(watch: bool = False) -> PlantCareTipsManager:
+    """Load the catalog ahead of the first request
+    
+    Args:
+        watch: Also reload the catalog whenever its file changes
+    """
+    manager = get_plant_care_manager()
+    if watch:
+        manager.watch()
+    return manager
+
+
+def __getattr__(name):
+    # Backwards compatibility for `plant_care_tips.plant_care_manager`
+    if name == "plant_care_manager":
+        return get_plant_care_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def get_tip_by_name(name: str) -> Optional[PlantCareTip]:
     """Get plant care tip by name"""
-    return plant_care_manager.get_tip_by_name(name)
+    return get_plant_care_manager().get_tip_by_name(name)
+
+def suggest_tips(name: str, limit: int = 3) -> List[PlantCareTip]:
+    """Get tips the user may have meant by a name with no exact match"""
+    return get_plant_care_manager().suggest_tips(name, limit)
 
-def search_tips(query: str) -> List[Dict]:
+def search_tips(query: str, limit: int = 10) -> List[PlantCareTip]:
     """Search plant care tips by query"""
-    return plant_care_manager.search_tips(query)
+    return get_plant_care_manager().search_tips(query, limit)
 
-def format_care_tip(tip: Dict, detailed: bool = True) -> str:
+def format_care_tip(tip: Union[PlantCareTip, Dict], detailed: bool = True) -> str:
     """Format plant care tip for display"""
-    return plant_care_manager.format_care_tip(tip, detailed)
+    return get_plant_care_manager().format_care_tip(tip, detailed)
 
 def generate_care_instructions(plant_name: str) -> Optional[Dict]:
     """Generate structured care instructions for a plant"""
-    return plant_care_manager.generate_care_instructions(plant_name)
+    return get_plant_care_manager().generate_care_instructions(plant_name)
 
 # If this file is run directly, initialize the database
 if __name__ == "__main__":
+    plant_care_manager = warm()
     print(f"Loaded {len(plant_care_manager.get_all_tips())} plant care tips")
     print("Sample tip:")
     sample_tip = plant_care_manager.get_all_tips()[0]
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    AI_ANSWER_TTL_HOURS, PREWARM_END_HOUR, PREWARM_MAX_ANSWERS, PREWARM_START_HOUR, PREWARM_TOKEN_BUDGET
+)
+
+logger = logging.getLogger(__name__)
+
+# Answers expiring sooner than this are regenerated, so that they last until
+# the next off-peak window
+REFRESH_MARGIN = timedelta(hours=24)
+
+# Days of interaction logs used to rank plant topics
+DEMAND_DAYS = 14
+
+
+def answer_key(plant_name: str, topic: Dict) -> str:
+    """Key of a stored AI answer to a plant topic"""
+    return f"{plant_name.strip().lower()}:{topic['interaction']}"
+
+
+def local_answer(db, plant_name: str, topic: Dict) -> Optional[str]:
+    """Answer to a plant topic that needs no AI call
+
+    The plant's extra_data comes first, then the care tips catalog, then a
+    stored AI answer that has not expired.
+    """
+    plant = db.get_plant_by_name(plant_name)
+    if plant and 'extra_data' in plant and plant['extra_data'].get(topic["extra_key"]):
+        return plant['extra_data'][topic["extra_key"]]
+
+    from plant_care_tips import get_plant_care_manager
+    info = get_plant_care_manager().render(plant_name, fmt=topic["render"])
+    if info:
+        return info
+
+    answer = db.get_ai_answer(answer_key(plant_name, topic))
+    return answer["text"] if answer else None
+
+
+def in_window(hour: int, start_hour: int, end_hour: int) -> bool:
+    """Whether a local hour is in [start_hour, end_hour), which may wrap midnight"""
+    if start_hour <= end_hour:
+        return start_hour <= hour < end_hour
+    return hour >= start_hour or hour < end_hour
+
+
+class AnswerPrewarmer:
+    """Pre-generates AI answers to the most requested plant topics off-peak
+
+    Plant/topic pairs are ranked by how often they were requested (the
+    users' interaction logs) plus how often the plant was recognized from
+    photos (image_count), spread over the topics in proportion to their
+    overall demand. During the off-peak window the top pairs that have no
+    local answer are generated one by one until the token budget is spent,
+    and stored for ttl_hours so that peak-time button presses are served
+    from the database.
+    """
+
+    def __init__(self, db, ai_service, topics: Dict[str, Dict], token_budget: int = PREWARM_TOKEN_BUDGET,
+                 max_answers: int = PREWARM_MAX_ANSWERS, ttl_hours: float = AI_ANSWER_TTL_HOURS,
+                 start_hour: int = PREWARM_START_HOUR, end_hour: int = PREWARM_END_HOUR):
+        self.db = db
+        self.ai_service = ai_service
+        self.topics = {topic["interaction"]: topic for topic in topics.values()}
+        self.token_budget = token_budget
+        self.max_answers = max_answers
+        self.ttl_hours = ttl_hours
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self._last_run: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def rank(self) -> List[Tuple[float, str, Dict]]:
+        """Plant/topic pairs by expected demand
+
+        Returns:
+            (score, plant name, topic) tuples, highest score first
+        """
+        demand = self.db.get_plant_topic_demand(list(self.topics), days=DEMAND_DAYS)
+        scores: Dict[Tuple[str, str], float] = {}
+        totals = {section: 0 for section in self.topics}
+        for row in demand:
+            scores[(row["plant_name"], row["section"])] = float(row["count"])
+            totals[row["section"]] += row["count"]
+
+        # Photo recognitions count towards every topic, weighted by topic popularity
+        total = sum(totals.values()) + len(totals)
+        shares = {section: (count + 1) / total for section, count in totals.items()}
+        for plant in self.db.get_plants_by_image_count(self.max_answers):
+            for section, share in shares.items():
+                key = (plant["name"], section)
+                scores[key] = scores.get(key, 0.0) + plant["image_count"] * share
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:self.max_answers]
+        return [(score, plant_name, self.topics[section]) for (plant_name, section), score in ranked]
+
+    def _needs_answer(self, plant_name: str, topic: Dict, now: datetime) -> bool:
+        stored = self.db.get_ai_answer(answer_key(plant_name, topic))
+        if stored is not None:
+            return stored["expires_at"] - now < REFRESH_MARGIN
+        # Plants with data of their own never reach the AI
+        return local_answer(self.db, plant_name, topic) is None
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict:
+        """Generate answers for the top pairs until the token budget is spent
+
+        Returns:
+            dict: generated, failed and skipped answer counts and tokens used
+        """
+        from ai_service import AIServiceError
+
+        now = now or datetime.now()
+        stats = {"generated": 0, "failed": 0, "skipped": 0, "tokens": 0}
+        self.db.delete_expired_ai_answers()
+
+        for score, plant_name, topic in self.rank():
+            if self.token_budget - stats["tokens"] < topic["max_tokens"]:
+                break
+            if not self._needs_answer(plant_name, topic, now):
+                stats["skipped"] += 1
+                continue
+
+            try:
+                text, tokens = await self.ai_service.complete(topic["prompt"].format(plant=plant_name),
+                                                              max_tokens=topic["max_tokens"])
+            except AIServiceError:
+                # Counted against the budget so a failing API does not loop
+                stats["failed"] += 1
+                stats["tokens"] += topic["max_tokens"]
+                continue
+
+            stats["tokens"] += tokens
+            self.db.save_ai_answer(answer_key(plant_name, topic), text, self.ttl_hours,
+                                   plant_name=plant_name, section=topic["interaction"], tokens=tokens,
+                                   source="prewarm")
+            stats["generated"] += 1
+
+        self._last_run = now
+        logger.info(f"Prewarmed AI answers: {stats}")
+        return stats
+
+    def _seconds_until_window(self, now: datetime) -> float:
+        if in_window(now.hour, self.start_hour, self.end_hour):
+            return 0.0
+        start = now.replace(hour=self.start_hour, minute=0, second=0, microsecond=0)
+        if start <= now:
+            start += timedelta(days=1)
+        return (start - now).total_seconds()
+
+    async def run(self):
+        """Run once per off-peak window until cancelled"""
+        while True:
+            now = datetime.now()
+            wait = self._seconds_until_window(now)
+            if wait == 0 and (self._last_run is None or now - self._last_run > timedelta(hours=12)):
+                try:
+                    await self.run_once(now)
+                except Exception as e:
+                    logger.error(f"Error prewarming AI answers: {e}")
+                continue
+            # Outside the window, or already done in this one
+            await asyncio.sleep(wait or 3600.0)
+
+    def start(self) -> asyncio.Task:
+        self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,171 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Optional
+
+# Outbound limits of the Bot API: about 30 messages per second overall, one
+# per second to a private chat (short bursts are tolerated) and 20 per
+# minute to a group
+GLOBAL_RATE = 30.0
+CHAT_RATE = 1.0
+CHAT_BURST = 3
+GROUP_RATE = 20 / 60.0
+
+# Priorities of queued sends: replies to a user go before broadcasts
+INTERACTIVE = 0
+BULK = 1
+
+# Idle per-chat buckets are dropped once there are more than this many
+MAX_CHAT_BUCKETS = 10000
+
+# Methods that post or change a message and so count towards the limits
+LIMITED_METHODS = frozenset({
+    "sendMessage", "sendPhoto", "sendDocument", "sendVideo", "sendAudio", "sendVoice", "sendAnimation",
+    "sendSticker", "sendMediaGroup", "sendLocation", "sendContact", "sendPoll", "copyMessage",
+    "forwardMessage", "editMessageText", "editMessageCaption", "editMessageMedia", "editMessageReplyMarkup",
+})
+
+
+class TokenBucket:
+    """rate tokens per second, holding up to capacity"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available"""
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def reserve(self, now: float) -> float:
+        """Take a token, possibly one that is only available later
+
+        Returns:
+            float: seconds to wait before using it
+        """
+        self._refill(now)
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def pause(self, now: float, seconds: float):
+        """Hand out no token for the next `seconds` (Telegram's retry_after)"""
+        self._refill(now)
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+    def idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+def chat_bucket(chat_id, now: float) -> TokenBucket:
+    # Group and channel ids are negative
+    if isinstance(chat_id, int) and chat_id < 0:
+        return TokenBucket(GROUP_RATE, CHAT_BURST, now)
+    return TokenBucket(CHAT_RATE, CHAT_BURST, now)
+
+
+class _ChatBuckets(dict):
+    def get_bucket(self, chat_id, now: float) -> TokenBucket:
+        bucket = self.get(chat_id)
+        if bucket is None:
+            if len(self) >= MAX_CHAT_BUCKETS:
+                for idle_chat in [key for key, value in self.items() if value.idle(now)]:
+                    del self[idle_chat]
+            bucket = self[chat_id] = chat_bucket(chat_id, now)
+        return bucket
+
+
+class OutboundLimiter:
+    """Paces outgoing messages with a global and a per-chat token bucket
+
+    A send first waits for its chat's bucket, then joins a queue for the
+    global bucket where interactive sends are served before bulk ones
+    (reminders, broadcasts), so a broadcast cannot delay replies. pause()
+    applies a retry_after from Telegram to the chat, or to everything when
+    the chat is not known.
+    """
+
+    def __init__(self, rate: float = GLOBAL_RATE):
+        self._global = TokenBucket(rate, rate)
+        self._chats = _ChatBuckets()
+        self._queue = []
+        self._order = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def acquire(self, chat_id=None, priority: int = INTERACTIVE):
+        """Wait until a message to chat_id may be sent"""
+        if chat_id is not None:
+            wait = self._chats.get_bucket(chat_id, time.monotonic()).reserve(time.monotonic())
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        heapq.heappush(self._queue, (priority, next(self._order), ready))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch())
+        await ready
+
+    async def _dispatch(self):
+        while self._queue:
+            wait = self._global.delay(time.monotonic())
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            _, _, ready = heapq.heappop(self._queue)
+            if not ready.done():
+                self._global.reserve(time.monotonic())
+                ready.set_result(None)
+
+    def pause(self, chat_id, seconds: float):
+        now = time.monotonic()
+        if chat_id is not None:
+            self._chats.get_bucket(chat_id, now).pause(now, seconds)
+        else:
+            self._global.pause(now, seconds)
+
+
+class SyncOutboundLimiter:
+    """Blocking OutboundLimiter for code that sends with requests, without priorities"""
+
+    def __init__(self, rate: float = GLOBAL_RATE):
+        self._global = TokenBucket(rate, rate)
+        self._chats = _ChatBuckets()
+        self._lock = threading.Lock()
+
+    def acquire(self, chat_id=None, max_wait: Optional[float] = None) -> bool:
+        """Wait until a message to chat_id may be sent
+
+        With max_wait, gives up without taking a token (returns False) when
+        that would mean waiting longer.
+        """
+        with self._lock:
+            now = time.monotonic()
+            buckets = [self._global]
+            if chat_id is not None:
+                buckets.append(self._chats.get_bucket(chat_id, now))
+            if max_wait is not None and max(bucket.delay(now) for bucket in buckets) > max_wait:
+                return False
+            wait = max(bucket.reserve(now) for bucket in buckets)
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def pause(self, chat_id, seconds: float):
+        with self._lock:
+            now = time.monotonic()
+            if chat_id is not None:
+                self._chats.get_bucket(chat_id, now).pause(now, seconds)
+            else:
+                self._global.pause(now, seconds)
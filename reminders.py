@@ -0,0 +1,295 @@
+import asyncio
+import heapq
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from config import REMINDER_BATCH_SIZE, REMINDER_HOUR, REMINDER_MAX_PER_SECOND
+from message_builder import MARKDOWN_V2, bold, escape
+from rate_limiter import BULK
+
+logger = logging.getLogger(__name__)
+
+# Care actions that get reminders, with the message shown to the user in
+# MarkdownV2; {plant} is replaced with the escaped plant name in bold
+REMINDER_KINDS = {
+    "watering": "💧 Пора полить {plant}\\.",
+    "fertilizer": "🧪 Пора подкормить {plant}\\.",
+}
+
+# Used when a plant's watering frequency cannot be parsed
+DEFAULT_WATERING_DAYS = 7
+
+UNIT_DAYS = {"д": 1, "сут": 1, "нед": 7, "мес": 30, "год": 365, "лет": 365}
+
+INTERVAL_RE = re.compile(
+    r"(?:(?P<times>\d+)\s*раз\w*|раз)\s+в\s+(?:(?P<low>\d+)(?:\s*[-–]\s*(?P<high>\d+))?\s*)?"
+    r"(?P<unit>д|сут|нед|мес|год|лет)\w*"
+)
+
+SEASONS = {12: "зима", 1: "зима", 2: "зима", 3: "весна", 4: "весна", 5: "весна",
+           6: "лето", 7: "лето", 8: "лето", 9: "осень", 10: "осень", 11: "осень"}
+SEASON_ADVERBS = {"зима": "зимой", "весна": "весной", "лето": "летом", "осень": "осенью"}
+
+
+def parse_interval_days(text: Optional[str]) -> Optional[float]:
+    """Days between care actions described in Russian, e.g. "раз в 7-10 дней" -> 8.5
+
+    Returns None if the text has no recognizable cadence.
+    """
+    if not text:
+        return None
+    text = text.lower().replace("ё", "е")
+    if "ежедневно" in text or "каждый день" in text:
+        return 1.0
+
+    match = INTERVAL_RE.search(text)
+    if not match:
+        return None
+
+    low = int(match.group("low") or 1)
+    high = int(match.group("high") or low)
+    times = int(match.group("times") or 1)
+    days = (low + high) / 2 * UNIT_DAYS[match.group("unit")] / max(times, 1)
+    return days if days > 0 else None
+
+
+def season_of(when: datetime) -> str:
+    return SEASONS[when.month]
+
+
+def _next_season_start(when: datetime) -> datetime:
+    month = when.month
+    while SEASONS[month] == season_of(when):
+        month = month % 12 + 1
+    year = when.year + (1 if month < when.month else 0)
+    return when.replace(year=year, month=month, day=1)
+
+
+def care_interval(tip, kind: str, when: datetime) -> Optional[float]:
+    """Days until the next care action of a kind, adjusted for the season
+
+    Returns None if the tip has no cadence for this kind.
+    """
+    season = season_of(when)
+
+    if kind == "watering":
+        watering = tip.get("watering") or {}
+        days = parse_interval_days(watering.get("frequency")) or DEFAULT_WATERING_DAYS
+        adjustment = (watering.get("seasonal_adjustments") or {}).get(season, "").lower()
+        adjusted = parse_interval_days(adjustment)
+        if adjusted:
+            return adjusted
+        if "сократ" in adjustment or "реже" in adjustment:
+            return days * 1.5
+        if "увелич" in adjustment or "чаще" in adjustment:
+            return days * 0.75
+        return days
+
+    if kind == "fertilizer":
+        fertilizer = tip.get("fertilizer") or {}
+        days = parse_interval_days(fertilizer.get("frequency"))
+        if days is None:
+            return None
+        seasonal = (fertilizer.get("seasonal") or "").lower()
+        if "не удобряйте" in seasonal and SEASON_ADVERBS[season] in seasonal:
+            # Resume at the start of the next season
+            return (_next_season_start(when) - when).total_seconds() / 86400
+        return days
+
+    return None
+
+
+def next_due(tip, kind: str, after: datetime) -> Optional[datetime]:
+    """When the next reminder of a kind is due, at REMINDER_HOUR local time
+
+    Always later than after: reminders go out at most once a day, so
+    cadences shorter than a day ("2 раза в день") become daily.
+    """
+    days = care_interval(tip, kind, after)
+    if days is None:
+        return None
+    due = after + timedelta(days=max(days, 1))
+    due = due.replace(hour=REMINDER_HOUR, minute=0, second=0, microsecond=0)
+    while due <= after:
+        due += timedelta(days=1)
+    return due
+
+
+def reminder_key(user_id, plant_name: str, kind: str) -> str:
+    return f"{user_id}:{plant_name.lower()}:{kind}"
+
+
+class ReminderScheduler:
+    """In-memory min-heap of reminders, persisted through Database
+
+    Scheduling and cancelling are O(log n): cancelled or rescheduled entries
+    stay in the heap and are skipped when popped (their due time no longer
+    matches the reminder). Due reminders fire in batches: the batch's next
+    due times are written first, then the messages go out paced to
+    REMINDER_MAX_PER_SECOND. A crash mid-batch can therefore drop a
+    reminder but never send one twice.
+    """
+
+    def __init__(self, db, get_tip: Callable, batch_size: int = REMINDER_BATCH_SIZE,
+                 max_per_second: float = REMINDER_MAX_PER_SECOND):
+        self.db = db
+        self.get_tip = get_tip
+        self.batch_size = batch_size
+        self.max_per_second = max_per_second
+        self._heap: List[tuple] = []
+        self._reminders: Dict[str, Dict] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._reminders)
+
+    def load(self) -> int:
+        """Restore persisted reminders"""
+        self._heap = []
+        self._reminders = {}
+        for reminder in self.db.get_reminders():
+            self._push(reminder)
+        logger.info(f"Loaded {len(self._reminders)} reminders")
+        return len(self._reminders)
+
+    def _push(self, reminder: Dict):
+        self._reminders[reminder["key"]] = reminder
+        heapq.heappush(self._heap, (reminder["due_at"], reminder["key"]))
+
+    def schedule(self, reminder: Dict):
+        """Add or reschedule a reminder (persisted)"""
+        self.db.save_reminders([reminder])
+        self._push(reminder)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def schedule_plant(self, user_id, chat_id, plant_name: str, tip=None, now: Optional[datetime] = None) -> List[Dict]:
+        """Schedule all reminder kinds a plant's care data supports"""
+        now = now or datetime.now()
+        tip = tip or {}
+        scheduled = []
+        for kind in REMINDER_KINDS:
+            due_at = next_due(tip, kind, now)
+            if due_at is None:
+                continue
+            reminder = {
+                "key": reminder_key(user_id, plant_name, kind),
+                "user_id": user_id,
+                "chat_id": chat_id,
+                "plant_name": plant_name,
+                "kind": kind,
+                "due_at": due_at,
+            }
+            self.schedule(reminder)
+            scheduled.append(reminder)
+        return scheduled
+
+    def cancel_plant(self, user_id, plant_name: str):
+        """Drop a plant's reminders; their heap entries are skipped lazily"""
+        keys = [reminder_key(user_id, plant_name, kind) for kind in REMINDER_KINDS]
+        for key in keys:
+            self._reminders.pop(key, None)
+        self.db.delete_reminders(keys)
+
+    def next_due_for(self, user_id, plant_name: str) -> Dict[str, datetime]:
+        reminders = {}
+        for kind in REMINDER_KINDS:
+            reminder = self._reminders.get(reminder_key(user_id, plant_name, kind))
+            if reminder is not None:
+                reminders[kind] = reminder["due_at"]
+        return reminders
+
+    def pop_due(self, now: datetime) -> List[Dict]:
+        """Remove and return up to batch_size reminders due at `now`"""
+        batch = []
+        while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+            due_at, key = heapq.heappop(self._heap)
+            reminder = self._reminders.get(key)
+            if reminder is None or reminder["due_at"] != due_at:
+                continue  # cancelled or rescheduled
+            batch.append(reminder)
+        return batch
+
+    def _seconds_until_next(self, now: datetime) -> float:
+        # Drop stale heads so they don't cause spurious wakeups
+        while self._heap:
+            due_at, key = self._heap[0]
+            reminder = self._reminders.get(key)
+            if reminder is not None and reminder["due_at"] == due_at:
+                return max(0.0, (due_at - now).total_seconds())
+            heapq.heappop(self._heap)
+        return 3600.0
+
+    def _reschedule(self, batch: List[Dict], now: datetime) -> List[Dict]:
+        """Compute and persist the next due time of fired reminders"""
+        updated = []
+        for reminder in batch:
+            # Plants outside the catalog keep the default watering cadence
+            tip = self.get_tip(reminder["plant_name"]) or {}
+            due_at = next_due(tip, reminder["kind"], max(reminder["due_at"], now))
+            if due_at is None:
+                self._reminders.pop(reminder["key"], None)
+                continue
+            updated.append(dict(reminder, due_at=due_at, last_sent_at=now))
+        if updated:
+            self.db.save_reminders(updated)
+        gone = [reminder["key"] for reminder in batch if reminder["key"] not in self._reminders]
+        if gone:
+            self.db.delete_reminders(gone)
+        for reminder in updated:
+            self._push(reminder)
+        return updated
+
+    async def fire(self, bot, batch: List[Dict]):
+        """Send a batch of reminders, paced to max_per_second"""
+        interval = 1.0 / self.max_per_second if self.max_per_second else 0.0
+        next_slot = time.monotonic()
+        for reminder in batch:
+            delay = next_slot - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_slot = max(next_slot, time.monotonic()) + interval
+
+            # The plant name is user input
+            text = REMINDER_KINDS[reminder["kind"]].format(plant=bold(reminder["plant_name"]))
+            tip = self.get_tip(reminder["plant_name"]) or {}
+            if reminder["kind"] == "watering" and (tip.get("watering") or {}).get("method"):
+                text += "\n" + escape(f"{tip['watering']['method'].capitalize()}.")
+            try:
+                # Queued behind replies to users by the bot's rate limiter
+                await bot.send_message(chat_id=reminder["chat_id"], text=text, parse_mode=MARKDOWN_V2,
+                                       rate_limit_args=BULK)
+            except Exception as e:
+                logger.error(f"Error sending reminder {reminder['key']}: {e}")
+
+    async def run(self, bot):
+        """Fire due reminders until cancelled"""
+        self._wakeup = asyncio.Event()
+        while True:
+            now = datetime.now()
+            batch = self.pop_due(now)
+            if batch:
+                updated = self._reschedule(batch, now)
+                sent = {reminder["key"] for reminder in updated}
+                # Reminders that no longer apply (e.g. no fertilizer cadence) are dropped unsent
+                await self.fire(bot, [reminder for reminder in batch if reminder["key"] in sent])
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=min(self._seconds_until_next(now), 3600.0))
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, bot) -> asyncio.Task:
+        self._task = asyncio.get_running_loop().create_task(self.run(bot))
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
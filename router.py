@@ -0,0 +1,146 @@
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Prefix route resolutions remembered per router (payloads repeat a lot:
+# the same buttons for the same plants)
+RESOLVE_CACHE_SIZE = 4096
+
+
+class _Node:
+    """Radix trie node: edges are keyed by their label's first character"""
+
+    __slots__ = ("route", "edges")
+
+    def __init__(self, route=None, edges=None):
+        self.route = route
+        self.edges: Dict[str, Tuple[str, "_Node"]] = edges or {}
+
+
+class Router:
+    """Table-driven dispatch of callback data and menu texts
+
+    Static payloads are looked up in a dict. Parameterized ones
+    ("plant_water_<name>") are matched by the longest registered prefix
+    through a compressed trie, so lookup cost depends on how many prefixes
+    share a stem ("plant_" -> "water_") rather than on the number of
+    routes. An exact route wins over a prefix route for the same payload.
+
+    A prefix route may have a parser turning the rest of the payload into
+    the handler's argument; a parser raising ValueError makes the route
+    not match. Parsers must be pure since resolutions are cached.
+    """
+
+    def __init__(self):
+        self._exact: Dict[str, Tuple[Callable, tuple]] = {}
+        self._root = _Node()
+        self._prefixes = 0
+        self._resolved: Dict[str, Optional[Tuple[Callable, tuple]]] = {}
+
+    def __len__(self):
+        return len(self._exact) + self._prefixes
+
+    def exact(self, payload: str, handler: Optional[Callable] = None, *args):
+        """Route a payload to handler(*args); usable as a decorator"""
+        def register(handler):
+            self._exact[payload] = (handler, args)
+            self._resolved.clear()
+            return handler
+        return register(handler) if handler is not None else register
+
+    def prefix(self, prefix: str, handler: Optional[Callable] = None,
+               parse: Optional[Callable[[str], Any]] = None):
+        """Route payloads starting with prefix to handler(parse(rest)); usable as a decorator"""
+        def register(handler):
+            node = self._insert(prefix)
+            if node.route is None:
+                self._prefixes += 1
+            node.route = (handler, parse)
+            self._resolved.clear()
+            return handler
+        return register(handler) if handler is not None else register
+
+    def _insert(self, prefix: str) -> _Node:
+        node = self._root
+        while prefix:
+            edge = node.edges.get(prefix[0])
+            if edge is None:
+                child = _Node()
+                node.edges[prefix[0]] = (prefix, child)
+                return child
+
+            label, child = edge
+            common = 0
+            while common < min(len(label), len(prefix)) and label[common] == prefix[common]:
+                common += 1
+            if common < len(label):
+                # Split the edge at the end of the shared part
+                middle = _Node(edges={label[common]: (label[common:], child)})
+                node.edges[prefix[0]] = (label[:common], middle)
+                child = middle
+            node = child
+            prefix = prefix[common:]
+        return node
+
+    def resolve(self, payload: str) -> Optional[Tuple[Callable, tuple]]:
+        """Find the handler for a payload
+
+        Returns:
+            (handler, args) or None if no route matches
+        """
+        route = self._exact.get(payload)
+        if route is not None:
+            return route
+        try:
+            return self._resolved[payload]
+        except KeyError:
+            pass
+
+        route = self._resolve_prefix(payload)
+        if len(self._resolved) >= RESOLVE_CACHE_SIZE:
+            self._resolved.clear()
+        self._resolved[payload] = route
+        return route
+
+    def _resolve_prefix(self, payload: str) -> Optional[Tuple[Callable, tuple]]:
+        # Walk the trie, remembering matched prefixes (longest last)
+        matches = []
+        node = self._root
+        position = 0
+        length = len(payload)
+        while True:
+            if node.route is not None:
+                matches.append((position, node.route))
+            if position == length:
+                break
+            edge = node.edges.get(payload[position])
+            if edge is None:
+                break
+            label, node = edge
+            if not payload.startswith(label, position):
+                break
+            position += len(label)
+
+        while matches:
+            end, (handler, parse) = matches.pop()
+            if parse is None:
+                return handler, (payload[end:],)
+            try:
+                return handler, (parse(payload[end:]),)
+            except ValueError:
+                continue
+        return None
+
+    async def dispatch(self, payload: str, *args):
+        """Call the handler for a payload with *args followed by the route's arguments
+
+        Returns:
+            The handler's result, or None if no route matches
+        """
+        route = self.resolve(payload)
+        if route is None:
+            logger.warning(f"No route for {payload!r}")
+            return None
+        handler, route_args = route
+        return await handler(*args, *route_args)
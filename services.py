@@ -0,0 +1,62 @@
+import logging
+import os
+import threading
+from typing import Optional
+
+import plant_care_tips
+from ai_service import AIService
+from database import Database
+from plant_care_tips import PlantCareTipsManager, get_plant_care_manager
+
+logger = logging.getLogger(__name__)
+
+
+class Services:
+    """Heavyweight objects shared by every handler of a process
+
+    Building them is cheap (connections open lazily); warm_up() and
+    warm_up_http() open them ahead of the first request. Handlers take
+    these instead of constructing their own AIService or Database.
+    """
+
+    def __init__(self):
+        self.db = Database()
+        self.ai_service = AIService(db=self.db)
+
+    @property
+    def plant_care(self) -> PlantCareTipsManager:
+        return get_plant_care_manager()
+
+    def warm_up(self, watch: bool = False):
+        """Open the database and load the care tips catalog (blocking, run it in an executor)
+
+        Args:
+            watch: Also reload the catalog whenever its file changes
+        """
+        self.db.warm_up()
+        plant_care_tips.warm(watch)
+        logger.info("Services warmed up")
+
+    async def warm_up_http(self):
+        """Open the AI API connection pool on the running event loop"""
+        await self.ai_service.warm_up()
+
+    async def close(self):
+        await self.ai_service.close()
+
+
+# Created on first use, once per process (a forked worker builds its own)
+_services: Optional[Services] = None
+_services_pid: Optional[int] = None
+_services_lock = threading.Lock()
+
+
+def get_services() -> Services:
+    """Get this process's services, creating them on first call"""
+    global _services, _services_pid
+    if _services is None or _services_pid != os.getpid():
+        with _services_lock:
+            if _services is None or _services_pid != os.getpid():
+                _services = Services()
+                _services_pid = os.getpid()
+    return _services
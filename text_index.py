@@ -0,0 +1,135 @@
+import heapq
+import math
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+TOKEN_RE = re.compile(r"[a-zа-я0-9]+")
+
+# Reflexive verb suffixes are stripped before the inflectional endings
+REFLEXIVE_ENDINGS = ("ся", "сь")
+
+# Light Russian stemmer: inflectional endings of adjectives, verbs and nouns,
+# longest first. Derivational suffixes are kept, so "полив", "поливать" and
+# "поливайте" share a stem while "поливка" does not.
+RUSSIAN_ENDINGS = frozenset({
+    # adjectives / participles
+    "ого", "его", "ому", "ему", "ыми", "ими", "ой", "ей", "ий", "ый", "ая", "яя",
+    "ое", "ее", "ые", "ие", "ую", "юю", "ым", "им", "ом", "ем", "ых", "их",
+    # verbs
+    "айте", "яйте", "ейте", "уйте", "ите", "ать", "ять", "ить", "еть", "уть",
+    "ает", "яет", "еет", "ует", "ают", "яют", "еют", "уют", "ешь", "ет", "ют",
+    "ут", "ит", "ат", "ят", "ла", "ли", "ло", "ал", "ял", "ил", "ай", "яй",
+    # nouns
+    "иями", "ьями", "ями", "ами", "ьев", "ьям", "ьях", "ов", "ев", "ам", "ям",
+    "ах", "ях", "ью", "ья", "ье", "ию", "ия", "а", "я", "о", "е", "и", "ы",
+    "у", "ю", "ь", "й",
+})
+ENDING_LENGTHS = sorted({len(ending) for ending in RUSSIAN_ENDINGS}, reverse=True)
+
+MIN_STEM_LENGTH = 3
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Strip a Russian inflectional ending, keeping at least MIN_STEM_LENGTH characters"""
+    for ending in REFLEXIVE_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+            word = word[:-len(ending)]
+            break
+    for length in ENDING_LENGTHS:
+        if len(word) - length >= MIN_STEM_LENGTH and word[-length:] in RUSSIAN_ENDINGS:
+            return word[:-length]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, fold ё and split text into stemmed terms"""
+    return [stem(token) for token in TOKEN_RE.findall(text.lower().replace("ё", "е"))]
+
+
+class InvertedIndex:
+    """Incremental inverted index with BM25 ranking
+
+    Documents are arbitrary objects, identified by identity; their text is
+    passed as (text, weight) pairs so that e.g. names can count more than
+    descriptions.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # term -> {doc key -> weighted term frequency}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        # doc key -> (document, length, terms)
+        self._docs: Dict[int, Tuple[object, float, Tuple[str, ...]]] = {}
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def copy(self) -> "InvertedIndex":
+        """An index with the same documents that can be changed independently"""
+        clone = InvertedIndex(self.k1, self.b)
+        clone._postings = {term: dict(postings) for term, postings in self._postings.items()}
+        clone._docs = dict(self._docs)
+        clone._total_length = self._total_length
+        return clone
+
+    def add(self, document, fields: Iterable[Tuple[str, float]]):
+        key = id(document)
+        if key in self._docs:
+            self.remove(document)
+
+        frequencies: Dict[str, float] = {}
+        for text, weight in fields:
+            for term in tokenize(text):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[key] = frequency
+
+        length = sum(frequencies.values())
+        self._docs[key] = (document, length, tuple(frequencies))
+        self._total_length += length
+
+    def remove(self, document):
+        entry = self._docs.pop(id(document), None)
+        if entry is None:
+            return
+
+        _, length, terms = entry
+        self._total_length -= length
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(id(document), None)
+                if not postings:
+                    del self._postings[term]
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[object, float]]:
+        """Top documents for a query
+
+        Returns:
+            (document, score) pairs, best first
+        """
+        if not self._docs:
+            return []
+
+        count = len(self._docs)
+        average_length = self._total_length / count or 1.0
+        k1, b = self.k1, self.b
+        docs = self._docs
+        scores: Dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, frequency in postings.items():
+                norm = k1 * (1 - b + b * docs[key][1] / average_length)
+                scores[key] = scores.get(key, 0.0) + idf * frequency * (k1 + 1) / (frequency + norm)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(self._docs[key][0], score) for key, score in best]
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+# Queue wait samples kept for the percentiles
+WAIT_SAMPLES = 1000
+
+# Updates that may wait for their chat or a handler slot, per slot
+WAITING_PER_SLOT = 4
+
+# Waits longer than this are logged, they mean the bot is saturated
+SLOW_WAIT_SECONDS = 5.0
+
+
+class QueueWaitStats:
+    """Time updates spent waiting before their handlers started"""
+
+    def __init__(self, samples: int = WAIT_SAMPLES):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=samples)
+
+    def add(self, wait: float):
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+        self._recent.append(wait)
+
+    def percentile(self, p: float) -> float:
+        """Percentile (0-100) of the recent waits, in seconds"""
+        if not self._recent:
+            return 0.0
+        recent = sorted(self._recent)
+        return recent[min(len(recent) - 1, int(len(recent) * p / 100))]
+
+    def summary(self) -> Dict:
+        return {
+            "updates": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+        }
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Processes updates concurrently while keeping each chat's updates in order
+
+    Up to max_concurrent_updates handlers run at once. Updates from the same
+    chat (or from the same user when there is no chat) wait for the previous
+    one to finish, and do so before taking a slot, so one busy chat cannot
+    hold all of them. Updates without a chat or user are not serialized.
+
+    The base class semaphore, taken before do_process_update, bounds the
+    updates in flight: the running ones plus up to max_waiting_updates
+    waiting for their chat or a slot.
+    """
+
+    def __init__(self, max_concurrent_updates: int, max_waiting_updates: Optional[int] = None):
+        if max_waiting_updates is None:
+            max_waiting_updates = max_concurrent_updates * WAITING_PER_SLOT
+        super().__init__(max_concurrent_updates + max_waiting_updates)
+        self.max_running = max_concurrent_updates
+        self._slots = asyncio.BoundedSemaphore(max_concurrent_updates)
+        # chat id -> [lock, updates holding or waiting for it]
+        self._chats: Dict[int, list] = {}
+        self.active = 0
+        self.wait_stats = QueueWaitStats()
+
+    @staticmethod
+    def _chat_key(update: object) -> Optional[int]:
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat is not None:
+            return update.effective_chat.id
+        if update.effective_user is not None:
+            return update.effective_user.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable) -> None:
+        received = time.monotonic()
+        key = self._chat_key(update)
+        if key is None:
+            async with self._slots:
+                await self._run(coroutine, received)
+            return
+
+        entry = self._chats.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                async with self._slots:
+                    await self._run(coroutine, received)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._chats[key]
+
+    async def _run(self, coroutine: Awaitable, received: float) -> None:
+        wait = time.monotonic() - received
+        self.wait_stats.add(wait)
+        if wait > SLOW_WAIT_SECONDS:
+            logger.warning(f"Update waited {wait:.1f}s for a handler slot ({self.active} running)")
+
+        self.active += 1
+        try:
+            await coroutine
+        finally:
+            self.active -= 1
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -1,88 +1,45 @@
+from message_builder import MessageBuilder, bold, escape
+
+
 def format_vitamin_info(vitamin, detailed=False):
-    """Format vitamin information for display"""
+    """Format vitamin information for display (MarkdownV2)"""
     if not vitamin:
         return "Информация не найдена"
     
     if not detailed:
-        return f"*{vitamin['name']}*: {vitamin['short_description']}"
-    
-    text = f"*{vitamin['name']}*\n\n"
-    text += f"{vitamin['description']}\n\n"
-    
-    if 'benefits' in vitamin and vitamin['benefits']:
-        text += "*Польза для организма:*\n"
-        for benefit in vitamin['benefits'].split('\n'):
-            if benefit.strip():
-                text += f"• {benefit.strip()}\n"
-        text += "\n"
-    
-    if 'sources' in vitamin and vitamin['sources']:
-        text += "*Источники в продуктах:*\n"
-        for source in vitamin['sources'].split('\n'):
-            if source.strip():
-                text += f"• {source.strip()}\n"
-        text += "\n"
+        return f"{bold(vitamin['name'])}: {escape(vitamin['short_description'])}"
     
-    if 'deficiency' in vitamin and vitamin['deficiency']:
-        text += "*При дефиците:*\n"
-        for symptom in vitamin['deficiency'].split('\n'):
-            if symptom.strip():
-                text += f"• {symptom.strip()}\n"
-        text += "\n"
-    
-    if 'overdose' in vitamin and vitamin['overdose']:
-        text += "*При избытке:*\n"
-        for symptom in vitamin['overdose'].split('\n'):
-            if symptom.strip():
-                text += f"• {symptom.strip()}\n"
-        text += "\n"
-    
-    if 'daily_intake' in vitamin and vitamin['daily_intake']:
-        text += f"*Суточная норма:* {vitamin['daily_intake']}\n\n"
-    
-    return text
+    return (
+        MessageBuilder()
+        .title(vitamin['name'])
+        .markdown(vitamin['description'])
+        .section("Польза для организма", vitamin.get('benefits'))
+        .section("Источники в продуктах", vitamin.get('sources'))
+        .section("При дефиците", vitamin.get('deficiency'))
+        .section("При избытке", vitamin.get('overdose'))
+        .field("Суточная норма", vitamin.get('daily_intake'))
+        .render()
+    )
 
 
 def format_plant_tip(plant_tip, detailed=False):
-    """Format plant care tip for display"""
+    """Format plant care tip for display (MarkdownV2)"""
     if not plant_tip:
         return "Информация не найдена"
     
     if not detailed:
-        return f"*{plant_tip['waste_type']}*: {plant_tip['short_description']}"
-    
-    text = f"*{plant_tip['waste_type']}*\n\n"
-    text += f"{plant_tip['description']}\n\n"
-    
-    if 'benefits' in plant_tip and plant_tip['benefits']:
-        text += "*Польза для растений:*\n"
-        for benefit in plant_tip['benefits'].split('\n'):
-            if benefit.strip():
-                text += f"• {benefit.strip()}\n"
-        text += "\n"
+        return f"{bold(plant_tip['waste_type'])}: {escape(plant_tip['short_description'])}"
     
-    if 'application' in plant_tip and plant_tip['application']:
-        text += "*Способ применения:*\n"
-        for step in plant_tip['application'].split('\n'):
-            if step.strip():
-                text += f"• {step.strip()}\n"
-        text += "\n"
-    
-    if 'suitable_plants' in plant_tip and plant_tip['suitable_plants']:
-        text += "*Подходит для растений:*\n"
-        for plant in plant_tip['suitable_plants'].split('\n'):
-            if plant.strip():
-                text += f"• {plant.strip()}\n"
-        text += "\n"
-    
-    if 'precautions' in plant_tip and plant_tip['precautions']:
-        text += "*Предостережения:*\n"
-        for precaution in plant_tip['precautions'].split('\n'):
-            if precaution.strip():
-                text += f"• {precaution.strip()}\n"
-        text += "\n"
-    
-    return text
+    return (
+        MessageBuilder()
+        .title(plant_tip['waste_type'])
+        .markdown(plant_tip['description'])
+        .section("Польза для растений", plant_tip.get('benefits'))
+        .section("Способ применения", plant_tip.get('application'))
+        .section("Подходит для растений", plant_tip.get('suitable_plants'))
+        .section("Предостережения", plant_tip.get('precautions'))
+        .render()
+    )
 
 
 def format_faq(faq_id):
@@ -194,48 +151,16 @@ def is_ai_query(text):
 
 
 def format_problem_analysis(analysis, problem_type):
-    """Format problem analysis for display"""
-    # For simple responses, just return the analysis as is
-    if not analysis.startswith("**"):
-        return analysis
-    
-    # For structured responses, add a header based on problem type
-    if problem_type == "vitamin":
-        header = "🔍 *Анализ проблемы с витаминами*\n\n"
-    elif problem_type == "plant":
-        header = "🔍 *Анализ проблемы с растением*\n\n"
-    else:
-        header = "🔍 *Анализ проблемы*\n\n"
-    
-    # Replace markdown formatting for Telegram
-    formatted_analysis = analysis.replace("**", "*")
-    
-    return header + formatted_analysis
-
-
-def clean_markdown(text):
-    """Clean markdown formatting from text while preserving Telegram markdown
-    
-    Args:
-        text (str): Text with potentially incorrect markdown
-        
-    Returns:
-        str: Cleaned text with proper Telegram markdown
-    """
-    if not text:
-        return text
-        
-    # Remove or replace problematic markdown
-    text = text.replace("###", "")
-    text = text.replace("##", "")
-    text = text.replace("**", "*")  # Convert bold to Telegram format
-    
-    # Ensure there are even number of asterisks for proper Telegram formatting
-    asterisk_count = text.count("*")
-    if asterisk_count % 2 != 0:
-        # Find the last asterisk and remove it if unmatched
-        last_pos = text.rfind("*")
-        if last_pos >= 0:
-            text = text[:last_pos] + text[last_pos+1:]
-            
-    return text 
\ No newline at end of file
+    """Format problem analysis for display (MarkdownV2)"""
+    message = MessageBuilder()
+    
+    # Structured responses get a header based on problem type
+    if analysis.startswith("**"):
+        if problem_type == "vitamin":
+            message.title("Анализ проблемы с витаминами", emoji="🔍")
+        elif problem_type == "plant":
+            message.title("Анализ проблемы с растением", emoji="🔍")
+        else:
+            message.title("Анализ проблемы", emoji="🔍")
+    
+    return message.markdown(analysis).render() 
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""Native aiohttp webhook server for the aiogram dispatcher in main.py
+
+Runs on one persistent event loop (so the AI and Telegram HTTP sessions
+stay open between updates), answers Telegram as soon as an update is
+queued, and processes updates in background tasks, at most
+max_concurrent at a time and in order within a chat.
+
+    python webhook_server.py
+"""
+import asyncio
+import hmac
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from aiohttp import web
+
+from config import (
+    ALLOWED_UPDATES, MAX_CONCURRENT_UPDATES, WEBHOOK_LISTEN, WEBHOOK_MAX_CONNECTIONS, WEBHOOK_MAX_PENDING_UPDATES,
+    WEBHOOK_PATH, WEBHOOK_PORT, WEBHOOK_SECRET, WEBHOOK_URL
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds given to queued updates to finish on shutdown
+SHUTDOWN_GRACE = 10.0
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def _chat_key(update: Dict) -> Optional[int]:
+    """Chat (or user) an update belongs to, for ordering"""
+    for kind in ("message", "edited_message", "channel_post", "callback_query"):
+        payload = update.get(kind)
+        if payload is None:
+            continue
+        message = payload.get("message", payload) if kind == "callback_query" else payload
+        if message.get("chat"):
+            return message["chat"]["id"]
+        if payload.get("from"):
+            return payload["from"]["id"]
+    return None
+
+
+class WebhookServer:
+    """Accepts Telegram updates over HTTP and processes them in the background
+
+    Requests are acknowledged once the update is queued. When more than
+    max_pending updates are waiting the server answers 503, so Telegram
+    holds on to the update and retries it later instead of it piling up
+    in memory. Requests without the secret token (when one is set) get 403.
+    """
+
+    def __init__(self, process_update: Callable[[Dict], Awaitable], secret: str = WEBHOOK_SECRET,
+                 max_concurrent: int = MAX_CONCURRENT_UPDATES, max_pending: int = WEBHOOK_MAX_PENDING_UPDATES):
+        self.process_update = process_update
+        self.secret = secret
+        self.max_pending = max_pending
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._chats: Dict[int, list] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.secret and not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), self.secret):
+            return web.Response(status=403)
+        if len(self._tasks) >= self.max_pending:
+            logger.warning(f"{len(self._tasks)} updates pending, asking Telegram to retry later")
+            return web.Response(status=503)
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        task = asyncio.get_running_loop().create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.Response()
+
+    async def _process(self, update: Dict):
+        key = _chat_key(update)
+        entry = None
+        locked = False
+        if key is not None:
+            entry = self._chats.setdefault(key, [asyncio.Lock(), 0])
+            entry[1] += 1
+        try:
+            if entry is not None:
+                # drain() may cancel the task while it waits here
+                await entry[0].acquire()
+                locked = True
+            async with self._slots:
+                await self.process_update(update)
+        except Exception as e:
+            logger.exception(f"Error processing update {update.get('update_id')}: {e}")
+        finally:
+            if entry is not None:
+                if locked:
+                    entry[0].release()
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._chats[key]
+
+    async def drain(self, timeout: float = SHUTDOWN_GRACE):
+        """Wait for queued updates to finish, cancelling them after timeout seconds"""
+        if not self._tasks:
+            return
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Cancelled {len(pending)} updates still running on shutdown")
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "pending": self.pending})
+
+    def app(self, path: str = WEBHOOK_PATH) -> web.Application:
+        app = web.Application()
+        app.router.add_post(f"/{path.strip('/')}", self.handle)
+        app.router.add_get("/", self.health)
+        app.on_shutdown.append(lambda app: self.drain())
+        return app
+
+
+def create_app() -> web.Application:
+    """The webhook app for main.dp, warming the shared services on startup"""
+    from aiogram import Bot, Dispatcher, types
+    import main
+
+    async def process_update(data: Dict):
+        Bot.set_current(main.bot)
+        Dispatcher.set_current(main.dp)
+        await main.dp.process_update(types.Update(**data))
+
+    async def on_startup(app):
+        await asyncio.get_running_loop().run_in_executor(None, main.services.warm_up)
+        await main.services.warm_up_http()
+        if WEBHOOK_URL:
+            webhook_url = f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH.strip('/')}"
+            await main.bot.set_webhook(webhook_url, max_connections=WEBHOOK_MAX_CONNECTIONS,
+                                       allowed_updates=ALLOWED_UPDATES, secret_token=WEBHOOK_SECRET or None)
+            logger.info(f"Webhook set to {webhook_url}")
+
+    async def on_cleanup(app):
+        await main.services.close()
+        session = await main.bot.get_session()
+        await session.close()
+
+    app = WebhookServer(process_update).app()
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(create_app(), host=WEBHOOK_LISTEN, port=WEBHOOK_PORT)